@@ -4,8 +4,11 @@ from pathlib import Path
 # 添加项目根目录到 Python 路径
 sys.path.append(str(Path(__file__).parent.parent))
 
+import asyncio
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 # 导入配置和模型
@@ -13,20 +16,21 @@ from app.core.config import settings
 from app.core.database import Base
 
 # 导入所有模型，确保被Alembic识别
-from app.models.user import User, UserLevel
+from app.models.user import User, UserLevel, UserInviteClosure, RefreshTokenFamily
 from app.models.content import Content, Category
 from app.models.forum import Post, ForumCategory, Comment
 from app.models.tool import Tool
 from app.models.homework import Homework, HomeworkSubmission, HomeworkReview
-from app.models.points import PointRecord, PaymentRecord
+from app.models.points import PointRecord, PaymentRecord, PointRollup, PointRollupBackfill
 from app.models.task import Task, TaskApplicationRecord
 from app.models.partner import Partner, SiteConfig
+from app.models.like import Like
 
 # Alembic配置对象
 config = context.config
 
-# 设置数据库URL
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("+asyncpg", ""))
+# 设置数据库URL（与应用相同，使用 asyncpg 驱动）
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 # 解析日志配置
 if config.config_file_name is not None:
@@ -50,22 +54,33 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
-def run_migrations_online() -> None:
-    """在线模式运行迁移"""
-    connectable = engine_from_config(
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """在线模式运行迁移（异步引擎）"""
+    connectable = async_engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata
-        )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
 
-        with context.begin_transaction():
-            context.run_migrations()
+
+def run_migrations_online() -> None:
+    """在线模式运行迁移"""
+    asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
@@ -0,0 +1,89 @@
+"""invites and refresh tokens
+
+基线之后、引入迁移之前新增的表结构：邀请码序号序列、直接邀请计数、邀请关系闭包表和刷新令牌族。
+此前用 create_all 建表、标记为基线 0001 的数据库由这里补齐，
+并按 users.invited_by_id 回填闭包表和邀请计数（与 app/services/invite_tree.py 的 rebuild_invite_tree 相同）
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18 07:06:50.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001a'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 邀请码序号序列（见 app/services/invite_code.py）：autogenerate 不生成独立的序列
+    op.execute(sa.schema.CreateSequence(sa.Sequence('invite_code_seq')))
+
+    op.add_column('users', sa.Column('invited_count', sa.Integer(), server_default='0', nullable=True))
+    op.create_index(op.f('ix_users_invited_count'), 'users', ['invited_count'], unique=False)
+    op.create_index('ix_users_invited_by_id_id', 'users', ['invited_by_id', 'id'], unique=False)
+
+    op.create_table('user_invite_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['descendant_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_user_invite_closure_ancestor_depth', 'user_invite_closure', ['ancestor_id', 'depth'], unique=False)
+    op.create_index('ix_user_invite_closure_descendant_depth', 'user_invite_closure', ['descendant_id', 'depth'], unique=False)
+
+    op.create_table('refresh_token_families',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('current_jti', sa.String(length=32), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.Column('revoke_reason', sa.String(length=20), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_refresh_token_families_expires_at'), 'refresh_token_families', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_refresh_token_families_revoked_at'), 'refresh_token_families', ['revoked_at'], unique=False)
+    op.create_index(op.f('ix_refresh_token_families_user_id'), 'refresh_token_families', ['user_id'], unique=False)
+
+    # 已有用户的邀请关系
+    op.execute("""
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM users
+            UNION ALL
+            SELECT tree.ancestor_id, users.id, tree.depth + 1
+            FROM tree JOIN users ON users.invited_by_id = tree.descendant_id
+        )
+        INSERT INTO user_invite_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM tree
+    """)
+    op.execute("""
+        UPDATE users SET invited_count = (
+            SELECT count(*) FROM users AS invitee WHERE invitee.invited_by_id = users.id
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_refresh_token_families_user_id'), table_name='refresh_token_families')
+    op.drop_index(op.f('ix_refresh_token_families_revoked_at'), table_name='refresh_token_families')
+    op.drop_index(op.f('ix_refresh_token_families_expires_at'), table_name='refresh_token_families')
+    op.drop_table('refresh_token_families')
+    op.drop_index('ix_user_invite_closure_descendant_depth', table_name='user_invite_closure')
+    op.drop_index('ix_user_invite_closure_ancestor_depth', table_name='user_invite_closure')
+    op.drop_table('user_invite_closure')
+    op.drop_index('ix_users_invited_by_id_id', table_name='users')
+    op.drop_index(op.f('ix_users_invited_count'), table_name='users')
+    op.drop_column('users', 'invited_count')
+    op.execute(sa.schema.DropSequence(sa.Sequence('invite_code_seq')))
@@ -0,0 +1,57 @@
+"""list query indexes
+
+列表查询的复合索引（公开列表、提交列表）和排行榜的部分索引，与模型 __table_args__ 一致。
+使用 CREATE INDEX CONCURRENTLY 建索引，不阻塞线上读写；CONCURRENTLY 不能在事务中执行，
+因此放在 autocommit_block 中。建索引中途失败会留下 INVALID 索引，需要先删除再重新执行
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-18 07:07:34.230806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (索引名, 表, 列, 部分索引条件)
+INDEXES = [
+    ('ix_contents_type_status_created', 'contents', ['content_type', 'status', 'created_at'], None),
+    ('ix_contents_category_type_status_created', 'contents', ['category_id', 'content_type', 'status', 'created_at'], None),
+    ('ix_contents_created_at', 'contents', ['created_at'], None),
+    ('ix_homeworks_status_created', 'homeworks', ['status', 'created_at'], None),
+    ('ix_homeworks_category_status_created', 'homeworks', ['category_id', 'status', 'created_at'], None),
+    ('ix_homeworks_created_at', 'homeworks', ['created_at'], None),
+    ('ix_homework_submissions_homework_status_submitted', 'homework_submissions', ['homework_id', 'status', 'submitted_at'], None),
+    ('ix_homework_submissions_student_submitted', 'homework_submissions', ['student_id', 'submitted_at'], None),
+    ('ix_homework_submissions_status_submitted', 'homework_submissions', ['status', 'submitted_at'], None),
+    ('ix_homework_submissions_submitted_at', 'homework_submissions', ['submitted_at'], None),
+    ('ix_users_active_points', 'users', ['points'], 'is_active'),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,75 @@
+"""keyset pagination indexes
+
+游标分页按 (时间, id) 排序并以行比较 (created_at, id) < (:created_at, :id) 定位，
+排序索引末尾加上 id 才能把游标条件作为索引条件、按索引顺序返回。
+先并发创建新索引，再并发删除被替代的旧索引，全程不锁表
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 07:41:12.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (新索引, 表, 列, 被替代的旧索引, 旧索引的列)
+INDEXES = [
+    (
+        'ix_contents_type_status_created_id', 'contents', ['content_type', 'status', 'created_at', 'id'],
+        'ix_contents_type_status_created', ['content_type', 'status', 'created_at'],
+    ),
+    (
+        'ix_contents_category_type_status_created_id', 'contents', ['category_id', 'content_type', 'status', 'created_at', 'id'],
+        'ix_contents_category_type_status_created', ['category_id', 'content_type', 'status', 'created_at'],
+    ),
+    (
+        'ix_homeworks_status_created_id', 'homeworks', ['status', 'created_at', 'id'],
+        'ix_homeworks_status_created', ['status', 'created_at'],
+    ),
+    (
+        'ix_homeworks_category_status_created_id', 'homeworks', ['category_id', 'status', 'created_at', 'id'],
+        'ix_homeworks_category_status_created', ['category_id', 'status', 'created_at'],
+    ),
+    (
+        'ix_homework_submissions_homework_status_submitted_id', 'homework_submissions',
+        ['homework_id', 'status', 'submitted_at', 'id'],
+        'ix_homework_submissions_homework_status_submitted', ['homework_id', 'status', 'submitted_at'],
+    ),
+    (
+        'ix_homework_submissions_status_submitted_id', 'homework_submissions', ['status', 'submitted_at', 'id'],
+        'ix_homework_submissions_status_submitted', ['status', 'submitted_at'],
+    ),
+    (
+        'ix_homework_submissions_submitted_at_id', 'homework_submissions', ['submitted_at', 'id'],
+        'ix_homework_submissions_submitted_at', ['submitted_at'],
+    ),
+    ('ix_users_created_at_id', 'users', ['created_at', 'id'], None, None),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, _, _ in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for _, table, _, old_name, _ in INDEXES:
+            if old_name:
+                op.drop_index(old_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for _, table, _, old_name, old_columns in INDEXES:
+            if old_name:
+                op.create_index(
+                    old_name, table, old_columns, unique=False, postgresql_concurrently=True, if_not_exists=True
+                )
+        for name, table, _, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""admin list keyset indexes
+
+管理后台内容、作业列表改为游标分页，按创建时间排序的索引末尾加上 id（同 0003）
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 08:26:40.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (新索引, 表, 列, 被替代的旧索引, 旧索引的列)
+INDEXES = [
+    ('ix_contents_created_at_id', 'contents', ['created_at', 'id'], 'ix_contents_created_at', ['created_at']),
+    ('ix_homeworks_created_at_id', 'homeworks', ['created_at', 'id'], 'ix_homeworks_created_at', ['created_at']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, _, _ in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for _, table, _, old_name, _ in INDEXES:
+            op.drop_index(old_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for _, table, _, old_name, old_columns in INDEXES:
+            op.create_index(old_name, table, old_columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,48 @@
+"""point rollups
+
+按日/周/月汇总用户获得的积分（周期排行榜），以及回填进度表。
+回填进度记下迁移时积分记录的最大ID：之后的记录由应用写入时实时汇总，
+之前的记录由 scripts/backfill_point_rollups.py 分批回填
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 09:12:03.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('point_rollups',
+    sa.Column('period', sa.Enum('DAY', 'WEEK', 'MONTH', name='pointperiod'), nullable=False),
+    sa.Column('bucket', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('period', 'bucket', 'user_id')
+    )
+    op.create_index('ix_point_rollups_period_bucket_points', 'point_rollups', ['period', 'bucket', sa.text('points DESC'), 'user_id'], unique=False)
+    op.create_table('point_rollup_backfill',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('until_id', sa.Integer(), nullable=False),
+    sa.Column('done_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO point_rollup_backfill (id, until_id, done_id) SELECT 1, COALESCE(MAX(id), 0), 0 FROM point_records")
+
+
+def downgrade() -> None:
+    op.drop_table('point_rollup_backfill')
+    op.drop_index('ix_point_rollups_period_bucket_points', table_name='point_rollups')
+    op.drop_table('point_rollups')
+    sa.Enum(name='pointperiod').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,39 @@
+"""likes
+
+点赞记录表（用户 + 对象类型 + 对象ID 唯一），内容、帖子、评论的点赞去重。
+已有的 like_count 来自之前不去重的点赞，没有对应记录，保留原值
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 07:41:27.637099
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('likes',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('target_type', sa.Enum('CONTENT', 'POST', 'COMMENT', name='liketarget'), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'target_type', 'target_id')
+    )
+    op.create_index('ix_likes_target', 'likes', ['target_type', 'target_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_likes_target', table_name='likes')
+    op.drop_table('likes')
+    sa.Enum(name='liketarget').drop(op.get_bind(), checkfirst=True)
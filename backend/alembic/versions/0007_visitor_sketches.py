@@ -0,0 +1,40 @@
+"""visitor sketches
+
+内容、帖子、工具的独立访客数：visitor_sketch 为压缩的 HyperLogLog（p=12，约 0.1~2KB），
+visitor_count 为写入时的估计值。
+NOT NULL + 常量默认值只修改表定义，不重写已有行
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 07:50:47.554440
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contents', sa.Column('visitor_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('contents', sa.Column('visitor_sketch', sa.LargeBinary(), nullable=True))
+    op.add_column('posts', sa.Column('visitor_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('visitor_sketch', sa.LargeBinary(), nullable=True))
+    op.add_column('tools', sa.Column('visitor_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tools', sa.Column('visitor_sketch', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tools', 'visitor_sketch')
+    op.drop_column('tools', 'visitor_count')
+    op.drop_column('posts', 'visitor_sketch')
+    op.drop_column('posts', 'visitor_count')
+    op.drop_column('contents', 'visitor_sketch')
+    op.drop_column('contents', 'visitor_count')
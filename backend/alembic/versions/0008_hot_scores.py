@@ -0,0 +1,59 @@
+"""hot scores
+
+内容和帖子增加热度（存储的生成列，由计数和创建时间计算，计数更新时数据库自动重算），
+并按 (状态, 热度, id) 建索引供热门排序的游标分页使用。
+加生成列会重写整张表（期间锁表），请在低峰期执行；索引随后并发创建，不锁表
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 07:54:23.290830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HOT_SCORE = "log(greatest({}, 1)::float8) + coalesce(date_part('epoch', created_at), 0) / 86400"
+
+# (表, 互动量表达式)
+HOT_SCORES = [
+    (
+        'contents',
+        'coalesce(view_count, 0) + 5 * coalesce(like_count, 0)'
+        ' + 10 * coalesce(comment_count, 0) + 20 * coalesce(share_count, 0)',
+    ),
+    ('posts', 'coalesce(view_count, 0) + 5 * coalesce(like_count, 0) + 10 * coalesce(comment_count, 0)'),
+]
+
+# (索引, 表, 列)
+INDEXES = [
+    ('ix_contents_type_status_hot_id', 'contents', ['content_type', 'status', 'hot_score', 'id']),
+    ('ix_contents_category_type_status_hot_id', 'contents', ['category_id', 'content_type', 'status', 'hot_score', 'id']),
+    ('ix_posts_status_hot_id', 'posts', ['status', 'hot_score', 'id']),
+]
+
+
+def upgrade() -> None:
+    for table, engagement in HOT_SCORES:
+        op.add_column(table, sa.Column(
+            'hot_score', sa.Float(), sa.Computed(HOT_SCORE.format(engagement), persisted=True), nullable=False
+        ))
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    for table, _ in reversed(HOT_SCORES):
+        op.drop_column(table, 'hot_score')
@@ -1,15 +1,15 @@
 from typing import Optional, Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.services.auth_token import TokenService, decode_access_token, revoked_token_families
 from app.services.user import UserService
-from app.schemas.user import TokenPayload
+from app.schemas.user import Principal
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login",
@@ -20,40 +20,39 @@ oauth2_scheme = OAuth2PasswordBearer(
 async def get_current_user(
     db: Annotated[AsyncSession, Depends(get_db)],
     token: Annotated[Optional[str], Depends(oauth2_scheme)]
-) -> Optional[User]:
+) -> Optional[Principal]:
     """
     获取当前用户（可选认证）
     如果没有token或token无效，返回None
+    
+    令牌校验结果和用户快照均有进程内缓存，命中时不查询数据库；
+    需要完整用户信息的接口请自行通过 UserService 加载
     """
     if not token:
         return None
     
-    try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-        
-        if token_data.sub is None:
-            return None
-            
-    except JWTError:
+    # 同一令牌的重复请求命中缓存，不再做签名校验
+    token_data = decode_access_token(token)
+    if token_data is None:
         return None
     
+    # 吊销检查：布隆过滤器未命中时不访问数据库
+    if token_data.fid and revoked_token_families.might_be_revoked(token_data.fid):
+        if await TokenService(db).is_family_revoked(token_data.fid):
+            return None
+    
     user_service = UserService(db)
-    user = await user_service.get_by_id(token_data.sub)
+    principal = await user_service.get_principal(token_data.sub)
     
-    if not user or not user.is_active:
+    if not principal or not principal.is_active:
         return None
     
-    return user
+    return principal
 
 
 async def get_current_user_required(
-    current_user: Annotated[Optional[User], Depends(get_current_user)]
-) -> User:
+    current_user: Annotated[Optional[Principal], Depends(get_current_user)]
+) -> Principal:
     """
     获取当前用户（必须认证）
     如果未登录，抛出401异常
@@ -68,8 +67,8 @@ async def get_current_user_required(
 
 
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user_required)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user_required)]
+) -> Principal:
     """
     获取当前活跃用户
     """
@@ -82,8 +81,8 @@ async def get_current_active_user(
 
 
 async def get_current_admin(
-    current_user: Annotated[User, Depends(get_current_active_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
+) -> Principal:
     """
     获取当前管理员用户
     """
@@ -96,8 +95,8 @@ async def get_current_admin(
 
 
 async def get_current_super_admin(
-    current_user: Annotated[User, Depends(get_current_active_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
+) -> Principal:
     """
     获取当前超级管理员
     """
@@ -110,8 +109,8 @@ async def get_current_super_admin(
 
 
 async def get_senior_or_admin(
-    current_user: Annotated[User, Depends(get_current_active_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
+) -> Principal:
     """
     获取高级用户或管理员（可批阅作业）
     """
@@ -124,9 +123,24 @@ async def get_senior_or_admin(
     return current_user
 
 
+async def get_visitor_key(
+    request: Request,
+    current_user: Annotated[Optional[Principal], Depends(get_current_user)]
+) -> str:
+    """
+    访客标识（独立访客计数使用）
+    登录用户为用户ID，未登录为客户端IP + User-Agent
+    """
+    if current_user:
+        return f"u:{current_user.id}"
+    client_ip = request.client.host if request.client else ""
+    return f"a:{client_ip}:{request.headers.get('user-agent', '')}"
+
+
 # 类型别名，方便使用
-CurrentUser = Annotated[User, Depends(get_current_user_required)]
-CurrentActiveUser = Annotated[User, Depends(get_current_active_user)]
-CurrentAdmin = Annotated[User, Depends(get_current_admin)]
-CurrentSuperAdmin = Annotated[User, Depends(get_current_super_admin)]
-OptionalUser = Annotated[Optional[User], Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user_required)]
+CurrentActiveUser = Annotated[Principal, Depends(get_current_active_user)]
+CurrentAdmin = Annotated[Principal, Depends(get_current_admin)]
+CurrentSuperAdmin = Annotated[Principal, Depends(get_current_super_admin)]
+OptionalUser = Annotated[Optional[Principal], Depends(get_current_user)]
+VisitorKey = Annotated[str, Depends(get_visitor_key)]
@@ -1,5 +1,18 @@
 from fastapi import APIRouter
 
+from app.api.deps import CurrentAdmin
+from app.core.counters import counter_buffer, visitor_sketches
+from app.core.database import engine, replica_router
+from app.core.pagination import count_cache
+from app.core.security import password_hasher
+from app.schemas.common import ResponseData
+from app.services.auth_token import access_token_cache, revoked_token_families
+from app.services.invite_quota import invite_quota_leases
+from app.services.leaderboard import points_leaderboard
+from app.services.like import like_index
+from app.services.login_throttle import login_throttle
+from app.services.user import principal_cache
+
 router = APIRouter()
 
 
@@ -104,3 +117,25 @@ async def admin_update_config():
 async def admin_get_stats():
     """获取统计数据"""
     return {"message": "管理员-统计数据接口"}
+
+
+@router.get("/metrics", response_model=ResponseData[dict])
+async def admin_get_metrics(current_admin: CurrentAdmin):
+    """获取运行指标（本进程的数据库连接池、缓存命中率、密码哈希线程池等）"""
+    return ResponseData(data={
+        "database_pool": engine.pool.stats(),
+        "database_replica": replica_router.stats(),
+        "auth": {
+            "access_token_cache": access_token_cache.stats(),
+            "principal_cache": principal_cache.stats(),
+            "revoked_token_families": revoked_token_families.stats(),
+            "login_throttle": login_throttle.stats(),
+        },
+        "password_hasher": password_hasher.stats(),
+        "invite_quota_leases": invite_quota_leases.stats(),
+        "list_count_cache": count_cache.stats(),
+        "points_leaderboard": points_leaderboard.stats(),
+        "counter_buffer": counter_buffer.stats(),
+        "visitor_sketches": visitor_sketches.stats(),
+        "like_index": like_index.stats(),
+    })
@@ -1,16 +1,19 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import CurrentActiveUser
 from app.core.database import get_db
-from app.core.security import create_access_token
+from app.services.auth_token import TokenService
+from app.services.login_throttle import login_throttle
 from app.services.user import UserService
 from app.schemas.user import (
     UserRegister, 
     UserInDB, 
     Token, 
+    RefreshTokenRequest,
     InviteCodeValidate,
     InviteCodeResponse,
     UserPublic
@@ -52,6 +55,7 @@ async def register(
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
@@ -61,8 +65,19 @@ async def login(
     - **username**: 用户名或邮箱
     - **password**: 密码
     
-    返回JWT Token
+    返回短期访问令牌和刷新令牌；连续失败过多时返回429
     """
+    client_ip = request.client.host if request.client else None
+    
+    # 封禁中的账号/IP在密码校验之前直接拒绝
+    retry_after = await login_throttle.retry_after(form_data.username, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"登录失败次数过多，请{retry_after}秒后重试",
+            headers={"Retry-After": str(retry_after)},
+        )
+    
     user_service = UserService(db)
     
     user = await user_service.authenticate(
@@ -71,6 +86,7 @@ async def login(
     )
     
     if not user:
+        await login_throttle.record_failure(form_data.username, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
@@ -83,13 +99,13 @@ async def login(
             detail="账号已被禁用"
         )
     
+    await login_throttle.record_success(form_data.username)
+    
     # 更新最后登录时间
     await user_service.update_last_login(user)
     
-    # 生成Token
-    access_token = create_access_token(subject=user.id)
-    
-    return Token(access_token=access_token)
+    # 生成Token（每次登录一个新的令牌族）
+    return await TokenService(db).issue(user.id)
 
 
 @router.post("/validate-invite-code", response_model=InviteCodeResponse)
@@ -118,26 +134,65 @@ async def validate_invite_code(
 
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    data: RefreshTokenRequest,
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
     """
     用户登出
     
-    客户端需要删除本地存储的Token
+    - **refresh_token**: 刷新令牌
+    
+    吊销该次登录的令牌族，对应的访问令牌随之失效；客户端仍需删除本地Token
     """
+    token_service = TokenService(db)
+    payload = token_service.decode_refresh_token(data.refresh_token)
+    if payload:
+        await token_service.revoke_family(payload.fid, "logout")
+    
     return {"message": "登出成功，请在客户端删除Token"}
 
 
+@router.post("/logout-all")
+async def logout_all(
+    current_user: CurrentActiveUser,
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    退出所有设备
+    
+    吊销当前用户的全部令牌族
+    """
+    revoked = await TokenService(db).revoke_user(current_user.id, "logout")
+    
+    return {"message": f"已退出{revoked}个登录会话"}
+
+
 @router.post("/refresh", response_model=Token)
-async def refresh_token():
+async def refresh_token(
+    data: RefreshTokenRequest,
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
     """
-    刷新Token（预留接口）
+    刷新Token
     
-    TODO: 实现Refresh Token机制
+    - **refresh_token**: 刷新令牌
+    
+    返回新的访问令牌和刷新令牌，旧刷新令牌立即失效；
+    已失效的刷新令牌再次使用会吊销整个登录会话
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="功能开发中"
-    )
+    token, message = await TokenService(db).rotate(data.refresh_token)
+    
+    if not token:
+        # 重放检测产生的吊销需要在返回401前提交
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=message,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return token
 
 
 @router.post("/forgot-password")
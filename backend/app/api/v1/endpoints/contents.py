@@ -1,15 +1,59 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
+from sqlalchemy.orm import defer
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.counters import counter_buffer, visitor_sketches
+from app.core.database import get_db, get_read_db
+from app.core.pagination import CountMode, paginate
+from app.core.responses import JSONSerializer
 from app.models.content import Content, ContentType, ContentStatus, Category
-from app.schemas.content import ContentCreate, ContentUpdate, ContentResponse, ContentListResponse
-from app.api.deps import CurrentAdmin
+from app.models.like import LikeTarget
+from app.schemas.content import (
+    ContentCreate,
+    ContentUpdate,
+    ContentResponse,
+    ContentListResponse,
+    ContentPage,
+    ContentSort,
+    CategoryListResponse
+)
+from app.api.deps import CurrentActiveUser, CurrentAdmin, OptionalUser, VisitorKey
+from app.services.like import LikeService, like_index
 
 router = APIRouter()
 
+# 列表不加载简介、正文等大字段（只在详情中返回）；误用时直接报错，不会逐行懒加载
+CONTENT_LIST_OPTIONS = (
+    defer(Content.description, raiseload=True),
+    defer(Content.body, raiseload=True),
+    defer(Content.video_url, raiseload=True),
+)
+
+# 公开列表的排序键：热度为预先计算的存储列，与发布时间一样直接按索引顺序分页
+CONTENT_SORT_KEYS = {
+    ContentSort.LATEST: [Content.created_at, Content.id],
+    ContentSort.HOT: [Content.hot_score, Content.id],
+}
+
+# 响应序列化器（导入时构建一次，直接从 ORM 对象输出 JSON）
+content_response = JSONSerializer(ContentResponse)
+content_list_response = JSONSerializer(ContentListResponse)
+content_page_response = JSONSerializer(ContentPage)
+category_list_response = JSONSerializer(CategoryListResponse)
+
+
+def count_view(content: Content, visitor: str) -> None:
+    """
+    记录一次浏览：浏览数累加到计数写缓冲，访客加入独立访客估计（都定期批量写入），详情接口不再写数据库；
+    返回的浏览数包含本进程尚未写入的次数，独立访客数为上次写入时的估计
+    """
+    visitor_sketches.add(Content, content.id, visitor)
+    pending = counter_buffer.incr(Content.view_count, content.id)
+    set_committed_value(content, "view_count", (content.view_count or 0) + pending)
+
 
 # === 管理员内容管理 ===
 @router.get("/admin/contents", response_model=ContentListResponse)
@@ -19,11 +63,12 @@ async def admin_get_contents(
     content_type: Optional[ContentType] = None,
     status: Optional[ContentStatus] = None,
     category_id: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_admin: CurrentAdmin = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """管理员获取内容列表"""
-    query = select(Content)
+    """管理员获取内容列表（cursor 为上一页返回的 next_cursor/prev_cursor，优先于 skip）"""
+    query = select(Content).options(*CONTENT_LIST_OPTIONS)
     
     if content_type:
         query = query.where(Content.content_type == content_type)
@@ -32,29 +77,36 @@ async def admin_get_contents(
     if category_id:
         query = query.where(Content.category_id == category_id)
     
-    # 获取总数
-    count_query = select(func.count()).select_from(Content)
-    if content_type:
-        count_query = count_query.where(Content.content_type == content_type)
-    if status:
-        count_query = count_query.where(Content.status == status)
-    if category_id:
-        count_query = count_query.where(Content.category_id == category_id)
+    # 列表和总数一条语句取回
+    page = await paginate(
+        db, query, [Content.created_at, Content.id],
+        limit=limit, cursor=cursor, skip=skip, count=CountMode.EXACT
+    )
     
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    return content_list_response.response({
+        "items": page.items,
+        "total": page.total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    })
+
+
+@router.get("/admin/contents/{content_id}", response_model=ContentResponse)
+async def admin_get_content(
+    content_id: int,
+    current_admin: CurrentAdmin = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """管理员获取内容详情（含正文，任意状态）"""
+    result = await db.execute(select(Content).where(Content.id == content_id))
+    content = result.scalar_one_or_none()
     
-    # 获取列表
-    query = query.order_by(Content.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    contents = result.scalars().all()
+    if not content:
+        raise HTTPException(status_code=404, detail="内容不存在")
     
-    return {
-        "items": contents,
-        "total": total,
-        "skip": skip,
-        "limit": limit
-    }
+    return content_response.response(content)
 
 
 @router.post("/admin/contents", response_model=ContentResponse)
@@ -109,21 +161,25 @@ async def admin_delete_content(
     if not content:
         raise HTTPException(status_code=404, detail="内容不存在")
     
+    await LikeService(db).delete_target(LikeTarget.CONTENT, content_id)
     await db.delete(content)
     await db.commit()
     return {"message": "删除成功"}
 
 
 # === 公开内容接口 ===
-@router.get("/videos")
+@router.get("/videos", response_model=ContentPage)
 async def get_videos(
     skip: int = 0,
     limit: int = 20,
     category_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db)
+    sort: ContentSort = ContentSort.LATEST,
+    cursor: Optional[str] = None,
+    current_user: OptionalUser = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取视频列表"""
-    query = select(Content).where(
+    """获取视频列表（sort=hot 按热度排序；cursor 为上一页返回的 next_cursor/prev_cursor，须与 sort 一致，优先于 skip）"""
+    query = select(Content).options(*CONTENT_LIST_OPTIONS).where(
         Content.content_type == ContentType.VIDEO,
         Content.status == ContentStatus.PUBLISHED
     )
@@ -131,15 +187,27 @@ async def get_videos(
     if category_id:
         query = query.where(Content.category_id == category_id)
     
-    query = query.order_by(Content.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    videos = result.scalars().all()
+    page = await paginate(
+        db, query, CONTENT_SORT_KEYS[sort],
+        limit=limit, cursor=cursor, skip=skip, count=CountMode.EXACT
+    )
+    await like_index.mark(db, current_user.id if current_user else None, LikeTarget.CONTENT, page.items)
     
-    return {"items": videos, "total": len(videos)}
+    return content_page_response.response({
+        "items": page.items,
+        "total": page.total,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    })
 
 
-@router.get("/videos/{video_id}")
-async def get_video(video_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("/videos/{video_id}", response_model=ContentResponse)
+async def get_video(
+    video_id: int,
+    visitor: VisitorKey,
+    current_user: OptionalUser = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """获取视频详情"""
     result = await db.execute(
         select(Content).where(
@@ -152,22 +220,24 @@ async def get_video(video_id: int, db: AsyncSession = Depends(get_db)):
     if not video:
         raise HTTPException(status_code=404, detail="视频不存在")
     
-    # 增加浏览次数
-    video.view_count += 1
-    await db.commit()
+    count_view(video, visitor)
+    await like_index.mark(db, current_user.id if current_user else None, LikeTarget.CONTENT, [video])
     
-    return video
+    return content_response.response(video)
 
 
-@router.get("/articles")
+@router.get("/articles", response_model=ContentPage)
 async def get_articles(
     skip: int = 0,
     limit: int = 20,
     category_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db)
+    sort: ContentSort = ContentSort.LATEST,
+    cursor: Optional[str] = None,
+    current_user: OptionalUser = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取图文列表"""
-    query = select(Content).where(
+    """获取图文列表（sort=hot 按热度排序；cursor 为上一页返回的 next_cursor/prev_cursor，须与 sort 一致，优先于 skip）"""
+    query = select(Content).options(*CONTENT_LIST_OPTIONS).where(
         Content.content_type == ContentType.ARTICLE,
         Content.status == ContentStatus.PUBLISHED
     )
@@ -175,15 +245,27 @@ async def get_articles(
     if category_id:
         query = query.where(Content.category_id == category_id)
     
-    query = query.order_by(Content.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    articles = result.scalars().all()
+    page = await paginate(
+        db, query, CONTENT_SORT_KEYS[sort],
+        limit=limit, cursor=cursor, skip=skip, count=CountMode.EXACT
+    )
+    await like_index.mark(db, current_user.id if current_user else None, LikeTarget.CONTENT, page.items)
     
-    return {"items": articles, "total": len(articles)}
+    return content_page_response.response({
+        "items": page.items,
+        "total": page.total,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    })
 
 
-@router.get("/articles/{article_id}")
-async def get_article(article_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("/articles/{article_id}", response_model=ContentResponse)
+async def get_article(
+    article_id: int,
+    visitor: VisitorKey,
+    current_user: OptionalUser = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """获取图文详情"""
     result = await db.execute(
         select(Content).where(
@@ -196,32 +278,48 @@ async def get_article(article_id: int, db: AsyncSession = Depends(get_db)):
     if not article:
         raise HTTPException(status_code=404, detail="文章不存在")
     
-    article.view_count += 1
-    await db.commit()
+    count_view(article, visitor)
+    await like_index.mark(db, current_user.id if current_user else None, LikeTarget.CONTENT, [article])
     
-    return article
+    return content_response.response(article)
 
 
-@router.get("/podcasts")
+@router.get("/podcasts", response_model=ContentPage)
 async def get_podcasts(
     skip: int = 0,
     limit: int = 20,
-    db: AsyncSession = Depends(get_db)
+    sort: ContentSort = ContentSort.LATEST,
+    cursor: Optional[str] = None,
+    current_user: OptionalUser = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取播客列表"""
-    query = select(Content).where(
+    """获取播客列表（sort=hot 按热度排序；cursor 为上一页返回的 next_cursor/prev_cursor，须与 sort 一致，优先于 skip）"""
+    query = select(Content).options(*CONTENT_LIST_OPTIONS).where(
         Content.content_type == ContentType.PODCAST,
         Content.status == ContentStatus.PUBLISHED
-    ).order_by(Content.created_at.desc()).offset(skip).limit(limit)
+    )
     
-    result = await db.execute(query)
-    podcasts = result.scalars().all()
+    page = await paginate(
+        db, query, CONTENT_SORT_KEYS[sort],
+        limit=limit, cursor=cursor, skip=skip, count=CountMode.EXACT
+    )
+    await like_index.mark(db, current_user.id if current_user else None, LikeTarget.CONTENT, page.items)
     
-    return {"items": podcasts, "total": len(podcasts)}
+    return content_page_response.response({
+        "items": page.items,
+        "total": page.total,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    })
 
 
-@router.get("/podcasts/{podcast_id}")
-async def get_podcast(podcast_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("/podcasts/{podcast_id}", response_model=ContentResponse)
+async def get_podcast(
+    podcast_id: int,
+    visitor: VisitorKey,
+    current_user: OptionalUser = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """获取播客详情"""
     result = await db.execute(
         select(Content).where(
@@ -234,32 +332,47 @@ async def get_podcast(podcast_id: int, db: AsyncSession = Depends(get_db)):
     if not podcast:
         raise HTTPException(status_code=404, detail="播客不存在")
     
-    podcast.view_count += 1
-    await db.commit()
+    count_view(podcast, visitor)
+    await like_index.mark(db, current_user.id if current_user else None, LikeTarget.CONTENT, [podcast])
     
-    return podcast
+    return content_response.response(podcast)
 
 
-@router.get("/categories")
-async def get_categories(db: AsyncSession = Depends(get_db)):
+@router.get("/categories", response_model=CategoryListResponse)
+async def get_categories(db: AsyncSession = Depends(get_read_db)):
     """获取内容分类"""
     result = await db.execute(
         select(Category).order_by(Category.sort_order)
     )
     categories = result.scalars().all()
-    return {"items": categories}
+    return category_list_response.response({"items": categories})
 
 
 @router.post("/{content_id}/like")
-async def like_content(content_id: int, db: AsyncSession = Depends(get_db)):
-    """点赞内容"""
-    result = await db.execute(select(Content).where(Content.id == content_id))
-    content = result.scalar_one_or_none()
-    
-    if not content:
+async def like_content(
+    content_id: int,
+    current_user: CurrentActiveUser = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """点赞内容（重复点赞不重复计数）"""
+    like_count = await LikeService(db).like(current_user.id, LikeTarget.CONTENT, content_id)
+    if like_count is None:
         raise HTTPException(status_code=404, detail="内容不存在")
     
-    content.like_count += 1
     await db.commit()
+    return {"message": "点赞成功", "liked": True, "like_count": like_count}
+
+
+@router.delete("/{content_id}/like")
+async def unlike_content(
+    content_id: int,
+    current_user: CurrentActiveUser = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """取消点赞内容"""
+    like_count = await LikeService(db).unlike(current_user.id, LikeTarget.CONTENT, content_id)
+    if like_count is None:
+        raise HTTPException(status_code=404, detail="内容不存在")
     
-    return {"message": "点赞成功", "like_count": content.like_count}
+    await db.commit()
+    return {"message": "已取消点赞", "liked": False, "like_count": like_count}
@@ -1,4 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import CurrentActiveUser
+from app.core.database import get_db
+from app.models.like import LikeTarget
+from app.services.like import LikeService
 
 router = APIRouter()
 
@@ -52,6 +58,60 @@ async def create_comment(post_id: int):
 
 
 @router.post("/posts/{post_id}/like")
-async def like_post(post_id: int):
-    """点赞帖子"""
-    return {"message": f"点赞帖子{post_id}接口"}
+async def like_post(
+    post_id: int,
+    current_user: CurrentActiveUser = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """点赞帖子（重复点赞不重复计数）"""
+    like_count = await LikeService(db).like(current_user.id, LikeTarget.POST, post_id)
+    if like_count is None:
+        raise HTTPException(status_code=404, detail="帖子不存在")
+    
+    await db.commit()
+    return {"message": "点赞成功", "liked": True, "like_count": like_count}
+
+
+@router.delete("/posts/{post_id}/like")
+async def unlike_post(
+    post_id: int,
+    current_user: CurrentActiveUser = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """取消点赞帖子"""
+    like_count = await LikeService(db).unlike(current_user.id, LikeTarget.POST, post_id)
+    if like_count is None:
+        raise HTTPException(status_code=404, detail="帖子不存在")
+    
+    await db.commit()
+    return {"message": "已取消点赞", "liked": False, "like_count": like_count}
+
+
+@router.post("/comments/{comment_id}/like")
+async def like_comment(
+    comment_id: int,
+    current_user: CurrentActiveUser = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """点赞评论（帖子和内容下的评论，重复点赞不重复计数）"""
+    like_count = await LikeService(db).like(current_user.id, LikeTarget.COMMENT, comment_id)
+    if like_count is None:
+        raise HTTPException(status_code=404, detail="评论不存在")
+    
+    await db.commit()
+    return {"message": "点赞成功", "liked": True, "like_count": like_count}
+
+
+@router.delete("/comments/{comment_id}/like")
+async def unlike_comment(
+    comment_id: int,
+    current_user: CurrentActiveUser = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """取消点赞评论"""
+    like_count = await LikeService(db).unlike(current_user.id, LikeTarget.COMMENT, comment_id)
+    if like_count is None:
+        raise HTTPException(status_code=404, detail="评论不存在")
+    
+    await db.commit()
+    return {"message": "已取消点赞", "liked": False, "like_count": like_count}
@@ -1,50 +1,75 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
+from sqlalchemy.orm import defer
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import CountMode, paginate
+from app.core.responses import JSONSerializer
 from app.models.homework import Homework, HomeworkSubmission, HomeworkReview, HomeworkStatus, SubmissionStatus
+from app.schemas.homework import (
+    HomeworkResponse,
+    HomeworkListResponse,
+    SubmissionResponse,
+    SubmissionListResponse,
+    MySubmissionsResponse
+)
 from app.api.deps import CurrentUser, CurrentAdmin
 from datetime import datetime
 
 router = APIRouter()
 
+# 列表不加载作业说明、要求和提交内容（只在详情中返回）；误用时直接报错，不会逐行懒加载
+HOMEWORK_LIST_OPTIONS = (
+    defer(Homework.description, raiseload=True),
+    defer(Homework.requirements, raiseload=True),
+    defer(Homework.reference_materials, raiseload=True),
+)
+SUBMISSION_LIST_OPTIONS = (
+    defer(HomeworkSubmission.content, raiseload=True),
+    defer(HomeworkSubmission.attachments, raiseload=True),
+)
+
+# 响应序列化器（导入时构建一次，直接从 ORM 对象输出 JSON）
+homework_response = JSONSerializer(HomeworkResponse)
+homework_list_response = JSONSerializer(HomeworkListResponse)
+submission_response = JSONSerializer(SubmissionResponse)
+submission_list_response = JSONSerializer(SubmissionListResponse)
+my_submissions_response = JSONSerializer(MySubmissionsResponse)
+
 
 # === 管理员作业管理 ===
-@router.get("/admin/homeworks")
+@router.get("/admin/homeworks", response_model=HomeworkListResponse)
 async def admin_get_homeworks(
     skip: int = 0,
     limit: int = 20,
     status: Optional[HomeworkStatus] = None,
     category_id: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_admin: CurrentAdmin = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """管理员获取作业列表"""
-    query = select(Homework)
+    """管理员获取作业列表（cursor 为上一页返回的 next_cursor/prev_cursor，优先于 skip）"""
+    query = select(Homework).options(*HOMEWORK_LIST_OPTIONS)
     
     if status:
         query = query.where(Homework.status == status)
     if category_id:
         query = query.where(Homework.category_id == category_id)
     
-    # 获取总数
-    count_query = select(func.count()).select_from(Homework)
-    if status:
-        count_query = count_query.where(Homework.status == status)
-    if category_id:
-        count_query = count_query.where(Homework.category_id == category_id)
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # 获取列表
-    query = query.order_by(Homework.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    homeworks = result.scalars().all()
+    # 列表和总数一条语句取回
+    page = await paginate(
+        db, query, [Homework.created_at, Homework.id],
+        limit=limit, cursor=cursor, skip=skip, count=CountMode.EXACT
+    )
     
-    return {"items": homeworks, "total": total}
+    return homework_list_response.response({
+        "items": page.items,
+        "total": page.total,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    })
 
 
 @router.post("/admin/homeworks")
@@ -128,28 +153,55 @@ async def admin_delete_homework(
     return {"message": "删除成功"}
 
 
-@router.get("/admin/submissions")
+@router.get("/admin/submissions", response_model=SubmissionListResponse)
 async def admin_get_submissions(
     skip: int = 0,
     limit: int = 20,
     homework_id: Optional[int] = None,
     status: Optional[SubmissionStatus] = None,
+    cursor: Optional[str] = None,
     current_admin: CurrentAdmin = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """管理员获取作业提交列表"""
-    query = select(HomeworkSubmission)
+    """管理员获取作业提交列表（cursor 为上一页返回的 next_cursor/prev_cursor，优先于 skip）"""
+    query = select(HomeworkSubmission).options(*SUBMISSION_LIST_OPTIONS)
     
     if homework_id:
         query = query.where(HomeworkSubmission.homework_id == homework_id)
     if status:
         query = query.where(HomeworkSubmission.status == status)
     
-    query = query.order_by(HomeworkSubmission.submitted_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    submissions = result.scalars().all()
+    # 提交表数据量最大，总数用规划器估计值（筛选后行数较少时仍精确计数）
+    page = await paginate(
+        db, query, [HomeworkSubmission.submitted_at, HomeworkSubmission.id],
+        limit=limit, cursor=cursor, skip=skip, count=CountMode.ESTIMATE
+    )
     
-    return {"items": submissions}
+    return submission_list_response.response({
+        "items": page.items,
+        "total": page.total,
+        "total_estimated": page.total_estimated,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    })
+
+
+@router.get("/admin/submissions/{submission_id}", response_model=SubmissionResponse)
+async def admin_get_submission(
+    submission_id: int,
+    current_admin: CurrentAdmin = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """管理员获取提交详情（含提交内容）"""
+    result = await db.execute(
+        select(HomeworkSubmission).where(HomeworkSubmission.id == submission_id)
+    )
+    submission = result.scalar_one_or_none()
+    
+    if not submission:
+        raise HTTPException(status_code=404, detail="提交不存在")
+    
+    return submission_response.response(submission)
 
 
 @router.post("/admin/submissions/{submission_id}/review")
@@ -203,28 +255,35 @@ async def admin_review_submission(
 
 
 # === 公开作业接口 ===
-@router.get("/")
+@router.get("/", response_model=HomeworkListResponse)
 async def get_homeworks(
     skip: int = 0,
     limit: int = 20,
     category_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取作业列表"""
-    query = select(Homework).where(Homework.status == HomeworkStatus.PUBLISHED)
+    """获取作业列表（cursor 为上一页返回的 next_cursor/prev_cursor，优先于 skip）"""
+    query = select(Homework).options(*HOMEWORK_LIST_OPTIONS).where(Homework.status == HomeworkStatus.PUBLISHED)
     
     if category_id:
         query = query.where(Homework.category_id == category_id)
     
-    query = query.order_by(Homework.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    homeworks = result.scalars().all()
+    page = await paginate(
+        db, query, [Homework.created_at, Homework.id],
+        limit=limit, cursor=cursor, skip=skip, count=CountMode.EXACT
+    )
     
-    return {"items": homeworks}
+    return homework_list_response.response({
+        "items": page.items,
+        "total": page.total,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    })
 
 
-@router.get("/{homework_id}")
-async def get_homework(homework_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("/{homework_id}", response_model=HomeworkResponse)
+async def get_homework(homework_id: int, db: AsyncSession = Depends(get_read_db)):
     """获取作业详情"""
     result = await db.execute(select(Homework).where(Homework.id == homework_id))
     homework = result.scalar_one_or_none()
@@ -232,7 +291,7 @@ async def get_homework(homework_id: int, db: AsyncSession = Depends(get_db)):
     if not homework:
         raise HTTPException(status_code=404, detail="作业不存在")
     
-    return homework
+    return homework_response.response(homework)
 
 
 @router.post("/{homework_id}/submit")
@@ -277,7 +336,7 @@ async def submit_homework(
     return {"message": "提交成功"}
 
 
-@router.get("/my/submissions")
+@router.get("/my/submissions", response_model=MySubmissionsResponse)
 async def get_my_submissions(
     current_user: CurrentUser = None,
     db: AsyncSession = Depends(get_db)
@@ -290,4 +349,4 @@ async def get_my_submissions(
     )
     submissions = result.scalars().all()
     
-    return {"items": submissions}
+    return my_submissions_response.response({"items": submissions})
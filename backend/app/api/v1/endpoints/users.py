@@ -1,12 +1,19 @@
 from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, or_
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import CountMode, paginate
+from app.core.responses import JSONSerializer
 from app.api.deps import CurrentActiveUser, OptionalUser, CurrentAdmin
+from app.services.auth_token import TokenService
 from app.services.user import UserService
+from app.services.invite_tree import InviteTreeService
+from app.services.leaderboard import points_leaderboard
+from app.services.points import PointService
+from app.models.points import PointActionType, PointPeriod
 from app.models.user import User, UserRole
 from app.schemas.user import (
     UserInDB,
@@ -14,12 +21,24 @@ from app.schemas.user import (
     UserProfile,
     UserUpdate,
     InviteCodeInfo,
-    UserAdminUpdate
+    InviteTreeStats,
+    TopInviter,
+    UserAdminUpdate,
+    LeaderboardEntry
 )
 from app.schemas.common import ResponseData, ResponseList
 
 router = APIRouter()
 
+# 响应序列化器（导入时构建一次，直接从 ORM 对象输出 JSON）
+user_profile_response = JSONSerializer(ResponseData[UserProfile])
+user_profile_list_response = JSONSerializer(ResponseList[UserProfile])
+user_public_response = JSONSerializer(ResponseData[UserPublic])
+user_public_list_response = JSONSerializer(ResponseList[UserPublic])
+top_inviter_list_response = JSONSerializer(ResponseList[TopInviter])
+leaderboard_response = JSONSerializer(ResponseList[LeaderboardEntry])
+invite_code_response = JSONSerializer(ResponseData[InviteCodeInfo])
+
 
 # === 管理员用户管理接口 ===
 @router.get("/admin/users", response_model=ResponseList[UserProfile])
@@ -30,9 +49,10 @@ async def admin_get_users(
     limit: int = 20,
     search: Optional[str] = None,
     role: Optional[UserRole] = None,
-    is_active: Optional[bool] = None
+    is_active: Optional[bool] = None,
+    cursor: Optional[str] = None
 ):
-    """管理员获取用户列表"""
+    """管理员获取用户列表（cursor 为上一页返回的 next_cursor/prev_cursor，优先于 skip）"""
     query = select(User)
     
     if search:
@@ -50,35 +70,19 @@ async def admin_get_users(
     if is_active is not None:
         query = query.where(User.is_active == is_active)
     
-    # 获取总数
-    count_query = select(func.count()).select_from(User)
-    if search:
-        count_query = count_query.where(
-            or_(
-                User.username.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%"),
-                User.nickname.ilike(f"%{search}%")
-            )
-        )
-    if role:
-        count_query = count_query.where(User.role == role)
-    if is_active is not None:
-        count_query = count_query.where(User.is_active == is_active)
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # 获取用户列表
-    query = query.order_by(User.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    users = result.scalars().all()
-    
-    users_profile = [UserProfile.model_validate(u) for u in users]
-    
-    return ResponseList(
-        data=users_profile,
-        total=total
+    # 列表和总数；用户表较大，总数用规划器估计值（筛选后行数较少时仍精确计数）
+    page = await paginate(
+        db, query, [User.created_at, User.id],
+        limit=limit, cursor=cursor, skip=skip, count=CountMode.ESTIMATE
     )
+    
+    return user_profile_list_response.response({
+        "data": page.items,
+        "total": page.total,
+        "total_estimated": page.total_estimated,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    })
 
 
 @router.get("/admin/users/{user_id}", response_model=ResponseData[UserProfile])
@@ -97,7 +101,7 @@ async def admin_get_user(
             detail="用户不存在"
         )
     
-    return ResponseData(data=UserProfile.model_validate(user))
+    return user_profile_response.response({"data": user})
 
 
 @router.put("/admin/users/{user_id}", response_model=ResponseData[UserProfile])
@@ -118,9 +122,13 @@ async def admin_update_user(
         )
     
     # 更新字段
-    for key, value in user_data.dict(exclude_unset=True).items():
+    update_data = user_data.dict(exclude_unset=True)
+    for key, value in update_data.items():
         setattr(user, key, value)
     
+    UserService(db).invalidate_principal(user_id)
+    if "points" in update_data or "is_active" in update_data:
+        points_leaderboard.track(db, user)
     await db.commit()
     await db.refresh(user)
     
@@ -147,6 +155,9 @@ async def admin_ban_user(
         )
     
     user.is_active = False
+    UserService(db).invalidate_principal(user_id)
+    points_leaderboard.track(db, user)
+    await TokenService(db).revoke_user(user_id, "banned")
     await db.commit()
     
     return ResponseData(message="用户已封禁")
@@ -169,6 +180,8 @@ async def admin_unban_user(
         )
     
     user.is_active = True
+    UserService(db).invalidate_principal(user_id)
+    points_leaderboard.track(db, user)
     await db.commit()
     
     return ResponseData(message="用户已解封")
@@ -184,7 +197,7 @@ async def admin_adjust_points(
 ):
     """管理员调整用户积分"""
     user_service = UserService(db)
-    user = await user_service.add_points(user_id, points)
+    user = await user_service.add_points(user_id, points, reason, PointActionType.ADMIN_GRANT)
     
     if not user:
         raise HTTPException(
@@ -198,6 +211,45 @@ async def admin_adjust_points(
     )
 
 
+@router.get("/admin/invite-tree/top-inviters", response_model=ResponseList[TopInviter])
+async def admin_get_top_inviters(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_admin: CurrentAdmin = None,
+    limit: int = 10
+):
+    """
+    管理员获取邀请排行
+    
+    - **limit**: 返回数量（默认10，最多100）
+    """
+    limit = min(limit, 100)
+    inviters = await InviteTreeService(db).get_top_inviters(limit)
+    
+    return top_inviter_list_response.response({
+        "data": inviters,
+        "total": len(inviters),
+        "page_size": limit
+    })
+
+
+@router.get("/admin/users/{user_id}/invite-tree", response_model=ResponseData[InviteTreeStats])
+async def admin_get_invite_tree(
+    user_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_admin: CurrentAdmin = None
+):
+    """管理员获取用户邀请树统计（层级、直接邀请数、下级总人数）"""
+    stats = await InviteTreeService(db).get_stats(user_id)
+    
+    if not stats:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="用户不存在"
+        )
+    
+    return ResponseData(data=stats)
+
+
 # === 普通用户接口 ===
 @router.get("/me", response_model=ResponseData[UserProfile])
 async def get_current_user_info(
@@ -208,12 +260,9 @@ async def get_current_user_info(
     获取当前用户信息
     """
     user_service = UserService(db)
-    invited_users = await user_service.get_invited_users(current_user.id)
+    user = await user_service.get_by_id(current_user.id)
     
-    user_data = UserProfile.model_validate(current_user)
-    user_data.invited_count = len(invited_users)
-    
-    return ResponseData(data=user_data)
+    return user_profile_response.response({"data": user})
 
 
 @router.put("/me", response_model=ResponseData[UserInDB])
@@ -259,80 +308,107 @@ async def get_my_points(current_user: CurrentActiveUser):
     })
 
 
+@router.get("/me/rank")
+async def get_my_rank(
+    current_user: CurrentActiveUser,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    period: Optional[PointPeriod] = None
+):
+    """
+    获取我的积分排名（1 + 积分比我高的活跃用户数，同分并列）
+    
+    - **period**: day / week / month 按本日、本周、本月获得的积分排名；不传为总积分排名
+    """
+    if period is None:
+        rank, points = await points_leaderboard.rank(db, current_user.id, current_user.points)
+    else:
+        rank, points = await PointService(db).get_rank(period, current_user.id)
+    return ResponseData(data={
+        "rank": rank,
+        "points": points
+    })
+
+
 @router.get("/me/invite-code", response_model=ResponseData[InviteCodeInfo])
 async def get_my_invite_code(
     current_user: CurrentActiveUser,
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)],
+    limit: int = 20
 ):
     """
     获取我的邀请码信息
+    
+    - **limit**: 附带的最近邀请用户数量（默认20，最多100）
     """
     user_service = UserService(db)
-    invited_users = await user_service.get_invited_users(current_user.id)
-    
-    invited_public = [UserPublic.model_validate(u) for u in invited_users]
+    user = await user_service.get_by_id(current_user.id)
+    invited_users = await user_service.get_invited_users(
+        current_user.id, limit=min(limit, 100)
+    )
     
-    return ResponseData(data=InviteCodeInfo(
-        code=current_user.invite_code,
-        remaining_quota=current_user.invite_quota,
-        invited_users=invited_public
-    ))
+    return invite_code_response.response({"data": {
+        "code": user.invite_code,
+        "remaining_quota": user.invite_quota,
+        "invited_users": invited_users
+    }})
 
 
 @router.get("/me/invited-users", response_model=ResponseList[UserPublic])
 async def get_my_invited_users(
     current_user: CurrentActiveUser,
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)],
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
 ):
     """
-    获取我邀请的用户列表
+    获取我邀请的用户列表（分页）
+    
+    - **skip**: 跳过数量
+    - **limit**: 每页数量（默认20，最多100）
     """
     user_service = UserService(db)
-    invited_users = await user_service.get_invited_users(current_user.id)
-    
-    users_public = [UserPublic.model_validate(u) for u in invited_users]
-    
-    return ResponseList(
-        data=users_public,
-        total=len(users_public)
-    )
+    user = await user_service.get_by_id(current_user.id)
+    invited_users = await user_service.get_invited_users(current_user.id, skip, limit)
+    
+    return user_public_list_response.response({
+        "data": invited_users,
+        "total": user.invited_count,
+        "page": skip // limit + 1,
+        "page_size": limit
+    })
 
 
-@router.get("/leaderboard", response_model=ResponseList[UserPublic])
+@router.get("/leaderboard", response_model=ResponseList[LeaderboardEntry])
 async def get_leaderboard(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    limit: int = 10
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    limit: int = 10,
+    period: Optional[PointPeriod] = None
 ):
     """
     获取用户积分排行榜
     
     - **limit**: 返回数量（默认10，最多50）
-    """
-    from sqlalchemy import select
-    from app.models.user import User
-    
-    limit = min(limit, 50)
-    
-    result = await db.execute(
-        select(User)
-        .where(User.is_active == True)
-        .order_by(User.points.desc())
-        .limit(limit)
-    )
-    users = result.scalars().all()
-    
-    users_public = [UserPublic.model_validate(u) for u in users]
+    - **period**: day / week / month 按本日、本周、本月获得的积分排行（points 为周期内获得的积分）；
+      不传为总积分排行
     
-    return ResponseList(
-        data=users_public,
-        total=len(users_public)
-    )
+    总积分排名取自进程内维护的有序集合，只按ID查询这几个用户；周期排行读取积分汇总表
+    """
+    limit = max(1, min(limit, 50))
+    if period is None:
+        users = await points_leaderboard.top(db, limit)
+    else:
+        users = await PointService(db).get_leaderboard(period, limit)
+    
+    return leaderboard_response.response({
+        "data": users,
+        "total": len(users)
+    })
 
 
 @router.get("/{user_id}", response_model=ResponseData[UserPublic])
 async def get_user_profile(
     user_id: int,
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)]
 ):
     """
     获取用户公开信息
@@ -346,4 +422,4 @@ async def get_user_profile(
             detail="用户不存在"
         )
     
-    return ResponseData(data=UserPublic.model_validate(user))
+    return user_public_response.response({"data": user})
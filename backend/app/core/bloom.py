@@ -0,0 +1,67 @@
+import math
+from typing import Any, Hashable
+
+
+class BloomFilter:
+    """
+    布隆过滤器（位数组 + 双重哈希）
+
+    - capacity: 预期元素数量
+    - error_rate: 达到预期数量时的误报率
+    只会误报不会漏报；元素不能删除，需要时整体重建。
+    探测位置由内置 hash() 派生（字符串哈希按进程随机化），只能在进程内使用，不能持久化
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        # 位数取2的幂，取模改为按位与
+        self.size = 1 << max(bits - 1, 63).bit_length()
+        # 位数向上取整后，用满足误报率的最少哈希次数，减少每次查询的探测
+        self.num_hashes = next(
+            k for k in range(1, 64)
+            if (1 - math.exp(-k * capacity / self.size)) ** k <= error_rate
+        )
+        self.capacity = capacity
+        self.count = 0
+        self._mask = self.size - 1
+        self._bits = bytearray(self.size // 8)
+
+    def add(self, key: Hashable) -> None:
+        """加入一个元素"""
+        h1 = hash(key)
+        h2 = (h1 >> 32) | 1
+        bits = self._bits
+        mask = self._mask
+        for _ in range(self.num_hashes):
+            position = h1 & mask
+            bits[position >> 3] |= 1 << (position & 7)
+            h1 += h2
+        self.count += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        if not self.count:
+            return False
+        h1 = hash(key)
+        h2 = (h1 >> 32) | 1
+        bits = self._bits
+        mask = self._mask
+        for _ in range(self.num_hashes):
+            position = h1 & mask
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            h1 += h2
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    def stats(self) -> dict[str, Any]:
+        """容量统计"""
+        return {
+            "count": self.count,
+            "capacity": self.capacity,
+            "bits": self.size,
+            "hashes": self.num_hashes,
+            "bytes": len(self._bits),
+        }
@@ -11,9 +11,33 @@ class Settings(BaseSettings):
     
     # 安全配置
     SECRET_KEY: str = "your-secret-key-change-in-production"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7天
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # 访问令牌短期有效，过期后用刷新令牌换取
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30  # 刷新令牌有效期（每次刷新顺延）
     ALGORITHM: str = "HS256"
     
+    # 令牌吊销过滤器（进程内布隆过滤器，只保存访问令牌有效期内被吊销的令牌族）
+    TOKEN_REVOCATION_FILTER_CAPACITY: int = 100000
+    TOKEN_REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_SYNC_INTERVAL: int = 10  # 秒，从数据库同步其他进程吊销的令牌族
+    
+    # 认证缓存配置（进程内缓存已认证用户快照，封禁/修改时主动失效）
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60  # 秒
+    ACCESS_TOKEN_CACHE_SIZE: int = 10000  # 已验证访问令牌缓存，条目保留到令牌过期
+    
+    # 登录防暴力破解（滑动窗口失败计数 + 指数退避封禁）
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_BACKEND: str = "memory"  # memory: 进程内计数；redis: 多进程共享
+    LOGIN_FAILURE_WINDOW: int = 900  # 失败计数窗口（秒）
+    LOGIN_MAX_FAILURES_PER_IDENTIFIER: int = 5  # 同一账号窗口内失败达到该次数开始封禁
+    LOGIN_MAX_FAILURES_PER_IP: int = 50  # 同一IP窗口内失败达到该次数开始封禁
+    LOGIN_BACKOFF_BASE: float = 1  # 首次封禁秒数，之后每次失败翻倍
+    LOGIN_BACKOFF_MAX: int = 900  # 最长封禁秒数
+    
+    # 密码哈希线程池（bcrypt 不在事件循环中执行）
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # 排队超过该数量直接返回503
+    
     # 数据库配置
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
@@ -25,11 +49,61 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    # 数据库连接池（每个工作进程一个连接池，总连接数 = 进程数 × (DB_POOL_SIZE + DB_MAX_OVERFLOW)）
+    DB_ECHO: bool = False  # 打印所有SQL，仅调试时开启
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20  # 连接池满时允许临时创建的连接数
+    DB_POOL_TIMEOUT: float = 30  # 等待空闲连接的最长秒数，超时抛出异常
+    DB_POOL_RECYCLE: int = 1800  # 连接最长使用秒数，超过后重建，-1 表示不回收
+    DB_POOL_PRE_PING: bool = True  # 取出连接时先检测是否可用
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg 预编译语句缓存，使用 pgbouncer 事务模式时设为0
+    
+    # 只读副本（未配置 POSTGRES_REPLICA_HOST 时读请求全部走主库；账号、库名与主库相同）
+    POSTGRES_REPLICA_HOST: Optional[str] = None
+    POSTGRES_REPLICA_PORT: Optional[int] = None  # 默认与主库端口相同
+    REPLICA_MAX_LAG: float = 5  # 秒，复制延迟超过该值时读请求回退主库
+    REPLICA_LAG_CHECK_INTERVAL: float = 2  # 秒，检查复制延迟的间隔
+    READ_YOUR_WRITES_WINDOW: float = 10  # 秒，用户写入后该时长内的读请求走主库，保证读到自己的写入
+    READ_YOUR_WRITES_CACHE_SIZE: int = 100000  # 最近写入用户的记录上限
+    
+    # SQL统计（按请求统计语句数和数据库耗时，写入 Server-Timing 响应头）
+    SQL_STATS_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # 同一语句在一个请求中执行达到该次数时记录警告
+    
+    # 列表总数（精确总数随分页查询以窗口函数一并返回，按筛选条件短时间缓存）
+    LIST_COUNT_CACHE_SIZE: int = 1000
+    LIST_COUNT_CACHE_TTL: float = 10  # 秒，期间新增/删除的数据不反映在总数中
+    LIST_COUNT_ESTIMATE_THRESHOLD: int = 10000  # 估算模式下，规划器估计行数低于该值时改为精确计数
+    
+    # 积分排行榜（有序集合，启动时从数据库重建，积分变动时增量更新）
+    LEADERBOARD_BACKEND: str = "memory"  # memory: 进程内跳表；redis: 多进程共享的 ZSET
+    LEADERBOARD_REBUILD_INTERVAL: int = 300  # 秒，定期从数据库重建，修正其他进程的更新造成的偏差
+    LEADERBOARD_TIMEZONE: str = "Asia/Shanghai"  # 日/周/月排行榜按该时区的自然日划分周期
+    
+    # 计数写缓冲（浏览数等在进程内累加，定期批量写入数据库）
+    COUNTER_FLUSH_INTERVAL: float = 5  # 秒，进程异常退出时最多丢失这段时间的计数
+    COUNTER_FLUSH_MAX_ROWS: int = 10000  # 待写入的行数达到该值时提前写入
+    
+    # 用户点赞索引（列表页标记“我已点赞”，按用户缓存全部点赞的对象ID）
+    LIKE_INDEX_MAX_USERS: int = 10000
+    LIKE_INDEX_TTL: int = 300  # 秒，其他进程的点赞/取消在过期重新加载后可见
+    
+    @property
+    def REPLICA_DATABASE_URL(self) -> Optional[str]:
+        if not self.POSTGRES_REPLICA_HOST:
+            return None
+        port = self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_REPLICA_HOST}:{port}/{self.POSTGRES_DB}"
+    
     # Redis配置
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     
+    @property
+    def REDIS_URL(self) -> str:
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+    
     # 阿里云OSS配置
     OSS_ACCESS_KEY_ID: Optional[str] = None
     OSS_ACCESS_KEY_SECRET: Optional[str] = None
@@ -44,6 +118,13 @@ class Settings(BaseSettings):
     # 邀请码配置
     INVITE_CODE_REQUIRED: bool = True
     DEFAULT_INVITE_QUOTA: int = 5
+    INVITE_CODE_SECRET: Optional[str] = None  # 邀请码置换密钥，默认使用 SECRET_KEY
+    INVITE_CODE_BLOCK_SIZE: int = 32  # 每次从序列预取的序号数
+    INVITE_QUOTA_LEASE_SIZE: int = 0  # 热门邀请码每次租用的配额块大小（最大100），0表示不启用；进程异常退出时最多丢失一块
+    INVITE_QUOTA_HOT_THRESHOLD: int = 20  # 每分钟使用次数达到该值视为热门邀请码
+    INVITE_QUOTA_LEASE_TTL: int = 30  # 租约有效期（秒，最大300），到期后由后台任务归还剩余配额并累加邀请计数
+    INVITE_TREE_CACHE_SIZE: int = 10000  # 邀请树下级人数缓存
+    INVITE_TREE_CACHE_TTL: int = 300  # 秒
     
     # 积分配置
     POINTS_FOR_REGISTER: int = 100
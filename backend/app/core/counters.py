@@ -0,0 +1,232 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import time
+from collections import defaultdict
+from typing import Any, Generic, Optional, TypeVar
+
+from sqlalchemy import Integer, LargeBinary, Table, any_, bindparam, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.hll import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+def preserve_onupdate(table: Table, assignments: dict[str, Any]) -> dict[str, Any]:
+    """计数变化不算内容修改：更新计数列的语句中，带 onupdate 的列（updated_at）保持原值"""
+    for table_column in table.c:
+        if table_column.onupdate is not None and table_column.name not in assignments:
+            assignments[table_column.name] = table_column
+    return assignments
+
+
+class WriteBehindBuffer(ABC, Generic[V]):
+    """
+    按 (表, 行ID) 在进程内累积、定期批量写入数据库的写缓冲
+
+    后台任务每 interval 秒（或待写入的行数达到 max_rows 时提前）取出当前缓冲写入，
+    写入失败或被取消（应用关闭时取消后台任务）时合并回缓冲，下个周期或关闭时的 flush() 重试。
+    进程异常退出时最多丢失一个周期的数据。子类实现 _write（写入一批行）和 _merge（合并回缓冲）
+    """
+
+    def __init__(self, interval: float, max_rows: int, batch_size: int = 1000):
+        self.interval = interval
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self._pending: dict[Table, dict[int, V]] = defaultdict(dict)
+        self._rows = 0
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failures = 0
+        self.last_flush_ms: Optional[float] = None
+
+    def _row(self, table: Table, row_id: int, factory) -> V:
+        """取得行的缓冲值，不存在时创建"""
+        rows = self._pending[table]
+        value = rows.get(row_id)
+        if value is None:
+            value = rows[row_id] = factory()
+            self._rows += 1
+            if self._rows >= self.max_rows:
+                self._wakeup.set()
+        return value
+
+    async def flush(self) -> int:
+        """把当前缓冲写入数据库，返回写入的行数"""
+        async with self._lock:
+            pending, self._pending = self._pending, defaultdict(dict)
+            self._rows = 0
+            self._wakeup.clear()
+            if not pending:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as session:
+                    for table, rows in pending.items():
+                        # 行ID排序，多进程同时写入时按相同顺序加锁，避免死锁
+                        ids = sorted(rows)
+                        for start in range(0, len(ids), self.batch_size):
+                            batch = ids[start:start + self.batch_size]
+                            await self._write(session, table, {row_id: rows[row_id] for row_id in batch})
+                    await session.commit()
+            except BaseException:
+                self.failures += 1
+                self._restore(pending)
+                raise
+
+            flushed = sum(len(rows) for rows in pending.values())
+            self.flushes += 1
+            self.flushed_rows += flushed
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+            return flushed
+
+    def _restore(self, pending: dict[Table, dict[int, V]]) -> None:
+        """写入失败时合并回缓冲"""
+        for table, rows in pending.items():
+            current = self._pending[table]
+            for row_id, value in rows.items():
+                if row_id in current:
+                    self._merge(current[row_id], value)
+                else:
+                    current[row_id] = value
+                    self._rows += 1
+
+    @abstractmethod
+    async def _write(self, session: AsyncSession, table: Table, rows: dict[int, V]) -> None:
+        """写入一批行（不提交）"""
+
+    @abstractmethod
+    def _merge(self, current: V, restored: V) -> None:
+        """把写入失败的值合并到缓冲中同一行的新值"""
+
+    async def run(self) -> None:
+        """后台写入任务（在应用生命周期内运行）"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("%s 写入数据库失败，下个周期重试", type(self).__name__)
+
+    def stats(self) -> dict[str, Any]:
+        """缓冲统计"""
+        return {
+            "pending_rows": self._rows,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failures": self.failures,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+class CounterBuffer(WriteBehindBuffer[dict[str, int]]):
+    """
+    计数写缓冲（浏览数、下载数等只增不减、允许短暂延迟的计数列）
+
+    请求中只在进程内累加 (表, 行ID, 列) 的增量，不写数据库；
+    写入时每张表一条 UPDATE ... FROM (VALUES ...) 语句，热门行每个周期只更新一次，不再每次请求抢行锁
+    """
+
+    def incr(self, counter: InstrumentedAttribute, row_id: int, amount: int = 1) -> int:
+        """累加计数（如 incr(Content.view_count, content_id)），返回该计数尚未写入数据库的增量"""
+        deltas = self._row(counter.table, row_id, dict)
+        deltas[counter.key] = deltas.get(counter.key, 0) + amount
+        return deltas[counter.key]
+
+    async def _write(self, session: AsyncSession, table: Table, rows: dict[int, dict[str, int]]) -> None:
+        names = sorted({name for deltas in rows.values() for name in deltas})
+        deltas = values(
+            column("id", Integer),
+            *(column(name, Integer) for name in names),
+            name="deltas",
+        ).data([(row_id, *(row.get(name, 0) for name in names)) for row_id, row in rows.items()])
+        assignments = {name: func.coalesce(table.c[name], 0) + deltas.c[name] for name in names}
+        await session.execute(
+            update(table).where(table.c.id == deltas.c.id).values(preserve_onupdate(table, assignments))
+        )
+
+    def _merge(self, current: dict[str, int], restored: dict[str, int]) -> None:
+        for name, delta in restored.items():
+            current[name] = current.get(name, 0) + delta
+
+
+class VisitorSketches(WriteBehindBuffer[HyperLogLog]):
+    """
+    独立访客数（UV）写缓冲，表须有 visitor_sketch（压缩的 HyperLogLog）和 visitor_count（估计值）两列
+
+    请求中把访客标识加入进程内该行的 HyperLogLog，同一访客重复访问不改变估计，不需要每次访问写一行记录；
+    写入时锁定数据库中的行，与已保存的估计合并（逐个寄存器取最大值）后写回估计和估计值。
+    各进程分别合并到同一行，结果等于所有进程访客的并集
+    """
+
+    def __init__(self, interval: float, max_rows: int, precision: int = 12, batch_size: int = 1000):
+        super().__init__(interval, max_rows, batch_size)
+        self.precision = precision
+
+    def add(self, model: Any, row_id: int, visitor: str) -> None:
+        """记录一次访问（如 add(Content, content_id, visitor)）"""
+        self._row(model.__table__, row_id, lambda: HyperLogLog(self.precision)).add(visitor)
+
+    async def _write(self, session: AsyncSession, table: Table, rows: dict[int, HyperLogLog]) -> None:
+        result = await session.execute(
+            select(table.c.id, table.c.visitor_sketch)
+            .where(table.c.id == any_(bindparam("ids", list(rows), type_=ARRAY(Integer))))
+            .order_by(table.c.id)
+            .with_for_update()
+        )
+        # 解压、合并、压缩每行约 1ms，放到线程中执行，期间事件循环仍可处理请求
+        merged = await asyncio.to_thread(self._merge_stored, rows, result.tuples().all())
+        if not merged:
+            return
+        sketches = values(
+            column("id", Integer),
+            column("visitor_sketch", LargeBinary),
+            column("visitor_count", Integer),
+            name="sketches",
+        ).data(merged)
+        await session.execute(
+            update(table)
+            .where(table.c.id == sketches.c.id)
+            .values(preserve_onupdate(table, {
+                "visitor_sketch": sketches.c.visitor_sketch,
+                "visitor_count": sketches.c.visitor_count,
+            }))
+        )
+
+    def _merge_stored(
+        self, rows: dict[int, HyperLogLog], stored: list[tuple[int, Optional[bytes]]]
+    ) -> list[tuple[int, bytes, int]]:
+        """与数据库中的估计合并，返回 [(行ID, 压缩后的估计, 估计值)]（已删除的行跳过）"""
+        merged = []
+        for row_id, data in stored:
+            sketch = HyperLogLog.from_bytes(data) if data else HyperLogLog(self.precision)
+            sketch.merge(rows[row_id])
+            merged.append((row_id, sketch.to_bytes(), sketch.count()))
+        return merged
+
+    def _merge(self, current: HyperLogLog, restored: HyperLogLog) -> None:
+        current.merge(restored)
+
+
+counter_buffer = CounterBuffer(
+    interval=settings.COUNTER_FLUSH_INTERVAL,
+    max_rows=settings.COUNTER_FLUSH_MAX_ROWS,
+)
+
+visitor_sketches = VisitorSketches(
+    interval=settings.COUNTER_FLUSH_INTERVAL,
+    max_rows=settings.COUNTER_FLUSH_MAX_ROWS,
+)
@@ -1,12 +1,96 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
 
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    带统计的连接池
+    记录取连接耗时（含排队等待和 pre-ping）、超出 pool_size 的临时连接创建次数和取连接超时次数
+    """
+    
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram()
+        self.checkouts = 0
+        self.overflows = 0
+        self.timeouts = 0
+    
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        self.wait_time.observe(time.perf_counter() - started)
+        self.checkouts += 1
+        return connection
+    
+    def _create_connection(self):
+        # _overflow 从 -pool_size 起计，大于0说明是超出 pool_size 的临时连接
+        if self._overflow > 0:
+            self.overflows += 1
+        return super()._create_connection()
+    
+    def recreate(self) -> "InstrumentedPool":
+        pool = super().recreate()
+        pool.wait_time = self.wait_time
+        pool.checkouts = self.checkouts
+        pool.overflows = self.overflows
+        pool.timeouts = self.timeouts
+        return pool
+    
+    def stats(self) -> dict[str, Any]:
+        """连接池运行指标"""
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "overflow_created": self.overflows,
+            "timeouts": self.timeouts,
+            "wait_time": self.wait_time.snapshot(),
+        }
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
+
+def _create_engine(url: str) -> AsyncEngine:
+    """创建引擎（主库和副本使用相同的连接池配置）"""
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
+
+# 只读副本引擎，未配置副本时为 None
+replica_engine: Optional[AsyncEngine] = (
+    _create_engine(settings.REPLICA_DATABASE_URL) if settings.REPLICA_DATABASE_URL else None
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -17,17 +101,226 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+
+def _read_sessionmaker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """
+    只读会话：连接使用 AUTOCOMMIT，每条查询单独执行，不发送 BEGIN/COMMIT/ROLLBACK，
+    同一请求内的多条查询不在同一快照中；会话内写入会直接报错
+    """
+    return async_sessionmaker(
+        bind.execution_options(isolation_level="AUTOCOMMIT"),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        info={"read_only": True},
+    )
+
+
+ReadSessionLocal = _read_sessionmaker(engine)
+ReplicaSessionLocal = _read_sessionmaker(replica_engine or engine)
+
 Base = declarative_base()
 
 
-async def get_db():
-    """获取数据库会话"""
+def run_after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    注册事务提交成功后执行的回调
+    事务回滚时回调被丢弃，用于缓存失效等进程内副作用
+    """
+    session.info.setdefault("after_commit_callbacks", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    for callback in session.info.pop("after_commit_callbacks", []):
+        callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_after_commit_callbacks(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("after_commit_callbacks", None)
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_read_only_flush(session: Session, flush_context, instances) -> None:
+    if session.info.get("read_only"):
+        raise exc.InvalidRequestError("只读会话不能写入")
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_writes(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if orm_execute_state.session.info.get("read_only"):
+            raise exc.InvalidRequestError("只读会话不能写入")
+        orm_execute_state.session.info["has_writes"] = True
+
+
+# 副本的复制延迟（秒）；不是副本（未处于恢复状态）时为0，便于用两个独立实例在本地测试
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """
+    读请求路由（主库 / 只读副本）
+
+    - 后台定期查询副本的复制延迟，副本连接失败或延迟超过 max_lag 时读请求回退主库
+    - 用户提交写入后 read_your_writes_window 秒内，该用户的读请求走主库，
+      避免刚写入的数据在副本上还看不到（按访问令牌中的用户ID记录）
+    写入记录保存在进程内，多进程部署时落到其他进程的请求不受保护，窗口内仍可能读到旧数据
+    """
+    
+    def __init__(
+        self,
+        engine: Optional[AsyncEngine],
+        max_lag: float,
+        check_interval: float,
+        read_your_writes_window: float,
+        max_writers: int,
+    ):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._recent_writers: LRUCache[bool] = LRUCache(maxsize=max_writers, ttl=read_your_writes_window)
+        self.lag: Optional[float] = None
+        self._checked_at = 0.0
+        self.replica_reads = 0
+        self.fallback_reads = 0
+        self.sticky_reads = 0
+        self.check_failures = 0
+    
+    @property
+    def available(self) -> bool:
+        """副本可用：最近一次检查成功且延迟在阈值内（检查停滞时视为不可用）"""
+        return (
+            self.engine is not None
+            and self.lag is not None
+            and self.lag <= self.max_lag
+            and time.monotonic() - self._checked_at <= self.check_interval * 3
+        )
+    
+    async def _query_lag(self) -> float:
+        async with self.engine.connect() as conn:
+            return float(await conn.scalar(REPLICA_LAG_QUERY))
+    
+    async def check(self) -> Optional[float]:
+        """检查复制延迟，失败时标记副本不可用"""
+        try:
+            self.lag = await asyncio.wait_for(self._query_lag(), timeout=max(self.check_interval, 1))
+        except Exception:
+            self.lag = None
+            self.check_failures += 1
+            logger.warning("只读副本检查失败，读请求回退主库", exc_info=True)
+            return None
+        self._checked_at = time.monotonic()
+        return self.lag
+    
+    async def run(self) -> None:
+        """后台检查任务（在应用生命周期内运行）"""
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+    
+    def mark_unavailable(self) -> None:
+        """请求中副本连接出错，下次检查成功前回退主库"""
+        self.lag = None
+    
+    def record_write(self, subject: Optional[str]) -> None:
+        """记录用户提交了写入"""
+        if self.engine is not None and subject is not None:
+            self._recent_writers.set(subject, True)
+    
+    def use_replica(self, subject: Optional[str]) -> bool:
+        """本次读请求是否走副本"""
+        if self.engine is None:
+            return False
+        if subject is not None and self._recent_writers.get(subject):
+            self.sticky_reads += 1
+            return False
+        if not self.available:
+            self.fallback_reads += 1
+            return False
+        self.replica_reads += 1
+        return True
+    
+    def stats(self) -> dict[str, Any]:
+        """路由统计"""
+        if self.engine is None:
+            return {"configured": False}
+        return {
+            "configured": True,
+            "available": self.available,
+            "lag": self.lag,
+            "replica_reads": self.replica_reads,
+            "fallback_reads": self.fallback_reads,
+            "sticky_reads": self.sticky_reads,
+            "check_failures": self.check_failures,
+            "recent_writers": len(self._recent_writers),
+            "pool": self.engine.pool.stats(),
+        }
+
+
+replica_router = ReplicaRouter(
+    engine=replica_engine,
+    max_lag=settings.REPLICA_MAX_LAG,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+    read_your_writes_window=settings.READ_YOUR_WRITES_WINDOW,
+    max_writers=settings.READ_YOUR_WRITES_CACHE_SIZE,
+)
+
+
+def _request_subject(request: Request) -> Optional[str]:
+    """
+    请求访问令牌中的用户ID
+    只用于选择读库，不校验签名；认证仍由 get_current_user 完成
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+    return str(subject) if subject is not None else None
+
+
+async def get_db(request: Request):
+    """获取数据库会话（主库），提交了写入时记录到读写路由"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
             await session.commit()
+            if replica_engine is not None and session.info.get("has_writes"):
+                replica_router.record_write(_request_subject(request))
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+
+
+async def get_read_db(request: Request):
+    """
+    获取只读数据库会话（公开查询接口使用）
+    副本可用时走副本，否则走主库；不开启事务，请求结束时无需提交或回滚
+    """
+    use_replica = replica_engine is not None and replica_router.use_replica(_request_subject(request))
+    session_factory = ReplicaSessionLocal if use_replica else ReadSessionLocal
+    async with session_factory() as session:
+        try:
+            yield session
+        except (OSError, exc.OperationalError, exc.InterfaceError):
+            if use_replica:
+                replica_router.mark_unavailable()
+            raise
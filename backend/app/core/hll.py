@@ -0,0 +1,94 @@
+import math
+import zlib
+from collections import Counter
+from hashlib import blake2b
+from typing import Optional
+
+
+class HyperLogLog:
+    """
+    HyperLogLog 基数估计（去重计数的近似值）
+
+    p 位精度时有 m = 2^p 个寄存器，每个 1 字节，内存 m 字节（p=12 时 4KB）；
+    相对标准误差约 1.04 / √m（p=12 时约 1.6%，约 95% 的估计在 ±3.3% 以内）。
+    元素用 64 位 blake2b 哈希（各进程结果相同，可以合并），
+    合并为逐个寄存器取最大值，等价于对两个集合的并集计数
+    """
+
+    def __init__(self, p: int = 12, registers: Optional[bytearray] = None):
+        if not 4 <= p <= 16:
+            raise ValueError("精度 p 须在 4~16 之间")
+        self.p = p
+        self.m = 1 << p
+        self.registers = registers if registers is not None else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError("寄存器数量与精度不符")
+
+    def add(self, value: str) -> bool:
+        """加入元素，返回寄存器是否变化"""
+        x = int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "big")
+        index = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        # 剩余位中第一个 1 的位置（从 1 开始）
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """合并另一个同精度的估计器（并集）"""
+        if other.p != self.p:
+            raise ValueError("精度不同的估计器不能合并")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """
+        估计的不同元素数
+        使用 Ertl 的改进估计：按寄存器值的直方图计算，整个基数范围内都接近无偏，
+        不需要原算法在小基数时切换线性计数，也没有过渡区间的偏差
+        """
+        q = 64 - self.p
+        histogram = [0] * (q + 2)
+        for rank, registers in Counter(self.registers).items():
+            histogram[rank] = registers
+        m = self.m
+        z = m * _tau(1 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        return round(m * m / (2 * math.log(2)) / z)
+
+    def to_bytes(self) -> bytes:
+        """序列化：1 字节精度 + zlib 压缩的寄存器（访客少时大部分寄存器为 0，只有几十字节）"""
+        return bytes([self.p]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(data[0], bytearray(zlib.decompress(data[1:])))
+
+
+def _sigma(x: float) -> float:
+    if x == 1:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
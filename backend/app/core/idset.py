@@ -0,0 +1,132 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Union
+
+# 桶：元素较少时为有序的低 16 位数组，较多时为 65536 位的位图
+_Container = Union[array, bytearray]
+
+
+class IdSet:
+    """
+    压缩的非负整数集合（Roaring bitmap 的简化实现，用于进程内保存大量ID）
+
+    按高 16 位分桶，桶内只存低 16 位：元素不超过 ARRAY_MAX 个时为有序 array('H')（每个 2 字节，二分查找），
+    超过后转为 8KB 位图，删除到不超过 ARRAY_MAX 个时转回数组。
+    ID 通常集中在少数几个桶内，比 set[int]（每个元素约 60 字节）小一个数量级，判断是否包含为 O(log n)
+    """
+
+    ARRAY_MAX = 4096
+    BITMAP_BYTES = 8192
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._containers: dict[int, _Container] = {}
+        # 位图桶的元素数（数组桶直接取长度）
+        self._bitmap_sizes: dict[int, int] = {}
+        self._len = 0
+        for value in sorted(set(values)):
+            high, low = value >> 16, value & 0xFFFF
+            container = self._containers.get(high)
+            if container is None:
+                container = self._containers[high] = array("H")
+            container.append(low)
+            self._len += 1
+        for high, container in self._containers.items():
+            if len(container) > self.ARRAY_MAX:
+                self._containers[high] = self._to_bitmap(container)
+                self._bitmap_sizes[high] = len(container)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, value: int) -> bool:
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, bytearray):
+            return bool(container[low >> 3] >> (low & 7) & 1)
+        index = bisect_left(container, low)
+        return index < len(container) and container[index] == low
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            base = high << 16
+            if isinstance(container, bytearray):
+                for low in range(65536):
+                    if container[low >> 3] >> (low & 7) & 1:
+                        yield base | low
+            else:
+                for low in container:
+                    yield base | low
+
+    def add(self, value: int) -> bool:
+        """加入元素，返回是否新加入"""
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = array("H", [low])
+            self._len += 1
+            return True
+
+        if isinstance(container, bytearray):
+            mask = 1 << (low & 7)
+            if container[low >> 3] & mask:
+                return False
+            container[low >> 3] |= mask
+            self._bitmap_sizes[high] += 1
+        else:
+            index = bisect_left(container, low)
+            if index < len(container) and container[index] == low:
+                return False
+            container.insert(index, low)
+            if len(container) > self.ARRAY_MAX:
+                self._containers[high] = self._to_bitmap(container)
+                self._bitmap_sizes[high] = len(container)
+        self._len += 1
+        return True
+
+    def discard(self, value: int) -> bool:
+        """移除元素，返回是否存在"""
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            return False
+
+        if isinstance(container, bytearray):
+            mask = 1 << (low & 7)
+            if not container[low >> 3] & mask:
+                return False
+            container[low >> 3] &= ~mask
+            self._bitmap_sizes[high] -= 1
+            if self._bitmap_sizes[high] <= self.ARRAY_MAX:
+                del self._bitmap_sizes[high]
+                self._containers[high] = self._to_array(container)
+        else:
+            index = bisect_left(container, low)
+            if index == len(container) or container[index] != low:
+                return False
+            del container[index]
+            if not container:
+                del self._containers[high]
+        self._len -= 1
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        """桶数据占用的字节数（不含字典等固定开销）"""
+        return sum(
+            len(container) if isinstance(container, bytearray) else len(container) * container.itemsize
+            for container in self._containers.values()
+        )
+
+    def _to_bitmap(self, container: array) -> bytearray:
+        bitmap = bytearray(self.BITMAP_BYTES)
+        for low in container:
+            bitmap[low >> 3] |= 1 << (low & 7)
+        return bitmap
+
+    @staticmethod
+    def _to_array(bitmap: bytearray) -> array:
+        return array("H", (low for low in range(65536) if bitmap[low >> 3] >> (low & 7) & 1))
+
@@ -0,0 +1,205 @@
+import base64
+import enum
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, Hashable, Optional, Sequence, TypeVar
+
+from sqlalchemy import Select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+T = TypeVar("T")
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """分页游标无法解析"""
+
+
+class CountMode(str, enum.Enum):
+    """列表总数的计算方式"""
+    EXACT = "exact"  # 精确总数
+    ESTIMATE = "estimate"  # 规划器估计的行数，用于大表；估计值低于 LIST_COUNT_ESTIMATE_THRESHOLD 时仍精确计数
+
+
+@dataclass
+class Page(Generic[T]):
+    """一页结果及前后页游标（没有前/后一页时为 None）；total 仅在指定计数方式时返回"""
+    items: list[T]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+
+# 列表总数缓存：键为筛选后的查询（SQL + 参数），值为 (总数, 是否估算)
+count_cache: LRUCache[tuple[int, bool]] = LRUCache(
+    maxsize=settings.LIST_COUNT_CACHE_SIZE,
+    ttl=settings.LIST_COUNT_CACHE_TTL,
+)
+
+
+def _encode_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _decode_value(column: InstrumentedAttribute, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    # 游标来自客户端，类型不符时在这里拒绝，不要带进SQL
+    if not isinstance(value, python_type) or isinstance(value, bool):
+        raise TypeError(f"{column.key} 类型不匹配")
+    return value
+
+
+def encode_cursor(values: Sequence[Any], backward: bool = False) -> str:
+    """排序键 + 翻页方向编码为不透明游标（base64url）"""
+    payload = json.dumps([[_encode_value(v) for v in values], int(backward)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence[InstrumentedAttribute]) -> tuple[list[Any], bool]:
+    """解析游标，返回 (排序键, 是否向前翻页)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values, backward = json.loads(base64.urlsafe_b64decode(padded))
+        if len(values) != len(columns):
+            raise ValueError("排序键数量不匹配")
+        return [_decode_value(c, v) for c, v in zip(columns, values)], bool(backward)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("无效的分页游标") from e
+
+
+def _count_key(query: Select) -> Hashable:
+    # SQLAlchemy 语句缓存用的结构键 + 参数值，比编译SQL文本快两个数量级
+    cache_key = query._generate_cache_key()
+    values = (p.effective_value for p in cache_key.bindparams)
+    return cache_key.key, tuple(tuple(v) if isinstance(v, list) else v for v in values)
+
+
+async def count_rows(db: AsyncSession, query: Select) -> int:
+    """查询的精确行数（沿用查询的 FROM 和筛选条件）"""
+    count_query = query.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+    return (await db.execute(count_query)).scalar_one()
+
+
+class ExplainJSON(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <查询>：查询按原样编译，筛选值仍作为绑定参数传入"""
+
+    # 不进入语句缓存：缓存命中时按被包装查询的列适配结果，与 EXPLAIN 的单列结果不符
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(ExplainJSON)
+def _compile_explain_json(element: ExplainJSON, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_rows(db: AsyncSession, query: Select) -> int:
+    """规划器估计的行数：只做 EXPLAIN，不执行查询，耗时与表大小无关"""
+    conn = await db.connection()
+    plan = (await conn.execute(ExplainJSON(query))).scalar()
+    # 引擎的连接上注册了 json 解码，结果可能已经是列表
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    order_by: Sequence[InstrumentedAttribute],
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = True,
+    count: Optional[CountMode] = None,
+) -> Page:
+    """
+    键集分页（游标分页）
+
+    - query: 已加好筛选条件、未排序的查询，返回 ORM 实体
+    - order_by: 排序键，最后一列必须唯一（通常为 id），保证顺序稳定；各列同为倒序或同为正序
+    - cursor: 上一次返回的 next_cursor / prev_cursor，按排序键定位，翻到多深都只扫描一页数据
+    - skip: 兼容旧的偏移分页，只在没有 cursor 时生效
+    - count: 同时返回筛选后的总数；None 表示不计数
+
+    每次多取一行判断是否还有下一页；需要 (筛选列..., 排序键...) 上的复合索引才能避免排序。
+    总数按筛选条件缓存 LIST_COUNT_CACHE_TTL 秒，未命中时：
+    - EXACT: 首页和偏移分页在分页语句中加 COUNT(*) OVER() 一并取回（窗口函数在 LIMIT 之前计算，
+      即筛选后的全部行数），省一次往返；窗口函数要读出全部筛选行，只适合几千行以内的列表。
+      游标页只含游标之后的行，单独计数
+    - ESTIMATE: 先取规划器估计值，低于阈值时单独 COUNT（可走仅索引扫描，行数多时比窗口函数快得多）
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    key = tuple_(*order_by)
+
+    total, total_estimated = None, False
+    if count is not None:
+        count_key = _count_key(query)
+        cached = count_cache.get(count_key)
+        if cached is not None:
+            total, total_estimated = cached
+        elif count is CountMode.ESTIMATE:
+            estimate = await estimate_rows(db, query)
+            if estimate >= settings.LIST_COUNT_ESTIMATE_THRESHOLD:
+                total, total_estimated = estimate, True
+    filtered = query
+    with_window = count is CountMode.EXACT and total is None and not cursor
+
+    backward = False
+    if cursor:
+        values, backward = decode_cursor(cursor, order_by)
+        # 向后翻页沿排序方向取，向前翻页反向取再倒回来
+        after = descending != backward
+        query = query.where(key < tuple(values) if after else key > tuple(values))
+    elif skip:
+        query = query.offset(skip)
+
+    reverse = descending != backward
+    query = query.order_by(*(c.desc() if reverse else c.asc() for c in order_by)).limit(limit + 1)
+
+    if with_window:
+        fetched = (await db.execute(query.add_columns(func.count().over()))).all()
+        rows = [row[0] for row in fetched]
+        if fetched or not skip:
+            total = fetched[0][1] if fetched else 0
+    else:
+        rows = list((await db.execute(query)).scalars().all())
+    if count is not None:
+        if total is None:
+            total = await count_rows(db, filtered)
+        if cached is None:
+            count_cache.set(count_key, (total, total_estimated))
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+
+    def cursor_for(item: Any, to_prev: bool) -> str:
+        return encode_cursor([getattr(item, c.key) for c in order_by], backward=to_prev)
+
+    page: Page = Page(items=rows, total=total, total_estimated=total_estimated)
+    if not rows:
+        return page
+    # 向后翻页时多取的一行说明还有下一页；向前翻页时一定有下一页（来时的那一页）
+    if (has_more and not backward) or (backward and cursor):
+        page.next_cursor = cursor_for(rows[-1], to_prev=False)
+    # 带游标或偏移进入的页面前面还有数据；向前翻页时多取的一行说明还有上一页
+    if (has_more and backward) or (not backward and (cursor or skip)):
+        page.prev_cursor = cursor_for(rows[0], to_prev=True)
+    return page
@@ -0,0 +1,131 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """
+    一次请求（或一段代码）内执行的SQL统计
+    语句按 SQL 文本归类（参数已绑定为占位符），同一文本多次执行通常意味着 N+1 查询；
+    统计嵌套时语句同时计入外层（例如测试中的查询预算包住带统计中间件的请求）
+    """
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def duplicates(self, threshold: int = 2) -> list[tuple[str, int]]:
+        """执行次数达到 threshold 的语句，按次数降序"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        """Server-Timing 响应头的值（耗时单位毫秒）"""
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_stats.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """统计代码块内（当前协程及其派生任务）执行的SQL"""
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """执行的SQL超出预算"""
+
+
+@contextmanager
+def query_budget(max_queries: int, max_duplicates: Optional[int] = None) -> Iterator[QueryStats]:
+    """
+    断言代码块内的SQL数量不超过预算，可用于测试：
+
+        with query_budget(3):
+            await client.get("/api/v1/users/leaderboard")
+
+    - max_queries: 允许的语句总数
+    - max_duplicates: 同一语句允许的最多执行次数（检测 N+1），None 表示不检查
+    """
+    with track_queries() as stats:
+        yield stats
+
+    problems = []
+    if stats.count > max_queries:
+        problems.append(f"执行了 {stats.count} 条SQL，预算 {max_queries} 条")
+    if max_duplicates is not None:
+        for sql, n in stats.duplicates(max_duplicates + 1):
+            problems.append(f"同一语句执行了 {n} 次（上限 {max_duplicates}）: {sql}")
+    if problems:
+        statements = "\n".join(f"  {n} x {sql}" for sql, n in stats.statements.most_common())
+        raise QueryBudgetExceeded("\n".join(problems) + "\n执行的语句:\n" + statements)
+
+
+class QueryStatsMiddleware:
+    """
+    按请求统计SQL（ASGI 中间件）
+    响应头加入 Server-Timing（语句数、数据库耗时），调试日志记录每个请求的统计，
+    同一语句执行次数达到 n_plus_one_threshold 时记录警告
+    """
+
+    def __init__(self, app: Any, n_plus_one_threshold: int, server_timing: bool = True):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with track_queries() as stats:
+            await self.app(scope, receive, send_with_timing)
+
+        request = f"{scope['method']} {scope['path']}"
+        logger.debug("%s: %d 条SQL，%.1fms", request, stats.count, stats.duration * 1000)
+        for sql, n in stats.duplicates(self.n_plus_one_threshold):
+            logger.warning("%s 疑似 N+1 查询，同一语句执行了 %d 次: %s", request, n, sql)
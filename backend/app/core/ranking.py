@@ -0,0 +1,281 @@
+import asyncio
+import random
+import uuid
+from typing import Any, Iterable, Optional, Protocol
+
+# 成员排序键 (-分数, 成员)：分数高的在前，同分按成员升序
+_Key = tuple[int, int]
+
+
+class RankingStore(Protocol):
+    """
+    有序集合（成员为整数ID，分数为整数），按分数从高到低排名
+    排名为并列排名：1 + 分数严格更高的成员数，同分成员排名相同
+    """
+
+    async def set(self, member: int, score: int) -> None:
+        """写入成员分数（不存在时加入）"""
+        ...
+
+    async def remove(self, member: int) -> None:
+        """移除成员"""
+        ...
+
+    async def rank(self, member: int) -> Optional[tuple[int, int]]:
+        """返回 (排名, 分数)，成员不存在返回 None"""
+        ...
+
+    async def top(self, n: int) -> list[tuple[int, int]]:
+        """分数最高的 n 个成员 [(成员, 分数)]"""
+        ...
+
+    async def replace(self, items: Iterable[tuple[int, int]]) -> None:
+        """用 [(成员, 分数)] 整体替换，items 须按分数降序、同分按成员升序排列"""
+        ...
+
+    def stats(self) -> dict[str, Any]:
+        """存储统计"""
+        ...
+
+
+class _Node:
+    __slots__ = ("key", "forward", "span")
+
+    def __init__(self, key: Optional[_Key], level: int):
+        self.key = key
+        self.forward: list[Optional[_Node]] = [None] * level
+        # span[i]: 第 i 层到下一个节点跨过的节点数（没有下一个节点时为到表尾的节点数）
+        self.span = [0] * level
+
+
+class SkipList:
+    """
+    带跨度的跳表（与 Redis zset 的 zskiplist 相同）
+
+    插入、删除、按键求位置均为 O(log n)；每层指针记录跨过的节点数，
+    查找路径上累加跨度即得到位置，不需要逐个计数
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self.head = _Node(None, self.MAX_LEVEL)
+        self.level = 1
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < self.P:
+            level += 1
+        return level
+
+    def insert(self, key: _Key) -> None:
+        update: list[_Node] = [self.head] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        x = self.head
+        for i in reversed(range(self.level)):
+            rank[i] = 0 if i == self.level - 1 else rank[i + 1]
+            while x.forward[i] is not None and x.forward[i].key < key:
+                rank[i] += x.span[i]
+                x = x.forward[i]
+            update[i] = x
+
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                rank[i] = 0
+                update[i] = self.head
+                self.head.span[i] = self.length
+            self.level = level
+
+        node = _Node(key, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+            node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self.level):
+            update[i].span[i] += 1
+        self.length += 1
+
+    def delete(self, key: _Key) -> bool:
+        update: list[_Node] = [self.head] * self.MAX_LEVEL
+        x = self.head
+        for i in reversed(range(self.level)):
+            while x.forward[i] is not None and x.forward[i].key < key:
+                x = x.forward[i]
+            update[i] = x
+
+        x = x.forward[0]
+        if x is None or x.key != key:
+            return False
+        for i in range(self.level):
+            if update[i].forward[i] is x:
+                update[i].span[i] += x.span[i] - 1
+                update[i].forward[i] = x.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self.level > 1 and self.head.forward[self.level - 1] is None:
+            self.level -= 1
+        self.length -= 1
+        return True
+
+    def count_before(self, key: Any) -> int:
+        """键小于 key 的节点数"""
+        count = 0
+        x = self.head
+        for i in reversed(range(self.level)):
+            while x.forward[i] is not None and x.forward[i].key < key:
+                count += x.span[i]
+                x = x.forward[i]
+        return count
+
+    def first(self, n: int) -> list[_Key]:
+        keys = []
+        x = self.head.forward[0]
+        while x is not None and len(keys) < n:
+            keys.append(x.key)
+            x = x.forward[0]
+        return keys
+
+    @classmethod
+    def from_sorted(cls, keys: Iterable[_Key]) -> "SkipList":
+        """由已排序的键按顺序追加构建，O(n)"""
+        skiplist = cls()
+        tails: list[_Node] = [skiplist.head] * cls.MAX_LEVEL
+        positions = [0] * cls.MAX_LEVEL
+        position = 0
+        for key in keys:
+            position += 1
+            level = skiplist._random_level()
+            skiplist.level = max(skiplist.level, level)
+            node = _Node(key, level)
+            for i in range(level):
+                tails[i].forward[i] = node
+                tails[i].span[i] = position - positions[i]
+                tails[i] = node
+                positions[i] = position
+        skiplist.length = position
+        for i in range(cls.MAX_LEVEL):
+            tails[i].span[i] = position - positions[i]
+        return skiplist
+
+
+class MemoryRankingStore:
+    """
+    进程内有序集合：跳表 + 成员分数字典
+    更新分数为删除旧键再插入新键，均为 O(log n)；replace 期间的 set/remove 会被整体替换覆盖，
+    由调用方在替换后重放。多进程部署时各进程各自维护一份，其他进程的更新要等到下次重建才可见，需要实时一致请使用 Redis
+    """
+
+    def __init__(self):
+        self._scores: dict[int, int] = {}
+        self._list = SkipList()
+
+    async def set(self, member: int, score: int) -> None:
+        old = self._scores.get(member)
+        if old == score:
+            return
+        if old is not None:
+            self._list.delete((-old, member))
+        self._list.insert((-score, member))
+        self._scores[member] = score
+
+    async def remove(self, member: int) -> None:
+        old = self._scores.pop(member, None)
+        if old is not None:
+            self._list.delete((-old, member))
+
+    async def rank(self, member: int) -> Optional[tuple[int, int]]:
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        # (-score,) 小于所有 (-score, 成员)，之前的节点即分数严格更高的成员
+        return self._list.count_before((-score,)) + 1, score
+
+    async def top(self, n: int) -> list[tuple[int, int]]:
+        return [(member, -negated) for negated, member in self._list.first(n)]
+
+    async def replace(self, items: Iterable[tuple[int, int]]) -> None:
+        scores = {member: score for member, score in items}
+        keys = [(-score, member) for member, score in scores.items()]
+        # 几万个节点的构建需要几百毫秒，放到线程中执行，期间事件循环仍可处理请求
+        self._list = await asyncio.to_thread(SkipList.from_sorted, keys)
+        self._scores = scores
+
+    def stats(self) -> dict[str, Any]:
+        """集合统计"""
+        return {
+            "backend": "memory",
+            "members": len(self._scores),
+            "levels": self._list.level,
+        }
+
+
+class RedisRankingStore:
+    """
+    Redis 有序集合（ZSET，多进程共享）
+    同分成员在 ZREVRANGE 中按成员字典序倒序排列，与进程内实现的同分顺序不同
+    """
+
+    def __init__(self, client: Any, key: str, batch_size: int = 1000):
+        self.client = client
+        self.key = key
+        self.batch_size = batch_size
+
+    async def set(self, member: int, score: int) -> None:
+        await self.client.zadd(self.key, {str(member): score})
+
+    async def remove(self, member: int) -> None:
+        await self.client.zrem(self.key, str(member))
+
+    async def rank(self, member: int) -> Optional[tuple[int, int]]:
+        score = await self.client.zscore(self.key, str(member))
+        if score is None:
+            return None
+        higher = await self.client.zcount(self.key, f"({score}", "+inf")
+        return higher + 1, int(score)
+
+    async def top(self, n: int) -> list[tuple[int, int]]:
+        members = await self.client.zrevrange(self.key, 0, n - 1, withscores=True)
+        return [(int(member), int(score)) for member, score in members]
+
+    async def replace(self, items: Iterable[tuple[int, int]]) -> None:
+        # 写入临时 key 后 RENAME 原子替换，重建期间读到的仍是旧集合
+        staging = f"{self.key}:rebuild:{uuid.uuid4().hex}"
+        batch: dict[str, int] = {}
+        written = 0
+        try:
+            for member, score in items:
+                batch[str(member)] = score
+                if len(batch) >= self.batch_size:
+                    await self.client.zadd(staging, batch)
+                    written += len(batch)
+                    batch = {}
+            if batch:
+                await self.client.zadd(staging, batch)
+                written += len(batch)
+            if written:
+                await self.client.rename(staging, self.key)
+            else:
+                await self.client.delete(self.key)
+        finally:
+            await self.client.delete(staging)
+
+    def stats(self) -> dict[str, Any]:
+        """存储统计"""
+        return {"backend": "redis"}
+
+
+def create_ranking_store(backend: str, key: str, redis_url: Optional[str] = None) -> RankingStore:
+    """按配置创建有序集合（backend: memory / redis）"""
+    if backend == "redis":
+        # 仅在启用时导入
+        from redis.asyncio import Redis
+
+        return RedisRankingStore(Redis.from_url(redis_url), key)
+    return MemoryRankingStore()
@@ -0,0 +1,234 @@
+import math
+import time
+from typing import Any, Callable, Optional, Protocol
+
+
+class ThrottleStore(Protocol):
+    """
+    滑动窗口计数存储
+    计数使用滑动窗口计数器近似：上一个固定窗口的计数按剩余比例加权，加上当前窗口计数
+    """
+
+    async def hit(self, key: str) -> float:
+        """计数加一，返回滑动窗口内的计数；无法记录时返回 inf（按超限处理）"""
+        ...
+
+    async def block(self, key: str, seconds: float) -> None:
+        """封禁 key 指定秒数"""
+        ...
+
+    async def blocked_for(self, *keys: str) -> float:
+        """返回这些 key 中最长的剩余封禁秒数，未封禁返回0"""
+        ...
+
+    async def reset(self, key: str) -> None:
+        """清除 key 的计数和封禁"""
+        ...
+
+    def stats(self) -> dict[str, Any]:
+        """存储统计"""
+        ...
+
+
+class _Entry:
+    __slots__ = ("window_index", "previous", "current", "blocked_until")
+
+    def __init__(self, window_index: int):
+        self.window_index = window_index
+        self.previous = 0
+        self.current = 0
+        self.blocked_until = 0.0
+
+
+class MemoryThrottleStore:
+    """
+    进程内滑动窗口计数（分片字典）
+
+    每个 key 只保存两个窗口的计数和封禁截止时间；分片写满时先清理其中计数已过期的条目，
+    仍满时淘汰最早写入的未封禁条目，防止随机 key 撑满内存。封禁中的条目不会被淘汰：
+    分片内全部为封禁条目时不再接收新 key，新 key 视为封禁到最早的封禁到期（失败关闭），
+    避免攻击者用大量随机 key 把受害账号的封禁挤出存储。
+    多进程部署时各进程独立计数，需要全局限制请使用 Redis
+    """
+
+    def __init__(
+        self,
+        window: float,
+        shards: int = 16,
+        max_keys_per_shard: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window = window
+        self.max_keys_per_shard = max_keys_per_shard
+        self.clock = clock
+        self._shards: list[dict[str, _Entry]] = [{} for _ in range(shards)]
+        # 各分片因全部条目封禁而拒绝新 key 的截止时间
+        self._saturated_until = [0.0] * shards
+
+    def _shard_index(self, key: str) -> int:
+        return hash(key) % len(self._shards)
+
+    def _shard(self, key: str) -> dict[str, _Entry]:
+        return self._shards[self._shard_index(key)]
+
+    def _roll(self, entry: _Entry, window_index: int) -> None:
+        """把条目推进到当前窗口"""
+        if entry.window_index == window_index:
+            return
+        entry.previous = entry.current if entry.window_index == window_index - 1 else 0
+        entry.current = 0
+        entry.window_index = window_index
+
+    def _weighted(self, entry: _Entry, now: float) -> float:
+        elapsed = now / self.window - entry.window_index
+        return entry.previous * (1 - elapsed) + entry.current
+
+    def _make_room(self, index: int, now: float) -> bool:
+        """
+        分片已满时腾出一个位置：清理计数已过期且未封禁的条目，仍满时淘汰最早写入的未封禁条目
+        全部条目都在封禁中时不淘汰，记录分片拒绝新 key 的截止时间并返回 False
+        """
+        shard = self._shards[index]
+        if len(shard) < self.max_keys_per_shard:
+            return True
+
+        oldest_index = int(now // self.window) - 1
+        expired = [
+            key for key, entry in shard.items()
+            if entry.window_index < oldest_index and entry.blocked_until <= now
+        ]
+        for key in expired:
+            del shard[key]
+        if len(shard) < self.max_keys_per_shard:
+            return True
+
+        victim = next((key for key, entry in shard.items() if entry.blocked_until <= now), None)
+        if victim is None:
+            self._saturated_until[index] = min(entry.blocked_until for entry in shard.values())
+            return False
+        del shard[victim]
+        return True
+
+    async def hit(self, key: str) -> float:
+        now = self.clock()
+        window_index = int(now // self.window)
+        index = self._shard_index(key)
+        shard = self._shards[index]
+
+        entry = shard.get(key)
+        if entry is None:
+            if not self._make_room(index, now):
+                return math.inf
+            entry = shard[key] = _Entry(window_index)
+        else:
+            self._roll(entry, window_index)
+
+        entry.current += 1
+        return self._weighted(entry, now)
+
+    async def block(self, key: str, seconds: float) -> None:
+        now = self.clock()
+        index = self._shard_index(key)
+        shard = self._shards[index]
+        entry = shard.get(key)
+        if entry is None:
+            # 分片已满且全部封禁时，新 key 已由分片的拒绝截止时间覆盖
+            if not self._make_room(index, now):
+                return
+            entry = shard[key] = _Entry(int(now // self.window))
+        entry.blocked_until = max(entry.blocked_until, now + seconds)
+
+    async def blocked_for(self, *keys: str) -> float:
+        now = self.clock()
+        remaining = 0.0
+        for key in keys:
+            index = self._shard_index(key)
+            entry = self._shards[index].get(key)
+            blocked_until = entry.blocked_until if entry is not None else self._saturated_until[index]
+            if blocked_until > now:
+                remaining = max(remaining, blocked_until - now)
+        return remaining
+
+    async def reset(self, key: str) -> None:
+        self._shard(key).pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        """条目统计"""
+        now = self.clock()
+        return {
+            "backend": "memory",
+            "keys": sum(len(shard) for shard in self._shards),
+            "blocked": sum(
+                1 for shard in self._shards for entry in shard.values()
+                if entry.blocked_until > now
+            ),
+            "saturated_shards": sum(1 for until in self._saturated_until if until > now),
+        }
+
+
+class RedisThrottleStore:
+    """
+    Redis 滑动窗口计数（多进程共享）
+    每个窗口一个计数 key（INCR + EXPIRE），封禁使用带过期时间的独立 key
+    """
+
+    def __init__(self, client: Any, window: float, prefix: str = "throttle"):
+        self.client = client
+        self.window = window
+        self.prefix = prefix
+
+    def _count_key(self, key: str, window_index: int) -> str:
+        return f"{self.prefix}:count:{key}:{window_index}"
+
+    def _block_key(self, key: str) -> str:
+        return f"{self.prefix}:block:{key}"
+
+    async def hit(self, key: str) -> float:
+        now = time.time()
+        window_index = int(now // self.window)
+        current_key = self._count_key(key, window_index)
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, int(self.window * 2))
+            pipe.get(self._count_key(key, window_index - 1))
+            current, _, previous = await pipe.execute()
+
+        elapsed = now / self.window - window_index
+        return int(previous or 0) * (1 - elapsed) + int(current)
+
+    async def block(self, key: str, seconds: float) -> None:
+        block_key = self._block_key(key)
+        remaining = await self.client.pttl(block_key)
+        milliseconds = int(seconds * 1000)
+        if milliseconds > remaining:
+            await self.client.set(block_key, 1, px=milliseconds)
+
+    async def blocked_for(self, *keys: str) -> float:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.pttl(self._block_key(key))
+            remaining = await pipe.execute()
+        return max([0, *remaining]) / 1000
+
+    async def reset(self, key: str) -> None:
+        window_index = int(time.time() // self.window)
+        await self.client.delete(
+            self._count_key(key, window_index),
+            self._count_key(key, window_index - 1),
+            self._block_key(key),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """存储统计"""
+        return {"backend": "redis"}
+
+
+def create_throttle_store(backend: str, window: float, redis_url: Optional[str] = None) -> ThrottleStore:
+    """按配置创建计数存储（backend: memory / redis）"""
+    if backend == "redis":
+        # 仅在启用时导入
+        from redis.asyncio import Redis
+
+        return RedisThrottleStore(Redis.from_url(redis_url), window)
+    return MemoryThrottleStore(window)
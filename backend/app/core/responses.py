@@ -0,0 +1,37 @@
+from typing import Any, Generic, Mapping, Optional, TypeVar
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+
+class JSONSerializer(Generic[T]):
+    """
+    预构建的响应序列化器
+
+    TypeAdapter 在导入时构建一次（校验/序列化逻辑编译进 pydantic-core），
+    ORM 对象按 from_attributes 校验后直接输出 JSON 字节。
+    接口返回 response() 生成的 Response 时，FastAPI 不再按 response_model 重新校验、
+    转换为 dict 再编码，路由上的 response_model 只用于生成接口文档，两者应保持一致
+    """
+
+    def __init__(self, type_: Any):
+        self.adapter: TypeAdapter[T] = TypeAdapter(type_)
+
+    def dump(self, obj: Any) -> bytes:
+        """校验（可以是 ORM 对象、dict 或模型实例）并序列化为 JSON"""
+        return self.adapter.dump_json(self.adapter.validate_python(obj, from_attributes=True))
+
+    def response(
+        self,
+        obj: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        return Response(
+            content=self.dump(obj),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+        )
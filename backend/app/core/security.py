@@ -1,19 +1,28 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Any, Callable, Optional, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import Histogram
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def create_access_token(
     subject: Union[str, int],
-    expires_delta: Optional[timedelta] = None
+    expires_delta: Optional[timedelta] = None,
+    family_id: Optional[str] = None
 ) -> str:
-    """创建JWT访问令牌"""
+    """
+    创建JWT访问令牌
+    family_id: 所属刷新令牌族，令牌族被吊销后访问令牌随之失效
+    """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -22,6 +31,8 @@ def create_access_token(
         )
     
     to_encode = {"exp": expire, "sub": str(subject)}
+    if family_id:
+        to_encode["fid"] = family_id
     encoded_jwt = jwt.encode(
         to_encode, 
         settings.SECRET_KEY, 
@@ -30,6 +41,27 @@ def create_access_token(
     return encoded_jwt
 
 
+def create_refresh_token(
+    subject: Union[str, int],
+    family_id: str,
+    token_id: str,
+    expires_at: datetime
+) -> str:
+    """创建JWT刷新令牌"""
+    to_encode = {
+        "exp": expires_at,
+        "sub": str(subject),
+        "fid": family_id,
+        "jti": token_id,
+        "type": "refresh",
+    }
+    return jwt.encode(
+        to_encode,
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -38,3 +70,91 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """获取密码哈希"""
     return pwd_context.hash(password)
+
+
+class PasswordHasherBusy(Exception):
+    """密码哈希任务排队已满"""
+
+
+class PasswordHasher:
+    """
+    异步密码哈希服务
+    
+    bcrypt 计算放到有界线程池执行（bcrypt 计算期间释放GIL），避免阻塞事件循环；
+    排队任务超过上限时立即抛出 PasswordHasherBusy，由接口层返回503。
+    在途任务数在线程池任务结束时减少：请求取消（客户端断开）后已开始的 bcrypt 计算仍占用线程，继续计入
+    """
+    
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="password-hasher",
+        )
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self.rejected = 0
+        self.wait_time = Histogram()
+        self.hash_time = Histogram()
+    
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        
+        def timed() -> tuple[Any, float, float]:
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started, time.perf_counter()
+        
+        with self._in_flight_lock:
+            self._in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            future = self._executor.submit(timed)
+        except BaseException:
+            self._job_done(None)
+            raise
+        # 回调在工作线程中（或任务未开始即被取消时在当前线程中）执行
+        future.add_done_callback(self._job_done)
+        # 等待被取消时尝试取消线程池任务：未开始的任务不再执行，已开始的任务运行到结束
+        result, started, finished = await asyncio.wrap_future(future)
+        
+        self.wait_time.observe(started - submitted)
+        self.hash_time.observe(finished - started)
+        return result
+    
+    def _job_done(self, future: Optional[Future]) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+    
+    async def hash(self, password: str) -> str:
+        """异步获取密码哈希"""
+        return await self._run(get_password_hash, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """异步验证密码"""
+        return await self._run(verify_password, plain_password, hashed_password)
+    
+    def stats(self) -> dict[str, Any]:
+        """运行指标"""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - self.max_workers, 0),
+            "rejected": self.rejected,
+            "wait_time": self.wait_time.snapshot(),
+            "hash_time": self.hash_time.snapshot(),
+        }
+    
+    def shutdown(self) -> None:
+        """关闭线程池"""
+        self._executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -1,15 +1,65 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.core.config import settings
+from app.core.counters import counter_buffer, visitor_sketches
+from app.core.database import AsyncSessionLocal, replica_engine, replica_router
+from app.core.pagination import InvalidCursor
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.security import PasswordHasherBusy, password_hasher
+from app.services.auth_token import revoked_token_families
+from app.services.invite_quota import invite_quota_leases
+from app.services.leaderboard import points_leaderboard
 from app.api.v1.router import api_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动/关闭时的资源管理"""
+    async with AsyncSessionLocal() as session:
+        await revoked_token_families.rebuild(session)
+        await points_leaderboard.rebuild(session)
+    sync_task = asyncio.create_task(revoked_token_families.run_sync())
+    leaderboard_task = asyncio.create_task(points_leaderboard.run_rebuild())
+    counter_task = asyncio.create_task(counter_buffer.run())
+    visitor_task = asyncio.create_task(visitor_sketches.run())
+    lease_task = asyncio.create_task(invite_quota_leases.run())
+    
+    # 只读副本延迟检查（首次检查完成前读请求走主库）
+    replica_task = asyncio.create_task(replica_router.run()) if replica_engine is not None else None
+    
+    yield
+    
+    sync_task.cancel()
+    leaderboard_task.cancel()
+    counter_task.cancel()
+    visitor_task.cancel()
+    lease_task.cancel()
+    if replica_task is not None:
+        replica_task.cancel()
+    # 等待被取消的计数写入结束（写入中途取消的增量已合并回缓冲），再写入剩余部分
+    await asyncio.gather(counter_task, visitor_task, return_exceptions=True)
+    await invite_quota_leases.release_all()
+    await points_leaderboard.drain()
+    # 写入缓冲中剩余的浏览数等计数和访客估计
+    await counter_buffer.flush()
+    await visitor_sketches.flush()
+    password_hasher.shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
+    lifespan=lifespan,
+    # 未直接返回 Response 的接口用 orjson 编码（主要读接口用 app.core.responses.JSONSerializer 直接输出）
+    default_response_class=ORJSONResponse,
 )
 
 # CORS配置
@@ -21,10 +71,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# SQL统计（Server-Timing 响应头、N+1 警告）
+if settings.SQL_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD)
+
 # 注册路由
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """密码哈希排队已满时快速失败"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "服务繁忙，请稍后重试"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    """分页游标被篡改或来自其他列表"""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
 @app.get("/")
 async def root():
     return {
@@ -0,0 +1,2 @@
+# 导入所有模型，确保关系映射（如 User.posts -> Post）在首次查询前都能解析
+from app.models import user, content, forum, tool, homework, points, task, partner, like  # noqa: F401
@@ -1,11 +1,23 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, Float, String, Boolean, DateTime, Text, ForeignKey, Index, Enum as SQLEnum, JSON, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 import enum
 
 from app.core.database import Base
 
 
+def hot_score_computed(engagement: str) -> Computed:
+    """
+    热度：log10(互动量) + 创建时间（天），互动量每增加 10 倍相当于晚发布一天
+    分数只取决于行内的计数和创建时间（不随当前时间变化），作为存储的生成列由数据库在计数变化时重新计算，
+    新内容自然排在同等互动量的旧内容前面；按它建索引后热门排序直接按索引顺序读取
+    """
+    return Computed(
+        f"log(greatest({engagement}, 1)::float8) + coalesce(date_part('epoch', created_at), 0) / 86400",
+        persisted=True,
+    )
+
+
 class ContentType(enum.Enum):
     """内容类型"""
     VIDEO = "video"
@@ -51,6 +63,13 @@ class Content(Base):
     like_count = Column(Integer, default=0)
     comment_count = Column(Integer, default=0)
     share_count = Column(Integer, default=0)
+    visitor_count = Column(Integer, nullable=False, default=0, server_default="0")  # 独立访客数（HyperLogLog 估计）
+    visitor_sketch = deferred(Column(LargeBinary, nullable=True))  # 压缩的 HyperLogLog，只在写入访客时读取
+    # 热度（浏览 1、点赞 5、评论 10、分享 20 加权）
+    hot_score = Column(Float, hot_score_computed(
+        "coalesce(view_count, 0) + 5 * coalesce(like_count, 0)"
+        " + 10 * coalesce(comment_count, 0) + 20 * coalesce(share_count, 0)"
+    ), nullable=False)
     
     # 状态
     status = Column(SQLEnum(ContentStatus), default=ContentStatus.DRAFT)
@@ -69,6 +88,18 @@ class Content(Base):
     category = relationship("Category", back_populates="contents")
     author = relationship("User")
     comments = relationship("Comment", back_populates="content")
+    
+    __table_args__ = (
+        # 公开列表：按类型、状态（及分类）筛选，按 (创建时间, id) 倒序游标分页。
+        # 状态以绑定参数传入，预编译语句改用通用计划后无法匹配 status = 'PUBLISHED' 的部分索引，因此放在索引列中
+        Index("ix_contents_type_status_created_id", "content_type", "status", "created_at", "id"),
+        Index("ix_contents_category_type_status_created_id", "category_id", "content_type", "status", "created_at", "id"),
+        # 公开列表按热度排序（sort=hot），按 (热度, id) 倒序游标分页
+        Index("ix_contents_type_status_hot_id", "content_type", "status", "hot_score", "id"),
+        Index("ix_contents_category_type_status_hot_id", "category_id", "content_type", "status", "hot_score", "id"),
+        # 管理后台列表，按 (创建时间, id) 倒序游标分页
+        Index("ix_contents_created_at_id", "created_at", "id"),
+    )
 
 
 class Category(Base):
@@ -1,9 +1,10 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, Float, String, Boolean, DateTime, Text, ForeignKey, Index, Enum as SQLEnum, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 import enum
 
 from app.core.database import Base
+from app.models.content import hot_score_computed
 
 
 class PostStatus(enum.Enum):
@@ -32,6 +33,12 @@ class Post(Base):
     view_count = Column(Integer, default=0)
     like_count = Column(Integer, default=0)
     comment_count = Column(Integer, default=0)
+    visitor_count = Column(Integer, nullable=False, default=0, server_default="0")  # 独立访客数（HyperLogLog 估计）
+    visitor_sketch = deferred(Column(LargeBinary, nullable=True))  # 压缩的 HyperLogLog，只在写入访客时读取
+    # 热度（浏览 1、点赞 5、评论 10 加权）
+    hot_score = Column(Float, hot_score_computed(
+        "coalesce(view_count, 0) + 5 * coalesce(like_count, 0) + 10 * coalesce(comment_count, 0)"
+    ), nullable=False)
     
     # 状态
     status = Column(SQLEnum(PostStatus), default=PostStatus.PUBLISHED)
@@ -46,6 +53,11 @@ class Post(Base):
     author = relationship("User", back_populates="posts")
     category = relationship("ForumCategory", back_populates="posts")
     comments = relationship("Comment", back_populates="post")
+    
+    __table_args__ = (
+        # 帖子列表按热度排序，按 (热度, id) 倒序游标分页
+        Index("ix_posts_status_hot_id", "status", "hot_score", "id"),
+    )
 
 
 class ForumCategory(Base):
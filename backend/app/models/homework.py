@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index, Enum as SQLEnum, JSON
 from sqlalchemy.orm import relationship
 import enum
 
@@ -79,6 +79,14 @@ class Homework(Base):
     category = relationship("HomeworkCategory", back_populates="homeworks")
     publisher = relationship("User")
     submissions = relationship("HomeworkSubmission", back_populates="homework")
+    
+    __table_args__ = (
+        # 公开列表：按状态（及分类）筛选，按 (创建时间, id) 倒序游标分页
+        Index("ix_homeworks_status_created_id", "status", "created_at", "id"),
+        Index("ix_homeworks_category_status_created_id", "category_id", "status", "created_at", "id"),
+        # 管理后台列表，按 (创建时间, id) 倒序游标分页
+        Index("ix_homeworks_created_at_id", "created_at", "id"),
+    )
 
 
 class HomeworkSubmission(Base):
@@ -109,6 +117,15 @@ class HomeworkSubmission(Base):
     homework = relationship("Homework", back_populates="submissions")
     student = relationship("User", back_populates="homeworks")
     reviews = relationship("HomeworkReview", back_populates="submission")
+    
+    __table_args__ = (
+        # 作业的提交（按状态）、我的提交、管理后台列表（按状态），均按提交时间倒序；
+        # 管理后台列表按 (提交时间, id) 游标分页
+        Index("ix_homework_submissions_homework_status_submitted_id", "homework_id", "status", "submitted_at", "id"),
+        Index("ix_homework_submissions_student_submitted", "student_id", "submitted_at"),
+        Index("ix_homework_submissions_status_submitted_id", "status", "submitted_at", "id"),
+        Index("ix_homework_submissions_submitted_at_id", "submitted_at", "id"),
+    )
 
 
 class HomeworkReview(Base):
@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, Enum as SQLEnum
+import enum
+
+from app.core.database import Base
+
+
+class LikeTarget(enum.Enum):
+    """点赞对象类型"""
+    CONTENT = "content"  # 视频/图文/播客
+    POST = "post"        # 论坛帖子
+    COMMENT = "comment"  # 评论
+
+
+class Like(Base):
+    """
+    点赞表：每个用户对每个对象最多一条
+    对象表上的 like_count 与点赞记录在同一条语句中增减
+    """
+    __tablename__ = "likes"
+    
+    # 主键以用户开头：加载一个用户的全部点赞只扫描主键索引
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    target_type = Column(SQLEnum(LikeTarget), primary_key=True)
+    target_id = Column(Integer, primary_key=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # 删除对象时清理它的点赞
+        Index("ix_likes_target", "target_type", "target_id"),
+    )
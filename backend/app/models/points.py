@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum, Numeric
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Text, ForeignKey, Index, Enum as SQLEnum, Numeric, text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -48,6 +48,43 @@ class PointRecord(Base):
     user = relationship("User", back_populates="point_records")
 
 
+class PointPeriod(enum.Enum):
+    """积分排行榜周期"""
+    DAY = "day"
+    WEEK = "week"    # 周一开始
+    MONTH = "month"
+
+
+class PointRollup(Base):
+    """
+    积分汇总表：每个用户在每个周期（日/周/月）获得的积分
+    写入积分记录时同一事务内累加，按周期排行不需要扫描积分记录表
+    """
+    __tablename__ = "point_rollups"
+    
+    period = Column(SQLEnum(PointPeriod), primary_key=True)
+    bucket = Column(Date, primary_key=True)              # 周期起始日期（按 LEADERBOARD_TIMEZONE 划分）
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    points = Column(Integer, nullable=False, default=0)  # 周期内获得的积分（消费不扣减）
+    
+    __table_args__ = (
+        # 周期排行榜前 N 名（积分倒序、同分按用户ID）和排名（积分更高的人数）
+        Index("ix_point_rollups_period_bucket_points", "period", "bucket", text("points DESC"), "user_id"),
+    )
+
+
+class PointRollupBackfill(Base):
+    """
+    积分汇总回填进度（单行）
+    迁移时记下已有积分记录的最大ID，之后写入的记录由应用实时汇总，回填只处理 ID 不超过它的记录
+    """
+    __tablename__ = "point_rollup_backfill"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    until_id = Column(Integer, nullable=False)  # 需要回填的最大记录ID
+    done_id = Column(Integer, nullable=False)   # 已回填到的记录ID
+
+
 class PaymentStatus(enum.Enum):
     """支付状态"""
     PENDING = "pending"
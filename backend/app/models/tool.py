@@ -1,6 +1,6 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 import enum
 
 from app.core.database import Base
@@ -48,6 +48,8 @@ class Tool(Base):
     download_count = Column(Integer, default=0)
     view_count = Column(Integer, default=0)
     like_count = Column(Integer, default=0)
+    visitor_count = Column(Integer, nullable=False, default=0, server_default="0")  # 独立访客数（HyperLogLog 估计）
+    visitor_sketch = deferred(Column(LargeBinary, nullable=True))  # 压缩的 HyperLogLog，只在写入访客时读取
     
     # 状态
     is_active = Column(Boolean, default=True)
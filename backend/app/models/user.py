@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index, Sequence, Enum as SQLEnum, text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -14,6 +14,10 @@ class UserRole(enum.Enum):
     SUPER_ADMIN = "super_admin"      # 超级管理员
 
 
+# 邀请码序号序列（见 app/services/invite_code.py）
+invite_code_seq = Sequence("invite_code_seq", metadata=Base.metadata)
+
+
 class User(Base):
     """用户表"""
     __tablename__ = "users"
@@ -42,6 +46,7 @@ class User(Base):
     invite_code = Column(String(20), unique=True, index=True)
     invited_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     invite_quota = Column(Integer, default=5)
+    invited_count = Column(Integer, default=0, server_default="0", index=True)  # 直接邀请人数（冗余计数）
     
     # 状态
     is_active = Column(Boolean, default=True)
@@ -58,6 +63,51 @@ class User(Base):
     comments = relationship("Comment", back_populates="author")
     homeworks = relationship("HomeworkSubmission", back_populates="student")
     reviews = relationship("HomeworkReview", back_populates="reviewer")
+    point_records = relationship("PointRecord", back_populates="user")
+    
+    __table_args__ = (
+        Index("ix_users_invited_by_id_id", "invited_by_id", "id"),
+        # 积分排行榜（is_active = true 以字面量出现在查询中，可以使用部分索引）
+        Index("ix_users_active_points", "points", postgresql_where=text("is_active")),
+        # 管理后台用户列表，按 (注册时间, id) 倒序游标分页
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+
+
+class UserInviteClosure(Base):
+    """
+    邀请关系闭包表
+    每个用户对自己及每一级上游邀请人各有一行，depth 为层级距离（自身为0）
+    """
+    __tablename__ = "user_invite_closure"
+    
+    ancestor_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_user_invite_closure_ancestor_depth", "ancestor_id", "depth"),
+        Index("ix_user_invite_closure_descendant_depth", "descendant_id", "depth"),
+    )
+
+
+class RefreshTokenFamily(Base):
+    """
+    刷新令牌族
+    一次登录产生一个令牌族，每次刷新轮换 current_jti；
+    旧的刷新令牌再次使用视为泄露，整个令牌族被吊销
+    """
+    __tablename__ = "refresh_token_families"
+
+    id = Column(String(32), primary_key=True)  # 令牌族ID（随机128位，十六进制）
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    current_jti = Column(String(32), nullable=False)  # 当前有效的刷新令牌ID
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=True, index=True)
+    revoke_reason = Column(String(20), nullable=True)  # logout / reuse / banned
 
 
 class UserLevel(Base):
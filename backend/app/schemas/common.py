@@ -21,6 +21,9 @@ class ResponseList(ResponseBase, Generic[T]):
     total: int = 0
     page: int = 1
     page_size: int = 20
+    total_estimated: bool = False  # total 为规划器估计值（大表）
+    next_cursor: Optional[str] = None  # 游标分页：下一页/上一页游标，没有时为 None
+    prev_cursor: Optional[str] = None
 
 
 class ErrorResponse(BaseModel):
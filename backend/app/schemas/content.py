@@ -1,9 +1,16 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+import enum
 from app.models.content import ContentType, ContentStatus
 
 
+class ContentSort(str, enum.Enum):
+    """公开内容列表的排序方式"""
+    LATEST = "latest"  # 最新发布
+    HOT = "hot"  # 热度（互动量按发布时间衰减）
+
+
 class ContentBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     slug: Optional[str] = None
@@ -54,19 +61,63 @@ class ContentResponse(ContentBase):
     like_count: int
     comment_count: int
     share_count: int
+    visitor_count: int  # 独立访客数（近似值）
     created_at: datetime
     updated_at: datetime
     published_at: Optional[datetime]
+    liked: bool = False  # 当前用户是否已点赞（未登录为 false）
 
     class Config:
         from_attributes = True
 
 
+class ContentListItem(BaseModel):
+    """列表项：不含简介、正文、视频地址，详情接口返回完整内容"""
+    id: int
+    title: str
+    slug: Optional[str] = None
+    content_type: ContentType
+    video_source: Optional[str] = None
+    cover_image: Optional[str] = None
+    duration: Optional[int] = None
+    category_id: Optional[int] = None
+    tags: List[str] = Field(default_factory=list)
+    is_free: bool = True
+    required_points: int = 0
+    required_level: int = 0
+    status: ContentStatus
+    is_featured: bool = False
+    is_pinned: bool = False
+    author_id: int
+    view_count: int
+    like_count: int
+    comment_count: int
+    share_count: int
+    visitor_count: int  # 独立访客数（近似值）
+    created_at: datetime
+    updated_at: datetime
+    published_at: Optional[datetime]
+    liked: bool = False  # 当前用户是否已点赞（未登录为 false）
+
+    class Config:
+        from_attributes = True
+
+
+class ContentPage(BaseModel):
+    """公开内容列表"""
+    items: List[ContentListItem]
+    total: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
 class ContentListResponse(BaseModel):
-    items: List[ContentResponse]
+    items: List[ContentListItem]
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class CategoryBase(BaseModel):
@@ -97,3 +148,7 @@ class CategoryResponse(CategoryBase):
 
     class Config:
         from_attributes = True
+
+
+class CategoryListResponse(BaseModel):
+    items: List[CategoryResponse]
@@ -0,0 +1,67 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+from app.models.homework import HomeworkStatus, SubmissionStatus
+
+
+class HomeworkListItem(BaseModel):
+    """作业列表项：不含说明和作业要求，详情接口返回完整内容"""
+    id: int
+    title: str
+    category_id: Optional[int] = None
+    related_content_id: Optional[int] = None
+    base_points: int
+    excellent_points: int
+    deadline: Optional[datetime] = None
+    status: HomeworkStatus
+    submission_count: int
+    publisher_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class HomeworkResponse(HomeworkListItem):
+    description: str
+    requirements: Optional[str] = None
+    reference_materials: List[str] = []
+
+
+class HomeworkListResponse(BaseModel):
+    items: List[HomeworkListItem]
+    total: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class SubmissionListItem(BaseModel):
+    """提交列表项：不含提交内容和附件"""
+    id: int
+    homework_id: int
+    student_id: int
+    status: SubmissionStatus
+    points_earned: int
+    submitted_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SubmissionResponse(SubmissionListItem):
+    content: str
+    attachments: List[str] = []
+
+
+class SubmissionListResponse(BaseModel):
+    items: List[SubmissionListItem]
+    total: int
+    total_estimated: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class MySubmissionsResponse(BaseModel):
+    items: List[SubmissionResponse]
@@ -3,18 +3,45 @@ from typing import Optional, List
 from pydantic import BaseModel, EmailStr, Field, field_validator
 import re
 
+from app.models.user import UserRole
+
 
 # ============ Token相关 ============
 class Token(BaseModel):
     """Token响应"""
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # 访问令牌有效秒数
 
 
 class TokenPayload(BaseModel):
     """Token载荷"""
     sub: Optional[int] = None
     exp: Optional[datetime] = None
+    fid: Optional[str] = None   # 令牌族ID
+    jti: Optional[str] = None   # 刷新令牌ID
+    type: Optional[str] = None  # refresh 表示刷新令牌
+
+
+class RefreshTokenRequest(BaseModel):
+    """刷新/登出请求"""
+    refresh_token: str
+
+
+class Principal(BaseModel):
+    """已认证用户快照（认证缓存使用，不含敏感字段）"""
+    id: int
+    role: UserRole
+    is_active: bool
+    level: int
+    experience: int
+    points: int
+    total_points_earned: int
+    
+    class Config:
+        from_attributes = True
+        frozen = True
 
 
 # ============ 用户注册 ============
@@ -122,6 +149,11 @@ class UserPublic(BaseModel):
         from_attributes = True
 
 
+class LeaderboardEntry(UserPublic):
+    """积分排行榜条目"""
+    points: int
+
+
 class UserProfile(UserInDB):
     """用户完整信息（本人可见）"""
     invited_count: int = 0
@@ -138,6 +170,20 @@ class InviteCodeInfo(BaseModel):
     invited_users: List[UserPublic] = []
 
 
+class InviteTreeStats(BaseModel):
+    """邀请树统计"""
+    user_id: int
+    invited_by_id: Optional[int] = None
+    depth: int = 0               # 所在层级（根用户为0）
+    invited_count: int = 0       # 直接邀请人数
+    subtree_size: int = 0        # 所有层级下级总人数
+
+
+class TopInviter(UserPublic):
+    """邀请排行"""
+    invited_count: int = 0
+
+
 class InviteCodeValidate(BaseModel):
     """验证邀请码请求"""
     invite_code: str
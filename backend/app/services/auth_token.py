@@ -0,0 +1,301 @@
+import asyncio
+import hashlib
+import logging
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from jose import JWTError, jwt
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bloom import BloomFilter
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, run_after_commit
+from app.core.security import create_access_token, create_refresh_token
+from app.models.user import RefreshTokenFamily
+from app.schemas.user import Token, TokenPayload
+from app.services.user import UserService
+
+logger = logging.getLogger(__name__)
+
+
+# 已验证的访问令牌载荷（按令牌摘要缓存），同一令牌重复请求时跳过签名校验和载荷解析
+access_token_cache: LRUCache[TokenPayload] = LRUCache(
+    maxsize=settings.ACCESS_TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+def _new_token_id() -> str:
+    """随机128位ID（十六进制）"""
+    return secrets.token_hex(16)
+
+
+def decode_access_token(token: str) -> Optional[TokenPayload]:
+    """
+    校验访问令牌并返回载荷，令牌无效、已过期或是刷新令牌时返回None
+    校验通过的载荷缓存到令牌过期为止；无效令牌不缓存
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = access_token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    try:
+        payload = TokenPayload(**jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM]
+        ))
+    except (JWTError, ValueError):
+        return None
+
+    if payload.sub is None or payload.type == "refresh":
+        return None
+
+    # 条目存活到令牌过期为止（不超过缓存默认TTL）
+    ttl = payload.exp.timestamp() - time.time() if payload.exp else None
+    access_token_cache.set(key, payload, ttl)
+    return payload
+
+
+class RevokedTokenFamilies:
+    """
+    已吊销令牌族的进程内过滤器
+
+    访问令牌携带令牌族ID，认证时先查布隆过滤器：未命中（绝大多数请求）直接放行，
+    不访问数据库；命中时再查表确认，排除误报。
+    令牌族被吊销后不会再签发新的访问令牌，因此过滤器只需保存最近一个访问令牌有效期内
+    被吊销的令牌族，定期从数据库重建，体积保持很小
+    """
+
+    def __init__(self, capacity: int, error_rate: float, sync_interval: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._filter = BloomFilter(capacity, error_rate)
+        self._synced_at: Optional[datetime] = None
+        self._rebuilt_at: Optional[datetime] = None
+        self.positives = 0
+        self.false_positives = 0
+
+    @property
+    def window(self) -> timedelta:
+        """需要保留的吊销记录时长：访问令牌有效期 + 同步延迟"""
+        return timedelta(
+            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+            seconds=self.sync_interval * 2,
+        )
+
+    def might_be_revoked(self, family_id: str) -> bool:
+        """令牌族可能已被吊销（可能误报，不会漏报）"""
+        if family_id in self._filter:
+            self.positives += 1
+            return True
+        return False
+
+    def add(self, family_id: str) -> None:
+        """记录吊销的令牌族"""
+        self._filter.add(family_id)
+
+    async def _revoked_since(self, db: AsyncSession, since: datetime) -> list[str]:
+        result = await db.execute(
+            select(RefreshTokenFamily.id).where(RefreshTokenFamily.revoked_at >= since)
+        )
+        return list(result.scalars().all())
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """从令牌族表重建过滤器（启动时及每个访问令牌有效期调用一次）"""
+        now = datetime.utcnow()
+        family_ids = await self._revoked_since(db, now - self.window)
+
+        bloom = BloomFilter(max(self.capacity, len(family_ids) * 2), self.error_rate)
+        for family_id in family_ids:
+            bloom.add(family_id)
+
+        self._filter = bloom
+        self._synced_at = now
+        self._rebuilt_at = now
+
+    async def sync(self, db: AsyncSession) -> bool:
+        """
+        增量同步其他进程吊销的令牌族，距上次重建超过保留时长时整体重建
+        返回是否进行了重建
+        """
+        now = datetime.utcnow()
+        if self._rebuilt_at is None or now - self._rebuilt_at >= self.window:
+            await self.rebuild(db)
+            return True
+
+        # 回看一个同步周期，覆盖写入后延迟提交的吊销记录
+        since = self._synced_at - timedelta(seconds=self.sync_interval)
+        for family_id in await self._revoked_since(db, since):
+            self.add(family_id)
+        self._synced_at = now
+        return False
+
+    async def run_sync(self) -> None:
+        """后台同步任务（在应用生命周期内运行），重建时顺带清理过期令牌族"""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    if await self.sync(session):
+                        await purge_expired_token_families(session)
+                        await session.commit()
+            except Exception:
+                logger.exception("同步令牌吊销列表失败")
+
+    def stats(self) -> dict[str, Any]:
+        """过滤器统计"""
+        return {
+            **self._filter.stats(),
+            "positives": self.positives,
+            "false_positives": self.false_positives,
+            "rebuilt_at": self._rebuilt_at.isoformat() if self._rebuilt_at else None,
+        }
+
+
+revoked_token_families = RevokedTokenFamilies(
+    capacity=settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+)
+
+
+class TokenService:
+    """访问令牌/刷新令牌签发、轮换与吊销"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _token_pair(self, user_id: int, family_id: str, token_id: str, expires_at: datetime) -> Token:
+        return Token(
+            access_token=create_access_token(subject=user_id, family_id=family_id),
+            refresh_token=create_refresh_token(user_id, family_id, token_id, expires_at),
+            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        )
+
+    async def issue(self, user_id: int) -> Token:
+        """登录时创建新的令牌族并签发令牌"""
+        family = RefreshTokenFamily(
+            id=_new_token_id(),
+            user_id=user_id,
+            current_jti=_new_token_id(),
+            expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+        self.db.add(family)
+        await self.db.flush()
+        return self._token_pair(user_id, family.id, family.current_jti, family.expires_at)
+
+    async def rotate(self, refresh_token: str) -> tuple[Optional[Token], str]:
+        """
+        用刷新令牌换取新的令牌对，旧刷新令牌随即失效
+        已轮换过的刷新令牌再次出现说明令牌可能泄露，吊销整个令牌族
+        返回: (新令牌, 消息)
+        """
+        payload = self.decode_refresh_token(refresh_token)
+        if payload is None:
+            return None, "刷新令牌无效"
+
+        now = datetime.utcnow()
+        new_jti = _new_token_id()
+        expires_at = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+        # 只有持有当前 jti 的请求能完成轮换，并发重放中最多一个成功
+        result = await self.db.execute(
+            update(RefreshTokenFamily)
+            .where(
+                RefreshTokenFamily.id == payload.fid,
+                RefreshTokenFamily.current_jti == payload.jti,
+                RefreshTokenFamily.revoked_at.is_(None),
+                RefreshTokenFamily.expires_at > now,
+            )
+            .values(current_jti=new_jti, last_used_at=now, expires_at=expires_at)
+            .returning(RefreshTokenFamily.user_id)
+        )
+        user_id = result.scalar_one_or_none()
+
+        if user_id is None:
+            family = await self.db.get(RefreshTokenFamily, payload.fid)
+            if family is not None and family.revoked_at is None and family.expires_at > now:
+                await self.revoke_family(payload.fid, "reuse")
+                return None, "刷新令牌已被使用，请重新登录"
+            return None, "登录已过期，请重新登录"
+
+        principal = await UserService(self.db).get_principal(user_id)
+        if principal is None or not principal.is_active:
+            await self.revoke_family(payload.fid, "banned")
+            return None, "账号已被禁用"
+
+        return self._token_pair(user_id, payload.fid, new_jti, expires_at), "刷新成功"
+
+    def decode_refresh_token(self, refresh_token: str) -> Optional[TokenPayload]:
+        """校验刷新令牌签名、有效期和类型"""
+        try:
+            payload = TokenPayload(**jwt.decode(
+                refresh_token,
+                settings.SECRET_KEY,
+                algorithms=[settings.ALGORITHM]
+            ))
+        except (JWTError, ValueError):
+            return None
+
+        if payload.type != "refresh" or not payload.fid or not payload.jti:
+            return None
+        return payload
+
+    async def revoke_family(self, family_id: str, reason: str) -> None:
+        """吊销令牌族（登出、检测到重放）"""
+        await self.db.execute(
+            update(RefreshTokenFamily)
+            .where(
+                RefreshTokenFamily.id == family_id,
+                RefreshTokenFamily.revoked_at.is_(None),
+            )
+            .values(revoked_at=datetime.utcnow(), revoke_reason=reason)
+        )
+        run_after_commit(self.db, lambda: revoked_token_families.add(family_id))
+
+    async def revoke_user(self, user_id: int, reason: str) -> int:
+        """吊销用户的全部令牌族（退出所有设备、封禁），返回吊销数量"""
+        result = await self.db.execute(
+            update(RefreshTokenFamily)
+            .where(
+                RefreshTokenFamily.user_id == user_id,
+                RefreshTokenFamily.revoked_at.is_(None),
+                RefreshTokenFamily.expires_at > datetime.utcnow(),
+            )
+            .values(revoked_at=datetime.utcnow(), revoke_reason=reason)
+            .returning(RefreshTokenFamily.id)
+        )
+        family_ids = list(result.scalars().all())
+
+        def add_all() -> None:
+            for family_id in family_ids:
+                revoked_token_families.add(family_id)
+
+        run_after_commit(self.db, add_all)
+        return len(family_ids)
+
+    async def is_family_revoked(self, family_id: str) -> bool:
+        """查表确认令牌族是否已吊销（过滤器命中后调用）"""
+        result = await self.db.execute(
+            select(RefreshTokenFamily.revoked_at).where(RefreshTokenFamily.id == family_id)
+        )
+        row = result.one_or_none()
+        revoked = row is None or row.revoked_at is not None
+        if not revoked:
+            revoked_token_families.false_positives += 1
+        return revoked
+
+
+async def purge_expired_token_families(db: AsyncSession) -> int:
+    """删除已过期的令牌族，返回删除数量"""
+    result = await db.execute(
+        delete(RefreshTokenFamily).where(RefreshTokenFamily.expires_at < datetime.utcnow())
+    )
+    return result.rowcount
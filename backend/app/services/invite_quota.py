@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+async def consume_invite_quota(
+    db: AsyncSession,
+    invite_code: str,
+    amount: int = 1,
+) -> Optional[tuple[int, int]]:
+    """
+    原子扣减邀请配额
+    UPDATE ... WHERE invite_quota > 0 RETURNING，配额不足 amount 时扣减剩余全部
+    返回: (邀请人ID, 实际扣减数量)，邀请码无效或配额已用尽时返回None
+    """
+    current = (
+        select(User.id, User.invite_quota)
+        .where(
+            User.invite_code == invite_code,
+            User.is_active.is_(True),
+            User.invite_quota > 0,
+        )
+        .with_for_update()
+        .cte("current_quota")
+    )
+    taken = func.least(current.c.invite_quota, amount)
+    result = await db.execute(
+        update(User)
+        .where(User.id == current.c.id)
+        .values(invite_quota=User.invite_quota - taken)
+        .returning(User.id, taken)
+    )
+    row = result.one_or_none()
+    return (row[0], row[1]) if row else None
+
+
+async def restore_invite_quota(
+    db: AsyncSession,
+    inviter_id: int,
+    amount: int,
+    invited: int = 0,
+) -> None:
+    """归还未使用的邀请配额，同时累加期间已邀请的人数"""
+    await db.execute(
+        update(User)
+        .where(User.id == inviter_id)
+        .values(
+            invite_quota=User.invite_quota + amount,
+            invited_count=User.invited_count + invited,
+        )
+    )
+
+
+class _Lease:
+    """单个邀请码在本进程内持有的配额块"""
+
+    __slots__ = ("inviter_id", "granted", "remaining", "expires_at")
+
+    def __init__(self, inviter_id: int, granted: int, expires_at: float):
+        self.inviter_id = inviter_id
+        self.granted = granted
+        self.remaining = granted
+        self.expires_at = expires_at
+
+    @property
+    def used(self) -> int:
+        return self.granted - self.remaining
+
+    def usable(self, now: float) -> bool:
+        return self.remaining > 0 and self.expires_at > now
+
+
+class InviteQuotaLeases:
+    """
+    热门邀请码的配额租约
+
+    同一邀请码在一分钟内使用次数达到阈值后，本进程一次性原子扣减一块配额
+    （独立事务提交），之后的注册直接从本地租约中分配，不再竞争邀请人那一行。
+    租约到期后（下次使用该邀请码时，或由后台任务每个有效期清理一次）以及进程退出时归还剩余配额并累加邀请计数；
+    进程异常退出会丢失未结算的租约（每个热门邀请码最多 block_size 个配额和期间的邀请计数），但不会超发
+    """
+
+    # 进程异常退出时未结算的租约无法归还，限制每块大小和有效期以控制损失
+    MAX_BLOCK_SIZE = 100
+    MAX_TTL = 300
+
+    def __init__(self, block_size: int, hot_threshold: int, ttl: float):
+        self.block_size = min(block_size, self.MAX_BLOCK_SIZE)
+        self.hot_threshold = hot_threshold
+        self.ttl = min(ttl, self.MAX_TTL)
+        self._leases: dict[str, _Lease] = {}
+        self._usage: dict[str, tuple[float, int]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.block_size > 0
+
+    def _record_usage(self, invite_code: str) -> int:
+        """记录一次使用，返回当前一分钟窗口内的使用次数"""
+        now = time.monotonic()
+        window_start, count = self._usage.get(invite_code, (now, 0))
+        if now - window_start >= 60:
+            window_start, count = now, 0
+        if len(self._usage) > 10000 and invite_code not in self._usage:
+            self._usage.clear()
+        self._usage[invite_code] = (window_start, count + 1)
+        return count + 1
+
+    async def acquire(self, invite_code: str) -> Optional[int]:
+        """
+        从本地租约中取一个配额
+        返回邀请人ID；未启用、不是热门邀请码或配额已用尽时返回None（走数据库原子扣减）
+        """
+        if not self.enabled:
+            return None
+
+        usage = self._record_usage(invite_code)
+        lease = self._leases.get(invite_code)
+        if lease is None or not lease.usable(time.monotonic()):
+            if usage < self.hot_threshold:
+                # 不再热门：先结算失效的租约，归还的配额随后由数据库原子扣减使用
+                if lease is not None:
+                    await self._settle(invite_code)
+                return None
+            lease = await self._renew(invite_code)
+            if lease is None:
+                return None
+
+        lease.remaining -= 1
+        return lease.inviter_id
+
+    async def release(self, invite_code: str, inviter_id: int) -> None:
+        """注册失败时退回一个配额"""
+        lease = self._leases.get(invite_code)
+        if lease is not None and lease.inviter_id == inviter_id and lease.used > 0:
+            lease.remaining += 1
+            return
+
+        # 原租约已结算（这个配额被计为已使用），直接在数据库中冲正
+        async with AsyncSessionLocal() as session:
+            await restore_invite_quota(session, inviter_id, 1, -1)
+            await session.commit()
+
+    async def _renew(self, invite_code: str) -> Optional[_Lease]:
+        lock = self._locks.setdefault(invite_code, asyncio.Lock())
+        async with lock:
+            lease = self._leases.get(invite_code)
+            now = time.monotonic()
+            if lease is not None and lease.usable(now):
+                return lease
+
+            async with AsyncSessionLocal() as session:
+                if lease is not None:
+                    await restore_invite_quota(
+                        session, lease.inviter_id, lease.remaining, lease.used
+                    )
+                taken = await consume_invite_quota(session, invite_code, self.block_size)
+                await session.commit()
+
+            if taken is None:
+                self._leases.pop(invite_code, None)
+                return None
+
+            inviter_id, amount = taken
+            lease = _Lease(inviter_id, amount, now + self.ttl)
+            self._leases[invite_code] = lease
+            return lease
+
+    async def _settle(self, invite_code: str) -> None:
+        """结算已失效（到期或用完）的租约"""
+        lock = self._locks.setdefault(invite_code, asyncio.Lock())
+        async with lock:
+            lease = self._leases.get(invite_code)
+            if lease is None or lease.usable(time.monotonic()):
+                return
+            async with AsyncSessionLocal() as session:
+                await restore_invite_quota(session, lease.inviter_id, lease.remaining, lease.used)
+                await session.commit()
+            self._leases.pop(invite_code, None)
+
+    async def settle_expired(self) -> int:
+        """结算所有已到期的租约（包括之后不再使用的邀请码），返回结算的租约数"""
+        now = time.monotonic()
+        expired = [code for code, lease in self._leases.items() if lease.expires_at <= now]
+        for invite_code in expired:
+            await self._settle(invite_code)
+        # 清理空闲邀请码的锁
+        for invite_code in [code for code, lock in self._locks.items() if not lock.locked()]:
+            if invite_code not in self._leases:
+                del self._locks[invite_code]
+        return len(expired)
+
+    async def run(self) -> None:
+        """后台结算任务（在应用生命周期内运行）：每个租约有效期结算一次到期租约"""
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.settle_expired()
+            except Exception:
+                logger.exception("结算邀请配额租约失败，下个周期重试")
+
+    async def release_all(self) -> None:
+        """结算所有租约：归还剩余配额并累加邀请计数（应用关闭时调用）"""
+        leases = list(self._leases.values())
+        self._leases.clear()
+        if not leases:
+            return
+
+        async with AsyncSessionLocal() as session:
+            for lease in leases:
+                await restore_invite_quota(
+                    session, lease.inviter_id, lease.remaining, lease.used
+                )
+            await session.commit()
+
+    def stats(self) -> dict[str, int]:
+        """租约统计"""
+        return {
+            "leases": len(self._leases),
+            "leased_remaining": sum(lease.remaining for lease in self._leases.values()),
+        }
+
+
+invite_quota_leases = InviteQuotaLeases(
+    block_size=settings.INVITE_QUOTA_LEASE_SIZE,
+    hot_threshold=settings.INVITE_QUOTA_HOT_THRESHOLD,
+    ttl=settings.INVITE_QUOTA_LEASE_TTL,
+)
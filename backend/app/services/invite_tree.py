@@ -0,0 +1,124 @@
+from typing import List, Optional
+
+from sqlalchemy import func, insert, literal, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.user import User, UserInviteClosure
+from app.schemas.user import InviteTreeStats
+
+# 下级总人数需要扫描闭包表的一段索引范围，短时间缓存
+subtree_size_cache: LRUCache[int] = LRUCache(
+    maxsize=settings.INVITE_TREE_CACHE_SIZE,
+    ttl=settings.INVITE_TREE_CACHE_TTL,
+)
+
+
+def insert_invite_closure(new_user):
+    """
+    为新用户写入闭包行（data-modifying CTE，可与注册语句合并执行）
+    new_user: 含 id、invited_by_id 列的可选择对象（通常是 INSERT ... RETURNING 的CTE）
+    """
+    self_row = select(new_user.c.id, new_user.c.id, literal(0))
+    ancestor_rows = select(
+        UserInviteClosure.ancestor_id,
+        new_user.c.id,
+        UserInviteClosure.depth + 1,
+    ).join_from(
+        UserInviteClosure,
+        new_user,
+        UserInviteClosure.descendant_id == new_user.c.invited_by_id,
+    )
+    return (
+        insert(UserInviteClosure)
+        .from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            union_all(self_row, ancestor_rows),
+        )
+        .cte("new_user_invite_closure")
+    )
+
+
+async def rebuild_invite_tree(db: AsyncSession) -> None:
+    """
+    由 users.invited_by_id 重建闭包表和直接邀请计数（幂等）
+    用于初始化或修复不经注册流程写入的用户
+    """
+    await db.execute(text("""
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM users
+            UNION ALL
+            SELECT tree.ancestor_id, users.id, tree.depth + 1
+            FROM tree JOIN users ON users.invited_by_id = tree.descendant_id
+        )
+        INSERT INTO user_invite_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM tree
+        ON CONFLICT DO NOTHING
+    """))
+    await db.execute(text("""
+        UPDATE users SET invited_count = (
+            SELECT count(*) FROM users AS invitee WHERE invitee.invited_by_id = users.id
+        )
+    """))
+
+
+class InviteTreeService:
+    """邀请关系树查询"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_depth(self, user_id: int) -> int:
+        """用户在邀请树中的层级（根用户为0）"""
+        result = await self.db.execute(
+            select(func.max(UserInviteClosure.depth))
+            .where(UserInviteClosure.descendant_id == user_id)
+        )
+        return result.scalar() or 0
+
+    async def get_subtree_size(self, user_id: int) -> int:
+        """所有层级下级用户总数"""
+        size = subtree_size_cache.get(user_id)
+        if size is not None:
+            return size
+
+        result = await self.db.execute(
+            select(func.count())
+            .select_from(UserInviteClosure)
+            .where(
+                UserInviteClosure.ancestor_id == user_id,
+                UserInviteClosure.depth > 0,
+            )
+        )
+        size = result.scalar() or 0
+        subtree_size_cache.set(user_id, size)
+        return size
+
+    async def get_stats(self, user_id: int) -> Optional[InviteTreeStats]:
+        """用户的邀请树统计"""
+        result = await self.db.execute(
+            select(User.id, User.invited_by_id, User.invited_count)
+            .where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        return InviteTreeStats(
+            user_id=row.id,
+            invited_by_id=row.invited_by_id,
+            depth=await self.get_depth(user_id),
+            invited_count=row.invited_count or 0,
+            subtree_size=await self.get_subtree_size(user_id),
+        )
+
+    async def get_top_inviters(self, limit: int = 10) -> List[User]:
+        """直接邀请人数最多的用户（走 invited_count 索引）"""
+        result = await self.db.execute(
+            select(User)
+            .where(User.invited_count > 0)
+            .order_by(User.invited_count.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import Integer, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, run_after_commit
+from app.core.ranking import RankingStore, create_ranking_store
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class PointsLeaderboard:
+    """
+    积分排行榜（有序集合，成员为活跃用户ID，分数为当前积分）
+
+    启动时从数据库重建，积分变动、封禁/解封在事务提交后增量更新，
+    排行榜前 N 名和单个用户的排名都是 O(log n)，不再每次扫描用户表排序。
+    尚未重建完成或存储不可用时回退到数据库查询（ix_users_active_points 部分索引），
+    增量更新失败后同样回退，直到下一次定期重建。
+    重建期间的增量更新同时记录下来，整体替换后按顺序重放，不会被重建前读出的旧数据覆盖
+    """
+
+    def __init__(self, store: RankingStore, rebuild_interval: float):
+        self.store = store
+        self.rebuild_interval = rebuild_interval
+        self.ready = False
+        self.fallbacks = 0
+        self._rebuilt_at: Optional[datetime] = None
+        self._pending: set[asyncio.Task] = set()
+        self._journal: Optional[list[tuple[int, Optional[int]]]] = None
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """从用户表重建（启动时及每 rebuild_interval 秒调用一次）"""
+        self._journal = []
+        try:
+            result = await db.execute(
+                select(User.id, User.points)
+                .where(User.is_active == True)
+                .order_by(User.points.desc(), User.id)
+            )
+            await self.store.replace(result.tuples().all())
+            # 重放期间可能继续追加
+            index = 0
+            while index < len(self._journal):
+                await self._write(*self._journal[index])
+                index += 1
+        finally:
+            self._journal = None
+        self.ready = True
+        self._rebuilt_at = datetime.utcnow()
+
+    async def run_rebuild(self) -> None:
+        """后台定期重建任务（在应用生命周期内运行），修正多进程或更新失败造成的偏差"""
+        while True:
+            await asyncio.sleep(self.rebuild_interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await self.rebuild(session)
+            except Exception:
+                logger.exception("重建积分排行榜失败")
+
+    def track(self, db: AsyncSession, user: User) -> None:
+        """积分或启用状态变更后调用：事务提交后按用户的最新状态更新排行榜，回滚时不更新"""
+        user_id = user.id
+        points = user.points if user.is_active else None
+        run_after_commit(db, lambda: self._schedule(user_id, points))
+
+    def _schedule(self, user_id: int, points: Optional[int]) -> None:
+        # 提交回调是同步的，更新放到事件循环中执行
+        task = asyncio.get_running_loop().create_task(self._apply(user_id, points))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _write(self, user_id: int, points: Optional[int]) -> None:
+        if points is None:
+            await self.store.remove(user_id)
+        else:
+            await self.store.set(user_id, points)
+
+    async def _apply(self, user_id: int, points: Optional[int]) -> None:
+        if self._journal is not None:
+            self._journal.append((user_id, points))
+        try:
+            await self._write(user_id, points)
+        except Exception:
+            self.ready = False
+            logger.warning("积分排行榜更新失败，重建前回退到数据库查询", exc_info=True)
+
+    async def drain(self) -> None:
+        """等待已提交的更新写入（关闭时调用）"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def top(self, db: AsyncSession, limit: int) -> list[User]:
+        """积分最高的 limit 个活跃用户（积分相同按注册先后）"""
+        if self.ready:
+            try:
+                entries = await self.store.top(limit)
+            except Exception:
+                logger.warning("积分排行榜不可用，回退到数据库查询", exc_info=True)
+            else:
+                if not entries:
+                    return []
+                ids = [user_id for user_id, _ in entries]
+                # 数组作为单个参数传入（= ANY），语句文本固定，不随 ID 个数展开
+                result = await db.execute(
+                    select(User).where(User.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+                )
+                users = {user.id: user for user in result.scalars().all()}
+                return [users[user_id] for user_id in ids if user_id in users]
+
+        self.fallbacks += 1
+        result = await db.execute(
+            select(User)
+            .where(User.is_active == True)
+            .order_by(User.points.desc(), User.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def rank(self, db: AsyncSession, user_id: int, points: int) -> tuple[int, int]:
+        """
+        用户的 (排名, 积分)，排名为 1 + 积分严格更高的活跃用户数
+        points 为调用方已知的积分，排行榜中没有该用户时按它在数据库中计算
+        """
+        if self.ready:
+            try:
+                entry = await self.store.rank(user_id)
+            except Exception:
+                logger.warning("积分排行榜不可用，回退到数据库查询", exc_info=True)
+            else:
+                if entry is not None:
+                    return entry
+
+        self.fallbacks += 1
+        higher = await db.execute(
+            select(func.count())
+            .select_from(User)
+            .where(User.is_active == True, User.points > points)
+        )
+        return higher.scalar_one() + 1, points
+
+    def stats(self) -> dict[str, Any]:
+        """排行榜统计"""
+        return {
+            **self.store.stats(),
+            "ready": self.ready,
+            "fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+            "rebuilt_at": self._rebuilt_at.isoformat() if self._rebuilt_at else None,
+        }
+
+
+points_leaderboard = PointsLeaderboard(
+    store=create_ranking_store(
+        settings.LEADERBOARD_BACKEND,
+        key="leaderboard:points",
+        redis_url=settings.REDIS_URL,
+    ),
+    rebuild_interval=settings.LEADERBOARD_REBUILD_INTERVAL,
+)
@@ -0,0 +1,172 @@
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Table, delete, exists, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.selectable import CTE
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.counters import preserve_onupdate
+from app.core.database import run_after_commit
+from app.core.idset import IdSet
+from app.models.content import Content
+from app.models.forum import Comment, Post
+from app.models.like import Like, LikeTarget
+
+# 点赞对象类型 -> 对象表（均有 id 和 like_count 列）
+TARGET_TABLES: dict[LikeTarget, Table] = {
+    LikeTarget.CONTENT: Content.__table__,
+    LikeTarget.POST: Post.__table__,
+    LikeTarget.COMMENT: Comment.__table__,
+}
+
+
+class LikeService:
+    """
+    点赞与取消点赞
+    点赞记录的写入/删除和对象 like_count 的增减在同一条语句中完成（数据修改 CTE），
+    计数在数据库中自增自减，并发点赞不会因读改写丢失；重复点赞、取消未点赞的对象不改变计数
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def like(self, user_id: int, target: LikeTarget, target_id: int) -> Optional[int]:
+        """点赞（不提交），返回对象的点赞数；对象不存在返回 None"""
+        table = TARGET_TABLES[target]
+        changed = (
+            insert(Like)
+            .from_select(
+                [Like.user_id, Like.target_type, Like.target_id],
+                select(literal(user_id), literal(target, Like.target_type.type), literal(target_id))
+                .where(exists().where(table.c.id == target_id)),
+            )
+            .on_conflict_do_nothing()
+            .returning(Like.user_id)
+            .cte("changed")
+        )
+        like_count = await self._update_count(table, target_id, changed, 1)
+        if like_count is not None:
+            like_index.track(self.db, user_id, target, target_id, liked=True)
+        return like_count
+
+    async def unlike(self, user_id: int, target: LikeTarget, target_id: int) -> Optional[int]:
+        """取消点赞（不提交），返回对象的点赞数；对象不存在返回 None"""
+        table = TARGET_TABLES[target]
+        changed = (
+            delete(Like)
+            .where(Like.user_id == user_id, Like.target_type == target, Like.target_id == target_id)
+            .returning(Like.user_id)
+            .cte("changed")
+        )
+        like_count = await self._update_count(table, target_id, changed, -1)
+        if like_count is not None:
+            like_index.track(self.db, user_id, target, target_id, liked=False)
+        return like_count
+
+    async def _update_count(self, table: Table, target_id: int, changed: CTE, delta: int) -> Optional[int]:
+        """点赞记录有变化时增减对象的 like_count，返回变化后的点赞数"""
+        updated = (
+            update(table)
+            .where(table.c.id == target_id, select(changed).exists())
+            .values(preserve_onupdate(table, {"like_count": func.coalesce(table.c.like_count, 0) + delta}))
+            .returning(table.c.like_count)
+            .cte("updated")
+        )
+        # 同一语句中的子查询读取语句开始时的快照：计数未更新时取原值，对象不存在时为 NULL
+        current = select(func.coalesce(table.c.like_count, 0)).where(table.c.id == target_id).scalar_subquery()
+        result = await self.db.execute(
+            select(func.coalesce(select(updated.c.like_count).scalar_subquery(), current))
+        )
+        return result.scalar_one()
+
+    async def delete_target(self, target: LikeTarget, target_id: int) -> None:
+        """删除对象时清理它的点赞记录（不提交；其他用户索引中残留的ID不影响结果）"""
+        await self.db.execute(
+            delete(Like).where(Like.target_type == target, Like.target_id == target_id)
+        )
+
+
+class LikeIndex:
+    """
+    用户点赞的进程内索引：用户 -> {对象类型: IdSet}
+
+    列表页标记“我已点赞”时，按用户一次加载全部点赞（主键索引范围扫描）并缓存，
+    之后每页 20~100 个对象在内存中判断，不再逐条或按页查询。
+    本进程的点赞/取消在事务提交后直接更新索引；加载期间提交的变更记录下来，加载完成后重放。
+    其他进程的变更在条目过期（ttl）后重新加载时可见
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: LRUCache[dict[LikeTarget, IdSet]] = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._journals: dict[int, list[list[tuple[LikeTarget, int, bool]]]] = {}
+        self.loads = 0
+
+    async def get(self, db: AsyncSession, user_id: int) -> dict[LikeTarget, IdSet]:
+        """用户点赞过的对象ID（按对象类型）"""
+        likes = self._cache.get(user_id)
+        if likes is not None:
+            return likes
+
+        journal: list[tuple[LikeTarget, int, bool]] = []
+        self._journals.setdefault(user_id, []).append(journal)
+        try:
+            result = await db.execute(
+                select(Like.target_type, Like.target_id).where(Like.user_id == user_id)
+            )
+            rows = result.tuples().all()
+        finally:
+            journals = self._journals[user_id]
+            journals.remove(journal)
+            if not journals:
+                del self._journals[user_id]
+
+        ids: dict[LikeTarget, list[int]] = {}
+        for target, target_id in rows:
+            ids.setdefault(target, []).append(target_id)
+        likes = {target: IdSet(values) for target, values in ids.items()}
+        for change in journal:
+            self._apply(likes, *change)
+        self._cache.set(user_id, likes)
+        self.loads += 1
+        return likes
+
+    async def mark(
+        self,
+        db: AsyncSession,
+        user_id: Optional[int],
+        target: LikeTarget,
+        items: Sequence[Any],
+    ) -> None:
+        """为对象设置 liked 属性（响应模型中的“我已点赞”）；未登录时不设置，取模型默认值 False"""
+        if user_id is None or not items:
+            return
+        ids = (await self.get(db, user_id)).get(target)
+        for item in items:
+            item.liked = ids is not None and item.id in ids
+
+    def track(self, db: AsyncSession, user_id: int, target: LikeTarget, target_id: int, liked: bool) -> None:
+        """点赞/取消后调用：事务提交后更新索引，回滚时不更新"""
+        run_after_commit(db, lambda: self._changed(user_id, target, target_id, liked))
+
+    def _changed(self, user_id: int, target: LikeTarget, target_id: int, liked: bool) -> None:
+        for journal in self._journals.get(user_id, ()):
+            journal.append((target, target_id, liked))
+        likes = self._cache.get(user_id)
+        if likes is not None:
+            self._apply(likes, target, target_id, liked)
+
+    @staticmethod
+    def _apply(likes: dict[LikeTarget, IdSet], target: LikeTarget, target_id: int, liked: bool) -> None:
+        if liked:
+            likes.setdefault(target, IdSet()).add(target_id)
+        elif target in likes:
+            likes[target].discard(target_id)
+
+    def stats(self) -> dict[str, Any]:
+        """索引统计"""
+        return {**self._cache.stats(), "loads": self.loads}
+
+
+like_index = LikeIndex(maxsize=settings.LIKE_INDEX_MAX_USERS, ttl=settings.LIKE_INDEX_TTL)
@@ -0,0 +1,124 @@
+import logging
+import math
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.rate_limit import ThrottleStore, create_throttle_store
+
+logger = logging.getLogger(__name__)
+
+
+class LoginThrottle:
+    """
+    登录防暴力破解
+
+    按登录标识（用户名/邮箱）和客户端IP分别统计滑动窗口内的失败次数，
+    超过阈值后按指数退避封禁：第 n 次超限封禁 base * 2^(n-1) 秒，不超过 max_backoff。
+    登录前只检查封禁状态，被封禁的请求在密码校验（bcrypt）之前直接拒绝。
+    计数存储不可用时放行，不影响正常登录
+    """
+
+    def __init__(
+        self,
+        store: ThrottleStore,
+        max_failures_per_identifier: int,
+        max_failures_per_ip: int,
+        backoff_base: float,
+        max_backoff: float,
+        enabled: bool = True,
+    ):
+        self.store = store
+        self.max_failures_per_identifier = max_failures_per_identifier
+        self.max_failures_per_ip = max_failures_per_ip
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.enabled = enabled
+        self.rejected = 0
+
+    @staticmethod
+    def _identifier_key(identifier: str) -> str:
+        return f"login:id:{identifier.strip().lower()}"
+
+    @staticmethod
+    def _ip_key(ip: Optional[str]) -> Optional[str]:
+        return f"login:ip:{ip}" if ip else None
+
+    def backoff(self, failures: float, limit: int) -> float:
+        """失败次数对应的封禁秒数（未超过阈值为0；计数存储无法记录时按最长封禁）"""
+        if math.isinf(failures):
+            return self.max_backoff
+        excess = math.floor(failures) - limit
+        if excess < 0:
+            return 0.0
+        return min(self.backoff_base * 2 ** min(excess, 32), self.max_backoff)
+
+    async def retry_after(self, identifier: str, ip: Optional[str]) -> int:
+        """登录前检查：返回需要等待的秒数，0 表示可以尝试"""
+        if not self.enabled:
+            return 0
+
+        keys = [self._identifier_key(identifier)]
+        ip_key = self._ip_key(ip)
+        if ip_key:
+            keys.append(ip_key)
+
+        try:
+            remaining = await self.store.blocked_for(*keys)
+        except Exception:
+            logger.warning("登录限流存储不可用，跳过检查", exc_info=True)
+            return 0
+
+        if remaining > 0:
+            self.rejected += 1
+            return math.ceil(remaining)
+        return 0
+
+    async def record_failure(self, identifier: str, ip: Optional[str]) -> None:
+        """记录一次登录失败，超过阈值时封禁"""
+        if not self.enabled:
+            return
+
+        targets = [(self._identifier_key(identifier), self.max_failures_per_identifier)]
+        ip_key = self._ip_key(ip)
+        if ip_key:
+            targets.append((ip_key, self.max_failures_per_ip))
+
+        try:
+            for key, limit in targets:
+                seconds = self.backoff(await self.store.hit(key), limit)
+                if seconds > 0:
+                    await self.store.block(key, seconds)
+        except Exception:
+            logger.warning("登录限流存储不可用，未记录失败", exc_info=True)
+
+    async def record_success(self, identifier: str) -> None:
+        """登录成功后清除该标识的失败计数（IP计数保留）"""
+        if not self.enabled:
+            return
+
+        try:
+            await self.store.reset(self._identifier_key(identifier))
+        except Exception:
+            logger.warning("登录限流存储不可用，未清除计数", exc_info=True)
+
+    def stats(self) -> dict[str, Any]:
+        """限流统计"""
+        return {
+            "enabled": self.enabled,
+            "rejected": self.rejected,
+            **self.store.stats(),
+        }
+
+
+login_throttle = LoginThrottle(
+    store=create_throttle_store(
+        settings.LOGIN_THROTTLE_BACKEND,
+        window=settings.LOGIN_FAILURE_WINDOW,
+        redis_url=settings.REDIS_URL,
+    ),
+    max_failures_per_identifier=settings.LOGIN_MAX_FAILURES_PER_IDENTIFIER,
+    max_failures_per_ip=settings.LOGIN_MAX_FAILURES_PER_IP,
+    backoff_base=settings.LOGIN_BACKOFF_BASE,
+    max_backoff=settings.LOGIN_BACKOFF_MAX,
+    enabled=settings.LOGIN_THROTTLE_ENABLED,
+)
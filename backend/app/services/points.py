@@ -0,0 +1,200 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Row, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.points import PointActionType, PointPeriod, PointRecord, PointRollup, PointRollupBackfill
+from app.models.user import User
+
+_timezone = ZoneInfo(settings.LEADERBOARD_TIMEZONE)
+
+# 排行榜条目的用户列（LeaderboardEntry 除 points 外的字段）
+_LEADERBOARD_COLUMNS = (
+    User.id,
+    User.username,
+    User.nickname,
+    User.avatar,
+    User.bio,
+    User.level,
+    User.role,
+    User.created_at,
+)
+
+# 回填一段积分记录：按本地时间的日/周/月分组求和后累加到汇总表（分桶规则与 period_buckets 一致）
+BACKFILL_CHUNK = text("""
+    WITH chunk AS (
+        SELECT user_id, points, created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz AS local_at
+        FROM point_records
+        WHERE id > :start AND id <= :stop AND points > 0 AND created_at IS NOT NULL
+    )
+    INSERT INTO point_rollups (period, bucket, user_id, points)
+    SELECT p.period, p.bucket, chunk.user_id, SUM(chunk.points)
+    FROM chunk
+    CROSS JOIN LATERAL (VALUES
+        ('DAY'::pointperiod, date_trunc('day', chunk.local_at)::date),
+        ('WEEK'::pointperiod, date_trunc('week', chunk.local_at)::date),
+        ('MONTH'::pointperiod, date_trunc('month', chunk.local_at)::date)
+    ) AS p(period, bucket)
+    GROUP BY p.period, p.bucket, chunk.user_id
+    ON CONFLICT (period, bucket, user_id) DO UPDATE SET points = point_rollups.points + EXCLUDED.points
+""")
+
+
+def period_buckets(at: datetime) -> dict[PointPeriod, date]:
+    """UTC 时间 at 所在的日/周（周一开始）/月的起始日期，按 LEADERBOARD_TIMEZONE 划分"""
+    day = at.replace(tzinfo=timezone.utc).astimezone(_timezone).date()
+    return {
+        PointPeriod.DAY: day,
+        PointPeriod.WEEK: day - timedelta(days=day.weekday()),
+        PointPeriod.MONTH: day.replace(day=1),
+    }
+
+
+class PointService:
+    """积分记录与日/周/月积分排行榜"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(
+        self,
+        user: User,
+        points: int,
+        action_type: PointActionType,
+        description: Optional[str] = None,
+        reference_id: Optional[int] = None,
+    ) -> PointRecord:
+        """
+        写入积分记录（user.points 须已是变动后的余额）
+        获得积分时在同一事务内累加到当前日/周/月的汇总（一条 INSERT ... ON CONFLICT 语句）
+        """
+        now = datetime.utcnow()
+        record = PointRecord(
+            user_id=user.id,
+            action_type=action_type,
+            points=points,
+            balance=user.points,
+            description=description,
+            reference_id=reference_id,
+            created_at=now,
+        )
+        self.db.add(record)
+
+        if points > 0:
+            stmt = insert(PointRollup).values([
+                {"period": period, "bucket": bucket, "user_id": user.id, "points": points}
+                for period, bucket in period_buckets(now).items()
+            ])
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[PointRollup.period, PointRollup.bucket, PointRollup.user_id],
+                set_={"points": PointRollup.points + stmt.excluded.points},
+            ))
+        return record
+
+    async def get_leaderboard(
+        self,
+        period: PointPeriod,
+        limit: int,
+        at: Optional[datetime] = None,
+    ) -> list[Row]:
+        """
+        周期内获得积分最多的活跃用户（at 所在周期，默认当前），积分相同按用户ID
+        返回的行包含用户公开字段和周期积分 points；按汇总表索引顺序读取，取够 limit 行即停止
+        """
+        bucket = period_buckets(at or datetime.utcnow())[period]
+        result = await self.db.execute(
+            select(*_LEADERBOARD_COLUMNS, PointRollup.points)
+            .join(User, User.id == PointRollup.user_id)
+            .where(
+                PointRollup.period == period,
+                PointRollup.bucket == bucket,
+                User.is_active == True,
+            )
+            .order_by(PointRollup.points.desc(), PointRollup.user_id)
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def get_rank(
+        self,
+        period: PointPeriod,
+        user_id: int,
+        at: Optional[datetime] = None,
+    ) -> tuple[int, int]:
+        """
+        用户在周期内的 (排名, 积分)，排名为 1 + 周期积分严格更高的活跃用户数
+        只在汇总表的这个周期范围内计数
+        """
+        bucket = period_buckets(at or datetime.utcnow())[period]
+        in_bucket = (PointRollup.period == period, PointRollup.bucket == bucket)
+        points = func.coalesce(
+            select(PointRollup.points)
+            .where(*in_bucket, PointRollup.user_id == user_id)
+            .scalar_subquery(),
+            0,
+        )
+        higher = (
+            select(func.count())
+            .select_from(PointRollup)
+            .join(User, User.id == PointRollup.user_id)
+            .where(*in_bucket, PointRollup.points > points, User.is_active == True)
+            .scalar_subquery()
+        )
+        row = (await self.db.execute(select(points, higher))).one()
+        return row[1] + 1, row[0]
+
+
+async def rollup_records(db: AsyncSession, start: int, stop: int) -> int:
+    """把 ID 在 (start, stop] 内的积分记录累加到汇总表（不提交），返回写入的汇总行数"""
+    result = await db.execute(
+        BACKFILL_CHUNK, {"tz": settings.LEADERBOARD_TIMEZONE, "start": start, "stop": stop}
+    )
+    return result.rowcount
+
+
+async def backfill_rollups(db: AsyncSession, chunk_size: int) -> Optional[dict[str, Any]]:
+    """
+    回填一段历史积分记录到汇总表（ID 在 (done_id, min(done_id + chunk_size, until_id)] 内），
+    与回填进度在同一事务中提交，可以中断后继续；全部完成返回 None。
+    进度行加锁，多个回填任务同时运行时依次执行，不会重复累加
+    """
+    state = (await db.execute(
+        select(PointRollupBackfill)
+        .where(PointRollupBackfill.id == 1)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )).scalar_one_or_none()
+    if state is None or state.done_id >= state.until_id:
+        return None
+
+    start = state.done_id
+    stop = min(start + chunk_size, state.until_id)
+    await rollup_records(db, start, stop)
+    await db.execute(
+        update(PointRollupBackfill).where(PointRollupBackfill.id == 1).values(done_id=stop)
+    )
+    await db.commit()
+    return {"done_id": stop, "until_id": state.until_id}
+
+
+async def reset_rollups(db: AsyncSession) -> None:
+    """
+    清空汇总表，把回填范围重置为当前全部积分记录（之后重新回填）
+    先以 SHARE 模式锁住积分记录表：等待已写入记录、尚未累加汇总的事务提交，并阻止新的写入直到本事务提交，
+    因此回填范围（MAX(id)）之内的记录都不会再在线累加，之后的记录都在清空之后累加，不会重复计数。
+    锁在 TRUNCATE 之前获取，不会与先写记录再写汇总的事务互相等待。
+    期间积分写入会阻塞，用于导入数据后或汇总不一致时，应在写入低峰执行
+    """
+    await db.execute(text("LOCK TABLE point_records IN SHARE MODE"))
+    await db.execute(text("TRUNCATE point_rollups"))
+    until_id = (await db.execute(select(func.coalesce(func.max(PointRecord.id), 0)))).scalar_one()
+    await db.execute(
+        insert(PointRollupBackfill)
+        .values(id=1, until_id=until_id, done_id=0)
+        .on_conflict_do_update(index_elements=[PointRollupBackfill.id], set_={"until_id": until_id, "done_id": 0})
+    )
+    await db.commit()
@@ -3,17 +3,67 @@ import string
 from datetime import datetime
 from typing import Optional, List
 
-from sqlalchemy import select, or_
+from sqlalchemy import exists, insert, literal, select, update, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.core.cache import LRUCache
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.database import run_after_commit
+from app.core.security import password_hasher
+from app.models.points import PointActionType
 from app.models.user import User, UserRole
-from app.schemas.user import UserRegister, UserUpdate
+from app.schemas.user import Principal, UserRegister, UserUpdate
+from app.services.invite_code import invite_code_allocator
+from app.services.invite_quota import invite_quota_leases
+from app.services.invite_tree import insert_invite_closure
+from app.services.leaderboard import points_leaderboard
+from app.services.points import PointService
+
+# 已认证用户快照缓存（进程内），减少每个认证请求的用户表查询
+principal_cache: LRUCache[Principal] = LRUCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+)
+
+_PRINCIPAL_COLUMNS = (
+    User.id,
+    User.role,
+    User.is_active,
+    User.level,
+    User.experience,
+    User.points,
+    User.total_points_earned,
+)
+
+
+# 注册时唯一约束冲突 -> 提示信息
+REGISTER_CONFLICT_MESSAGES = {
+    "ix_users_username": "用户名已被使用",
+    "ix_users_email": "邮箱已被注册",
+}
+
+# 新邀请码与历史随机邀请码撞码时的最大重试次数
+INVITE_CODE_MAX_ATTEMPTS = 5
+
+
+def _violated_constraint(error: IntegrityError) -> Optional[str]:
+    """从唯一约束冲突异常中取出约束名"""
+    cause = getattr(error.orig, "__cause__", None)
+    name = getattr(cause, "constraint_name", None)
+    if name:
+        return name
+    
+    message = str(error.orig)
+    for constraint in (*REGISTER_CONFLICT_MESSAGES, "ix_users_invite_code"):
+        if constraint in message:
+            return constraint
+    return None
 
 
 def generate_invite_code(length: int = 8) -> str:
-    """生成邀请码"""
+    """生成随机邀请码（新用户请使用 invite_code_allocator 分配）"""
     alphabet = string.ascii_uppercase + string.digits
     return ''.join(secrets.choice(alphabet) for _ in range(length))
 
@@ -31,6 +81,31 @@ class UserService:
         )
         return result.scalar_one_or_none()
     
+    async def get_principal(self, user_id: int) -> Optional[Principal]:
+        """获取已认证用户快照（优先读缓存）"""
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+        
+        result = await self.db.execute(
+            select(*_PRINCIPAL_COLUMNS).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        
+        principal = Principal.model_validate(row)
+        principal_cache.set(user_id, principal)
+        return principal
+    
+    def invalidate_principal(self, user_id: int) -> None:
+        """
+        使用户快照缓存失效
+        立即删除一次，提交后再删除一次，避免并发请求把提交前的旧状态写回缓存
+        """
+        principal_cache.delete(user_id)
+        run_after_commit(self.db, lambda: principal_cache.delete(user_id))
+    
     async def get_by_username(self, username: str) -> Optional[User]:
         """通过用户名获取用户"""
         result = await self.db.execute(
@@ -79,59 +154,171 @@ class UserService:
         
         return True, "邀请码有效", inviter
     
+    async def check_registration(self, user_data: UserRegister) -> Optional[str]:
+        """
+        注册前检查（一条查询）：用户名、邮箱是否已被使用，邀请码是否可用
+        返回第一个不满足的条件对应的消息，全部通过时返回 None
+        """
+        inviter = select(User.is_active, User.invite_quota).where(
+            User.invite_code == user_data.invite_code
+        ).subquery()
+        result = await self.db.execute(
+            select(
+                exists().where(User.username == user_data.username),
+                exists().where(User.email == user_data.email),
+                select(inviter.c.is_active).scalar_subquery(),
+                select(inviter.c.invite_quota).scalar_subquery(),
+            )
+        )
+        username_taken, email_taken, inviter_active, invite_quota = result.one()
+        
+        if username_taken:
+            return "用户名已被使用"
+        if email_taken:
+            return "邮箱已被注册"
+        if settings.INVITE_CODE_REQUIRED:
+            if inviter_active is None:
+                return "邀请码不存在"
+            if not inviter_active:
+                return "邀请人账号已被禁用"
+            if invite_quota <= 0:
+                return "该邀请码已达到使用上限"
+        return None
+    
     async def create_user(self, user_data: UserRegister) -> tuple[Optional[User], str]:
         """
         创建用户
         返回: (用户对象, 消息)
+        
+        先用一条查询按原顺序检查用户名、邮箱和邀请码，明显无效的请求不占用密码哈希线程池；
+        邀请人校验、邀请配额扣减和用户插入合并为一条 INSERT ... RETURNING 语句，
+        并发注册的竞争由唯一约束和原子扣减兜底，只有失败时才额外查询具体原因。
+        新邀请码由无碰撞分配器生成，无需查重
         """
-        # 检查用户名是否已存在
-        existing_user = await self.get_by_username(user_data.username)
-        if existing_user:
-            return None, "用户名已被使用"
-        
-        # 检查邮箱是否已存在
-        existing_email = await self.get_by_email(user_data.email)
-        if existing_email:
-            return None, "邮箱已被注册"
-        
-        # 验证邀请码（如果启用邀请制）
-        inviter = None
+        message = await self.check_registration(user_data)
+        if message is not None:
+            return None, message
+        
+        hashed_password = await password_hasher.hash(user_data.password)
+        
+        # 热门邀请码优先从本进程的配额租约中分配
+        leased_inviter_id = None
         if settings.INVITE_CODE_REQUIRED:
-            valid, msg, inviter = await self.validate_invite_code(user_data.invite_code)
-            if not valid:
-                return None, msg
-        
-        # 生成唯一邀请码
-        while True:
-            new_invite_code = generate_invite_code()
-            existing = await self.get_by_invite_code(new_invite_code)
-            if not existing:
-                break
-        
-        # 创建用户
-        new_user = User(
-            username=user_data.username,
-            email=user_data.email,
-            hashed_password=get_password_hash(user_data.password),
-            nickname=user_data.username,
-            invite_code=new_invite_code,
-            invited_by_id=inviter.id if inviter else None,
-            invite_quota=settings.DEFAULT_INVITE_QUOTA,
-            points=settings.POINTS_FOR_REGISTER,
-            total_points_earned=settings.POINTS_FOR_REGISTER,
-            role=UserRole.USER,
-        )
+            leased_inviter_id = await invite_quota_leases.acquire(user_data.invite_code)
         
-        self.db.add(new_user)
+        user, message = await self._insert_user(user_data, hashed_password, leased_inviter_id)
+        if user is None and leased_inviter_id is not None:
+            await invite_quota_leases.release(user_data.invite_code, leased_inviter_id)
+        return user, message
+    
+    async def _insert_user(
+        self,
+        user_data: UserRegister,
+        hashed_password: str,
+        leased_inviter_id: Optional[int],
+    ) -> tuple[Optional[User], str]:
+        for _ in range(INVITE_CODE_MAX_ATTEMPTS):
+            invite_code = await invite_code_allocator.next_code(self.db)
+            stmt = self._build_register_statement(
+                user_data, hashed_password, invite_code, leased_inviter_id
+            )
+            try:
+                result = await self.db.execute(stmt)
+            except IntegrityError as e:
+                # 语句失败后事务已中止（配额扣减随之撤销），必须回滚
+                await self.db.rollback()
+                constraint = _violated_constraint(e)
+                if constraint == "ix_users_invite_code":
+                    continue
+                if constraint in REGISTER_CONFLICT_MESSAGES:
+                    # 用户名和邮箱同时冲突时按检查顺序返回，不取决于哪个约束先触发
+                    message = await self.check_registration(user_data)
+                    return None, message or REGISTER_CONFLICT_MESSAGES[constraint]
+                raise
+            
+            new_user = result.scalars().one_or_none()
+            if new_user is None:
+                # 没有可用的邀请人：查询具体原因
+                valid, msg, _ = await self.validate_invite_code(user_data.invite_code)
+                return None, msg if not valid else "该邀请码已达到使用上限"
+            
+            points_leaderboard.track(self.db, new_user)
+            return new_user, "注册成功"
         
-        # 减少邀请人的邀请配额
-        if inviter:
-            inviter.invite_quota -= 1
+        raise RuntimeError("生成唯一邀请码失败")
+    
+    def _build_register_statement(
+        self,
+        user_data: UserRegister,
+        hashed_password: str,
+        invite_code: str,
+        leased_inviter_id: Optional[int] = None,
+    ):
+        """
+        构造注册语句
+        邀请制下由 UPDATE ... WHERE invite_quota > 0 RETURNING 原子扣减邀请人配额并累加邀请计数，
+        插入的行取自其返回结果：配额用尽时不插入，插入失败时扣减随整条语句撤销；
+        同一语句内写入新用户的邀请关系闭包
+        """
+        now = datetime.utcnow()
+        values = {
+            "username": user_data.username,
+            "email": user_data.email,
+            "hashed_password": hashed_password,
+            "nickname": user_data.username,
+            "invite_code": invite_code,
+            "invite_quota": settings.DEFAULT_INVITE_QUOTA,
+            "points": settings.POINTS_FOR_REGISTER,
+            "total_points_earned": settings.POINTS_FOR_REGISTER,
+            "role": UserRole.USER,
+            "level": 1,
+            "experience": 0,
+            "is_active": True,
+            "is_verified": False,
+            "created_at": now,
+            "updated_at": now,
+        }
         
-        await self.db.flush()
-        await self.db.refresh(new_user)
+        if not settings.INVITE_CODE_REQUIRED:
+            insert_user = insert(User).values(**values, invited_by_id=None)
+        else:
+            if leased_inviter_id is not None:
+                # 租约路径的配额已预先扣减、邀请计数在租约结算时批量累加，
+                # 这里只确认邀请人未被禁用（租约期间被禁用的邀请人不能继续邀请）
+                inviter = (
+                    select(User.id)
+                    .where(User.id == leased_inviter_id, User.is_active.is_(True))
+                    .cte("inviter")
+                )
+            else:
+                inviter = (
+                    update(User)
+                    .where(
+                        User.invite_code == user_data.invite_code,
+                        User.is_active.is_(True),
+                        User.invite_quota > 0,
+                    )
+                    .values(
+                        invite_quota=User.invite_quota - 1,
+                        invited_count=User.invited_count + 1,
+                    )
+                    .returning(User.id)
+                    .cte("inviter")
+                )
+            columns = User.__table__.c
+            source = select(
+                *(literal(value, type_=columns[name].type) for name, value in values.items()),
+                inviter.c.id,
+            )
+            insert_user = insert(User).from_select(
+                [*values, "invited_by_id"], source, include_defaults=False
+            )
         
-        return new_user, "注册成功"
+        new_user = insert_user.returning(*User.__table__.c).cte("new_user")
+        return (
+            select(aliased(User, new_user))
+            .add_cte(insert_invite_closure(new_user))
+        )
     
     async def authenticate(self, identifier: str, password: str) -> Optional[User]:
         """
@@ -140,7 +327,7 @@ class UserService:
         user = await self.get_by_username_or_email(identifier)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
         return user
     
@@ -157,6 +344,7 @@ class UserService:
         user.updated_at = datetime.utcnow()
         await self.db.flush()
         await self.db.refresh(user)
+        self.invalidate_principal(user_id)
         
         return user
     
@@ -165,15 +353,31 @@ class UserService:
         user.last_login_at = datetime.utcnow()
         await self.db.flush()
     
-    async def get_invited_users(self, user_id: int) -> List[User]:
-        """获取用户邀请的人"""
+    async def get_invited_users(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> List[User]:
+        """获取用户邀请的人（分页，按注册时间倒序）"""
         result = await self.db.execute(
-            select(User).where(User.invited_by_id == user_id)
+            select(User)
+            .where(User.invited_by_id == user_id)
+            .order_by(User.id.desc())
+            .offset(skip)
+            .limit(limit)
         )
         return list(result.scalars().all())
     
-    async def add_points(self, user_id: int, points: int, reason: str = "") -> Optional[User]:
-        """增加积分"""
+    async def add_points(
+        self,
+        user_id: int,
+        points: int,
+        reason: str = "",
+        action_type: PointActionType = PointActionType.ADMIN_GRANT,
+        reference_id: Optional[int] = None,
+    ) -> Optional[User]:
+        """增加积分（同时写入积分记录和日/周/月汇总）"""
         user = await self.get_by_id(user_id)
         if not user:
             return None
@@ -182,11 +386,21 @@ class UserService:
         if points > 0:
             user.total_points_earned += points
         
+        await PointService(self.db).record(user, points, action_type, reason or None, reference_id)
         await self.db.flush()
+        self.invalidate_principal(user_id)
+        points_leaderboard.track(self.db, user)
         return user
     
-    async def deduct_points(self, user_id: int, points: int) -> tuple[bool, str]:
-        """扣除积分"""
+    async def deduct_points(
+        self,
+        user_id: int,
+        points: int,
+        reason: str = "",
+        action_type: PointActionType = PointActionType.UNLOCK_CONTENT,
+        reference_id: Optional[int] = None,
+    ) -> tuple[bool, str]:
+        """扣除积分（同时写入积分记录）"""
         user = await self.get_by_id(user_id)
         if not user:
             return False, "用户不存在"
@@ -195,5 +409,8 @@ class UserService:
             return False, "积分不足"
         
         user.points -= points
+        await PointService(self.db).record(user, -points, action_type, reason or None, reference_id)
         await self.db.flush()
+        self.invalidate_principal(user_id)
+        points_leaderboard.track(self.db, user)
         return True, "扣除成功"
@@ -0,0 +1,54 @@
+"""
+积分汇总回填
+
+用法:
+    python scripts/backfill_point_rollups.py [--chunk-size 10000] [--rebuild]
+
+功能:
+    把迁移 0005 之前已有的积分记录按日/周/月汇总到 point_rollups（之后的记录由应用写入时实时汇总）。
+    按记录ID分段读取，每段一个事务，与回填进度一同提交，中断后再次运行从上次的位置继续；
+    --rebuild 清空汇总表并按当前全部积分记录重新回填（批量导入积分记录后使用，应在写入低峰执行）
+
+说明:
+    需要已执行数据库迁移（alembic upgrade head）
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 设置 UTF-8 编码
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.points import backfill_rollups, reset_rollups
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="积分汇总回填")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="每个事务处理的记录ID范围")
+    parser.add_argument("--rebuild", action="store_true", help="清空汇总表后重新回填全部记录")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            if args.rebuild:
+                await reset_rollups(session)
+            while True:
+                progress = await backfill_rollups(session, args.chunk_size)
+                if progress is None:
+                    break
+                print(f"  已回填到记录 {progress['done_id']:,} / {progress['until_id']:,}")
+    finally:
+        await engine.dispose()
+    print(f"✅ 积分汇总回填完成，耗时 {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
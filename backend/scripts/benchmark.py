@@ -0,0 +1,1190 @@
+"""
+性能基准测试脚本
+
+用法:
+    python scripts/benchmark.py register [--count 500] [--concurrency 20]
+    python scripts/benchmark.py invite-codes [--count 2000000]
+    python scripts/benchmark.py invite-stress [--count 500] [--quota 100] [--lease-size 0]
+    python scripts/benchmark.py token-filter [--count 1000000]
+    python scripts/benchmark.py auth [--count 100000]
+    python scripts/benchmark.py login-throttle
+    python scripts/benchmark.py pool [--count 500] [--concurrency 50]
+    python scripts/benchmark.py read-session [--count 2000]
+    python scripts/benchmark.py pagination [--count 50] [--page 10000] [--page-size 20]
+    python scripts/benchmark.py list-count [--count 50]
+    python scripts/benchmark.py list-payload [--count 50]
+    python scripts/benchmark.py serialization [--count 200]
+    python scripts/benchmark.py leaderboard [--count 200]
+    python scripts/benchmark.py period-leaderboard [--count 50]
+    python scripts/benchmark.py view-counter [--count 2000] [--concurrency 20]
+    python scripts/benchmark.py likes [--count 500] [--concurrency 20]
+    python scripts/benchmark.py unique-visitors [--count 20000]
+    python scripts/benchmark.py hot [--count 50] [--page 50]
+
+场景:
+    register      注册吞吐：一条预检查询 + 单语句注册 vs 旧的逐条查询流程（每秒注册数、每次注册的SQL语句数）
+    invite-codes  邀请码分配器：生成速度，并校验 count 个连续序号生成的邀请码无重复（无需数据库）
+    invite-stress 并发注册压测：count 个请求争用同一个配额为 quota 的邀请码，校验注册成功数不超过配额，
+                  邀请计数和闭包表与实际邀请人数一致
+                  （--lease-size > 0 时启用热门邀请码配额租约）
+    auth          认证开销：每次请求解析访问令牌并取得当前用户的耗时，令牌缓存关闭 vs 开启
+                  （用户快照缓存命中，不计数据库查询）
+    login-throttle 登录防暴力破解：用进程内计数存储和模拟时钟重放1小时的攻击，统计实际进入密码校验的次数，
+                  以及登录前检查的耗时（无需数据库）
+    token-filter  令牌吊销过滤器：填满到设计容量后，count 次查询未吊销令牌族的耗时和误报率（无需数据库）
+    pool          数据库连接池：以 concurrency 并发执行 count 次 10ms 查询，输出取连接等待耗时、
+                  临时连接和超时次数（并发超过 DB_POOL_SIZE + DB_MAX_OVERFLOW 时出现排队）
+    read-session  只读会话：同一个读接口查询分别通过 get_db（事务 + 提交）和 get_read_db（AUTOCOMMIT）
+                  执行 count 次，比较每次请求的耗时
+    pagination    分页深度：用户列表（按注册时间倒序）第 1 页和第 page 页，偏移分页（OFFSET）vs 游标分页，
+                  各执行 count 次的平均耗时（用户数不足时取最后一页）
+    list-count    列表总数：用户列表首页 + 总数，分别用单独 COUNT 查询、COUNT(*) OVER()、总数缓存命中、
+                  规划器估计，各执行 count 次的平均耗时和SQL条数
+    list-payload  列表大字段：在基准分类下准备 1 万篇带正文（2~9KB）的文章，比较加载整行 + 完整响应模型
+                  和延迟加载大字段 + 列表项模型：首页（20 条）执行 count 次的耗时和响应大小，
+                  以及按每页 100 条用游标翻完全部文章的总耗时和总响应大小
+    serialization 响应序列化：20、100、1000 条的用户列表（ResponseList[UserPublic]）和内容列表（ContentPage），
+                  旧路径（逐条 model_validate + FastAPI 按 response_model 校验、转换 + json.dumps；
+                  无 response_model 时 jsonable_encoder 遍历 ORM 对象）vs JSONSerializer，各执行 count 次（无需数据库）
+    leaderboard   积分排行榜：前 50 名和随机用户的排名，数据库查询（ORDER BY points DESC LIMIT / COUNT）
+                  vs 进程内有序集合（跳表），各执行 count 次的平均耗时；以及从用户表重建和单次积分更新的耗时
+    period-leaderboard 日/周/月积分排行：当前周期前 20 名和管理员的排名，直接聚合积分记录表 vs 读取汇总表
+                  （point_rollups，需要先运行 scripts/backfill_point_rollups.py），各执行 count 次的平均耗时
+    view-counter  详情浏览计数：以 concurrency 并发请求同一篇文章的详情 count 次，旧路径（每次 view_count += 1
+                  并提交，争用同一行的行锁）vs 计数写缓冲（只读会话，增量定期批量写入），输出每秒请求数，
+                  以及写入后浏览数的实际增加量（旧路径读出后加一再写回，并发时会丢失计数）
+    likes         点赞：count 个用户以 concurrency 并发点赞同一篇文章（每人两次），旧路径（读出 like_count 加一写回）
+                  vs 点赞记录 + 原子计数，校验点赞数的增加量；以及 100 条的列表页标记“我已点赞”，
+                  逐条查询 vs 一次 IN 查询 vs 进程内点赞索引的耗时，和索引占用的内存
+    unique-visitors 独立访客估计（HyperLogLog，p=12）：不同基数下的相对误差（与理论标准误差 1.04/√m 对比）、
+                  每个估计的内存和压缩后大小（无需数据库）；以及 4 个模拟进程各记录 count 个访客（相邻进程重叠一半）
+                  后写入同一篇文章，合并后的独立访客数与实际去重人数对比
+    hot           热门排序：在 list-payload 的 1 万篇文章上随机生成浏览/点赞/评论/分享数，按热度取第 1 页和第 page 页，
+                  查询时按当前时间计算衰减分数排序（ORDER BY 表达式 + OFFSET）vs 预先计算的热度列（索引 + 游标），
+                  各执行 count 次的平均耗时；以及计数写缓冲写入全部文章（热度随计数重算、更新索引）的耗时
+
+说明:
+    需要已初始化的数据库（先运行 scripts/init_db.py），测试数据会写入当前数据库
+    bcrypt 耗时与数据库无关，测试中统一替换为固定哈希，只比较数据库路径
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# 设置 UTF-8 编码
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event, exc, exists, func, select, text
+
+from app.core.config import settings
+from app.core.counters import VisitorSketches, counter_buffer
+from app.core.hll import HyperLogLog
+from fastapi import Request
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.database import AsyncSessionLocal, engine, get_db, get_read_db
+from app.core.pagination import CountMode, count_cache, count_rows, encode_cursor, paginate
+from app.api.deps import get_current_user
+from app.core.ranking import MemoryRankingStore
+from app.core.rate_limit import MemoryThrottleStore
+from app.core.responses import JSONSerializer
+from app.core.security import create_access_token, get_password_hash, password_hasher
+from app.api.v1.endpoints.contents import CONTENT_LIST_OPTIONS, content_response, get_article
+from app.models.content import Category, Content, ContentStatus, ContentType
+from app.models.like import Like, LikeTarget
+from app.models.points import PointPeriod, PointRecord
+from app.models.user import User, UserInviteClosure, UserRole
+from app.schemas.common import ResponseList
+from app.schemas.content import ContentListItem, ContentPage, ContentResponse
+from app.schemas.user import UserPublic, UserRegister
+from app.services.auth_token import RevokedTokenFamilies, _new_token_id, access_token_cache
+from app.services.invite_code import ALPHABET, CODE_LENGTH, code_for_sequence, invite_code_allocator
+from app.services.invite_quota import invite_quota_leases
+from app.services.leaderboard import PointsLeaderboard
+from app.services.like import LikeIndex, LikeService
+from app.services.points import PointService, period_buckets
+from app.services.login_throttle import LoginThrottle
+from app.services.user import UserService, generate_invite_code
+
+
+class StatementCounter:
+    """统计引擎执行的SQL语句数"""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def print_result(name: str, count: int, elapsed: float, statements: int) -> None:
+    print(
+        f"  {name:<12} {count / elapsed:>10.1f} 次/秒"
+        f"   {statements / count:>6.2f} 条SQL/次   总耗时 {elapsed:.2f}s"
+    )
+
+
+async def run_concurrently(count: int, concurrency: int, func) -> float:
+    """以固定并发执行 count 次 func(i)，返回耗时"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(i: int):
+        async with semaphore:
+            await func(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(count)))
+    return time.perf_counter() - started
+
+
+# ============ 注册吞吐 ============
+async def legacy_create_user(session, user_data: UserRegister, hashed_password: str) -> None:
+    """旧注册流程：逐条检查用户名、邮箱、邀请码、新邀请码，再插入并刷新"""
+    service = UserService(session)
+    if await service.get_by_username(user_data.username):
+        return
+    if await service.get_by_email(user_data.email):
+        return
+    valid, _, inviter = await service.validate_invite_code(user_data.invite_code)
+    if not valid:
+        return
+    while True:
+        code = generate_invite_code()
+        if not await service.get_by_invite_code(code):
+            break
+    user = User(
+        username=user_data.username,
+        email=user_data.email,
+        hashed_password=hashed_password,
+        nickname=user_data.username,
+        invite_code=code,
+        invited_by_id=inviter.id,
+        invite_quota=settings.DEFAULT_INVITE_QUOTA,
+        points=settings.POINTS_FOR_REGISTER,
+        total_points_earned=settings.POINTS_FOR_REGISTER,
+        role=UserRole.USER,
+    )
+    session.add(user)
+    inviter.invite_quota -= 1
+    await session.flush()
+    await session.refresh(user)
+
+
+def use_fixed_password_hash() -> str:
+    """用固定哈希替换 bcrypt，只测数据库路径"""
+    hashed_password = get_password_hash("bench12345")
+
+    async def fixed_hash(password: str) -> str:
+        return hashed_password
+
+    password_hasher.hash = fixed_hash
+    return hashed_password
+
+
+async def create_bench_inviter(hashed_password: str, invite_quota: int) -> User:
+    """准备一个指定配额的邀请人"""
+    async with AsyncSessionLocal() as session:
+        inviter = User(
+            username=f"bench_inviter_{uuid.uuid4().hex[:8]}",
+            email=f"bench_{uuid.uuid4().hex[:8]}@bench.example.com",
+            hashed_password=hashed_password,
+            invite_code=generate_invite_code(),
+            invite_quota=invite_quota,
+            is_active=True,
+        )
+        session.add(inviter)
+        await session.flush()
+        session.add(UserInviteClosure(ancestor_id=inviter.id, descendant_id=inviter.id, depth=0))
+        await session.commit()
+        return inviter
+
+
+def make_user_data(invite_code: str) -> UserRegister:
+    name = f"bench_{uuid.uuid4().hex[:12]}"
+    return UserRegister(
+        username=name,
+        email=f"{name}@bench.example.com",
+        password="bench12345",
+        invite_code=invite_code,
+    )
+
+
+async def bench_register(args) -> None:
+    hashed_password = use_fixed_password_hash()
+    inviter = await create_bench_inviter(hashed_password, args.count * 4)
+    invite_code = inviter.invite_code
+
+    async def new_path(i: int):
+        async with AsyncSessionLocal() as session:
+            user, message = await UserService(session).create_user(make_user_data(invite_code))
+            assert user is not None, message
+            await session.commit()
+
+    async def legacy_path(i: int):
+        async with AsyncSessionLocal() as session:
+            await legacy_create_user(session, make_user_data(invite_code), hashed_password)
+            await session.commit()
+
+    counter = StatementCounter()
+    print(f"注册吞吐（{args.count} 次，并发 {args.concurrency}）")
+    for name, path in (("旧流程", legacy_path), ("预检+单语句", new_path)):
+        counter.count = 0
+        elapsed = await run_concurrently(args.count, args.concurrency, path)
+        print_result(name, args.count, elapsed, counter.count)
+
+
+# ============ 邀请配额并发压测 ============
+async def bench_invite_stress(args) -> None:
+    hashed_password = use_fixed_password_hash()
+    inviter = await create_bench_inviter(hashed_password, args.quota)
+    invite_quota_leases.block_size = args.lease_size
+    invite_quota_leases.hot_threshold = 1
+
+    succeeded = 0
+
+    async def signup(i: int):
+        nonlocal succeeded
+        async with AsyncSessionLocal() as session:
+            user, _ = await UserService(session).create_user(make_user_data(inviter.invite_code))
+            await session.commit()
+            if user is not None:
+                succeeded += 1
+
+    elapsed = await run_concurrently(args.count, args.concurrency, signup)
+    await invite_quota_leases.release_all()
+
+    async with AsyncSessionLocal() as session:
+        remaining = await session.scalar(
+            select(User.invite_quota).where(User.id == inviter.id)
+        )
+        invited = await session.scalar(
+            select(func.count()).select_from(User).where(User.invited_by_id == inviter.id)
+        )
+        invited_count = await session.scalar(
+            select(User.invited_count).where(User.id == inviter.id)
+        )
+        subtree_size = await session.scalar(
+            select(func.count())
+            .select_from(UserInviteClosure)
+            .where(UserInviteClosure.ancestor_id == inviter.id, UserInviteClosure.depth > 0)
+        )
+
+    print(f"邀请配额压测（{args.count} 个请求，并发 {args.concurrency}，配额 {args.quota}，租约块 {args.lease_size}）")
+    print(f"  注册成功 {succeeded}   实际邀请 {invited}   剩余配额 {remaining}   耗时 {elapsed:.2f}s")
+    print(f"  邀请计数 {invited_count}   下级总数 {subtree_size}")
+    if invited > args.quota or invited + remaining != args.quota:
+        print("  ❌ 配额超发或丢失")
+        sys.exit(1)
+    if invited_count != invited or subtree_size != invited:
+        print("  ❌ 邀请计数或闭包表不一致")
+        sys.exit(1)
+    print("  ✅ 配额未超发")
+
+
+# ============ 邀请码分配器 ============
+async def bench_invite_codes(args) -> None:
+    key = invite_code_allocator.key
+    seen = set()
+    allowed = set(ALPHABET)
+
+    started = time.perf_counter()
+    for n in range(args.count):
+        code = code_for_sequence(n, key)
+        assert len(code) == CODE_LENGTH and set(code) <= allowed, code
+        seen.add(code)
+    elapsed = time.perf_counter() - started
+
+    duplicates = args.count - len(seen)
+    print(f"邀请码分配器（{args.count} 个连续序号）")
+    print(f"  生成速度 {args.count / elapsed:,.0f} 个/秒")
+    print(f"  重复数   {duplicates}")
+    if duplicates:
+        sys.exit(1)
+
+
+# ============ 认证开销 ============
+async def bench_auth(args) -> None:
+    async with AsyncSessionLocal() as session:
+        user_id = await session.scalar(select(User.id).order_by(User.id).limit(1))
+        token = create_access_token(subject=user_id, family_id=_new_token_id())
+        # 预热用户快照缓存，之后的调用不访问数据库
+        assert await get_current_user(session, token) is not None
+
+        print(f"认证开销（同一令牌 {args.count} 次）")
+        for name, maxsize in (("无令牌缓存", 0), ("令牌缓存", settings.ACCESS_TOKEN_CACHE_SIZE)):
+            access_token_cache.maxsize = maxsize
+            access_token_cache.clear()
+            access_token_cache.hits = access_token_cache.misses = access_token_cache.evictions = 0
+            started = time.perf_counter()
+            for _ in range(args.count):
+                await get_current_user(session, token)
+            elapsed = time.perf_counter() - started
+            print(f"  {name:<8} {elapsed / args.count * 1e6:>8.1f} us/次")
+        print(f"  令牌缓存 {access_token_cache.stats()}")
+
+
+# ============ 登录防暴力破解 ============
+class FakeClock:
+    """模拟时钟"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_login_throttle(clock: FakeClock) -> LoginThrottle:
+    return LoginThrottle(
+        store=MemoryThrottleStore(settings.LOGIN_FAILURE_WINDOW, clock=clock),
+        max_failures_per_identifier=settings.LOGIN_MAX_FAILURES_PER_IDENTIFIER,
+        max_failures_per_ip=settings.LOGIN_MAX_FAILURES_PER_IP,
+        backoff_base=settings.LOGIN_BACKOFF_BASE,
+        max_backoff=settings.LOGIN_BACKOFF_MAX,
+    )
+
+
+async def simulate_attack(attempts, interval: float) -> int:
+    """每 interval 秒尝试一次 (账号, IP)，全部失败，返回进入密码校验的次数"""
+    clock = FakeClock()
+    throttle = make_login_throttle(clock)
+    verified = 0
+    for identifier, ip in attempts:
+        clock.now += interval
+        if await throttle.retry_after(identifier, ip):
+            continue
+        verified += 1
+        await throttle.record_failure(identifier, ip)
+    return verified
+
+
+async def bench_login_throttle(args) -> None:
+    hour = 3600
+    print("登录防暴力破解（模拟1小时，每秒1次错误密码）")
+    scenarios = {
+        "单IP猜单账号": [("victim", "10.0.0.1")] * hour,
+        "多IP猜单账号": [("victim", f"10.0.{i // 256 % 256}.{i % 256}") for i in range(hour)],
+        "单IP撞多账号": [(f"user{i}", "10.0.0.1") for i in range(hour)],
+    }
+    for name, attempts in scenarios.items():
+        verified = await simulate_attack(attempts, interval=1)
+        print(f"  {name:<10} 密码校验 {verified:>5} 次（不限流 {len(attempts)} 次）")
+
+    # 正常用户输错几次后登录成功，不应被封禁
+    clock = FakeClock()
+    throttle = make_login_throttle(clock)
+    for _ in range(settings.LOGIN_MAX_FAILURES_PER_IDENTIFIER - 1):
+        await throttle.record_failure("alice", "10.0.0.2")
+    assert await throttle.retry_after("alice", "10.0.0.2") == 0
+    await throttle.record_success("alice")
+
+    count = 100000
+    started = time.perf_counter()
+    for i in range(count):
+        await throttle.retry_after("alice", "10.0.0.2")
+    elapsed = time.perf_counter() - started
+    print(f"  登录前检查 {elapsed / count * 1e6:.1f} us/次")
+
+
+# ============ 令牌吊销过滤器 ============
+async def bench_token_filter(args) -> None:
+    families = RevokedTokenFamilies(
+        capacity=settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+        error_rate=settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+        sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+    )
+    probes = [_new_token_id() for _ in range(args.count)]
+    check = families.might_be_revoked
+
+    def measure(name: str) -> None:
+        started = time.perf_counter()
+        positives = sum(1 for family_id in probes if check(family_id))
+        elapsed = time.perf_counter() - started
+        print(
+            f"  {name:<8} 单次查询 {elapsed / args.count * 1e9:>6.0f} ns"
+            f"   误报率 {positives / args.count:.4%}"
+        )
+
+    stats = families.stats()
+    print(f"令牌吊销过滤器（{args.count} 次查询未吊销的令牌族，{stats['bytes'] // 1024} KB，{stats['hashes']} 个哈希）")
+    measure("空")
+    for _ in range(families.capacity):
+        families.add(_new_token_id())
+    measure(f"已吊销{families.capacity}")
+    print(f"  设计误报率 {families.error_rate:.2%}")
+
+
+# ============ 数据库连接池 ============
+async def bench_pool(args) -> None:
+    pool = engine.pool
+
+    async def query(i: int) -> None:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT pg_sleep(0.01)"))
+        except exc.TimeoutError:
+            # 超时计入连接池统计，继续压测
+            pass
+
+    print(
+        f"连接池（{args.count} 次 10ms 查询，并发 {args.concurrency}，"
+        f"pool_size={settings.DB_POOL_SIZE} max_overflow={settings.DB_MAX_OVERFLOW}）"
+    )
+    elapsed = await run_concurrently(args.count, args.concurrency, query)
+    stats = pool.stats()
+    wait_time = stats["wait_time"]
+    print(f"  吞吐 {args.count / elapsed:.1f} 次/秒   总耗时 {elapsed:.2f}s")
+    print(
+        f"  取连接 {wait_time['count']} 次   平均等待 {wait_time['avg'] * 1000:.2f}ms"
+        f"   最长 {wait_time['max'] * 1000:.2f}ms"
+    )
+    print(
+        f"  空闲连接 {stats['checked_in']}   临时连接创建 {stats['overflow_created']} 次"
+        f"   超时 {stats['timeouts']} 次"
+    )
+
+
+# ============ 只读会话 ============
+async def bench_read_session(args) -> None:
+    request = Request({"type": "http", "headers": []})
+    query = select(Category).order_by(Category.sort_order)
+
+    async def handle(dependency) -> None:
+        """按 FastAPI 的方式驱动会话依赖：取会话、执行查询、结束请求"""
+        sessions = dependency(request)
+        session = await anext(sessions)
+        (await session.execute(query)).scalars().all()
+        await anext(sessions, None)
+
+    print(f"只读会话（分类列表查询 {args.count} 次，串行）")
+    for name, dependency in (("get_db", get_db), ("get_read_db", get_read_db)):
+        for _ in range(20):
+            await handle(dependency)
+        started = time.perf_counter()
+        for _ in range(args.count):
+            await handle(dependency)
+        elapsed = time.perf_counter() - started
+        print(f"  {name:<12} {elapsed / args.count * 1000:>7.3f} ms/次")
+
+
+# ============ 分页深度 ============
+async def bench_pagination(args) -> None:
+    order_by = [User.created_at, User.id]
+    size = args.page_size
+
+    async with AsyncSessionLocal() as session:
+        total = (await session.execute(select(func.count()).select_from(User))).scalar_one()
+        deepest = max(1, min(args.page, (total - 1) // size + 1))
+        # 游标取自上一页的最后一行，相当于客户端一页页翻到这里
+        boundary = (await session.execute(
+            select(*order_by).order_by(*(c.desc() for c in order_by)).offset((deepest - 1) * size - 1).limit(1)
+        )).first() if deepest > 1 else None
+
+    cursors = {1: None, deepest: encode_cursor(list(boundary)) if boundary else None}
+
+    async def offset_page(session, page: int) -> list:
+        query = select(User).order_by(User.created_at.desc(), User.id.desc()).offset((page - 1) * size).limit(size)
+        return list((await session.execute(query)).scalars().all())
+
+    async def keyset_page(session, page: int) -> list:
+        return (await paginate(session, select(User), order_by, limit=size, cursor=cursors[page])).items
+
+    print(f"分页深度（用户 {total} 个，每页 {size} 条，各执行 {args.count} 次）")
+    async with AsyncSessionLocal() as session:
+        for page in (1, deepest):
+            # 两种方式取到的是同一页
+            assert [u.id for u in await offset_page(session, page)] == [u.id for u in await keyset_page(session, page)]
+            for name, fetch in (("OFFSET", offset_page), ("游标", keyset_page)):
+                started = time.perf_counter()
+                for _ in range(args.count):
+                    await fetch(session, page)
+                    session.expunge_all()
+                elapsed = time.perf_counter() - started
+                print(f"  第 {page:<6} 页 {name:<6} {elapsed / args.count * 1000:>8.2f} ms/次")
+
+
+# ============ 列表总数 ============
+async def bench_list_count(args) -> None:
+    query = select(User).where(User.is_active == True)
+    order_by = [User.created_at, User.id]
+
+    async def separate(session) -> int:
+        await paginate(session, query, order_by, limit=20)
+        return await count_rows(session, query)
+
+    async def window(session) -> int:
+        count_cache.clear()
+        return (await paginate(session, query, order_by, limit=20, count=CountMode.EXACT)).total
+
+    async def cached(session) -> int:
+        return (await paginate(session, query, order_by, limit=20, count=CountMode.EXACT)).total
+
+    async def estimate(session) -> int:
+        count_cache.clear()
+        return (await paginate(session, query, order_by, limit=20, count=CountMode.ESTIMATE)).total
+
+    counter = StatementCounter()
+    async with AsyncSessionLocal() as session:
+        exact = await count_rows(session, query)
+        print(f"列表总数（活跃用户 {exact} 个，首页 20 条 + 总数，各执行 {args.count} 次）")
+        for name, fetch in (("单独COUNT", separate), ("窗口函数", window), ("缓存命中", cached), ("估算", estimate)):
+            total = await fetch(session)
+            counter.count = 0
+            started = time.perf_counter()
+            for _ in range(args.count):
+                await fetch(session)
+                session.expunge_all()
+            elapsed = time.perf_counter() - started
+            print(
+                f"  {name:<8} {elapsed / args.count * 1000:>8.2f} ms/次"
+                f"   {counter.count / args.count:.1f} 条SQL/次   总数 {total}"
+            )
+
+
+# ============ 列表大字段 ============
+PAYLOAD_ARTICLES = 10000
+
+# 正文为 60~260 段随机十六进制串（约 2~9KB，随机内容不会被 TOAST 压缩掉）
+SEED_ARTICLES = text("""
+    INSERT INTO contents (
+        title, slug, description, content_type, body, category_id, tags, is_free,
+        required_points, required_level, view_count, like_count, comment_count, share_count,
+        status, is_featured, is_pinned, author_id, created_at, updated_at, published_at
+    )
+    SELECT
+        '基准测试文章 ' || g, 'bench-article-' || g, repeat('这是一篇用于列表性能测试的文章简介。', 8),
+        'ARTICLE', (SELECT string_agg(md5(random()::text || g || i), ' ') FROM generate_series(1, 60 + g % 200) i),
+        :category_id, '[]', true, 0, 0, 0, 0, 0, 0, 'PUBLISHED', false, false, :author_id,
+        now() - interval '400 days' - g * interval '1 minute', now(), now()
+    FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) g
+""")
+
+
+async def prepare_payload_articles() -> int:
+    """准备基准分类和其中的文章（已存在的不重复插入），返回分类ID"""
+    async with AsyncSessionLocal() as session:
+        category = (await session.execute(select(Category).where(Category.slug == "bench-articles"))).scalar_one_or_none()
+        if category is None:
+            category = Category(name="基准测试", slug="bench-articles", sort_order=9999)
+            session.add(category)
+            await session.flush()
+        existing = (await session.execute(
+            select(func.count()).select_from(Content).where(Content.category_id == category.id)
+        )).scalar_one()
+        if existing < PAYLOAD_ARTICLES:
+            author_id = (await session.execute(
+                select(func.min(User.id)).where(User.role.in_([UserRole.ADMIN, UserRole.SUPER_ADMIN]))
+            )).scalar_one()
+            await session.execute(SEED_ARTICLES, {
+                "category_id": category.id,
+                "author_id": author_id,
+                "start": existing + 1,
+                "stop": PAYLOAD_ARTICLES,
+            })
+        await session.commit()
+        return category.id
+
+
+async def bench_list_payload(args) -> None:
+    category_id = await prepare_payload_articles()
+    query = select(Content).where(
+        Content.content_type == ContentType.ARTICLE,
+        Content.status == ContentStatus.PUBLISHED,
+        Content.category_id == category_id,
+    )
+    order_by = [Content.created_at, Content.id]
+    variants = (
+        ("整行", query, ContentResponse),
+        ("列表项", query.options(*CONTENT_LIST_OPTIONS), ContentListItem),
+    )
+
+    async def fetch_page(session, variant_query, schema, limit: int, cursor) -> tuple[int, Optional[str]]:
+        page = await paginate(session, variant_query, order_by, limit=limit, cursor=cursor)
+        payload = "[" + ",".join(schema.model_validate(item).model_dump_json() for item in page.items) + "]"
+        session.expunge_all()
+        return len(payload.encode()), page.next_cursor
+
+    print(f"列表大字段（{PAYLOAD_ARTICLES} 篇带正文的文章）")
+    async with AsyncSessionLocal() as session:
+        print(f"  首页 20 条，执行 {args.count} 次")
+        for name, variant_query, schema in variants:
+            size, _ = await fetch_page(session, variant_query, schema, 20, None)
+            started = time.perf_counter()
+            for _ in range(args.count):
+                await fetch_page(session, variant_query, schema, 20, None)
+            elapsed = time.perf_counter() - started
+            print(f"    {name:<6} {elapsed / args.count * 1000:>8.2f} ms/次   响应 {size / 1024:>8.1f} KB")
+
+        print("  每页 100 条翻完全部文章")
+        for name, variant_query, schema in variants:
+            total_size, pages, cursor = 0, 0, None
+            started = time.perf_counter()
+            while True:
+                size, cursor = await fetch_page(session, variant_query, schema, 100, cursor)
+                total_size += size
+                pages += 1
+                if cursor is None:
+                    break
+            elapsed = time.perf_counter() - started
+            print(f"    {name:<6} {pages} 页 {elapsed:>7.2f}s   响应共 {total_size / 1024 / 1024:>7.2f} MB")
+
+
+# ============ 响应序列化 ============
+def make_users(n: int) -> list[User]:
+    now = datetime.utcnow()
+    return [
+        User(
+            id=i, username=f"user_{i}", nickname=f"用户{i}", avatar=None, bio="个人简介" * 5,
+            level=i % 8 + 1, role=UserRole.USER, created_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def make_contents(n: int) -> list[Content]:
+    now = datetime.utcnow()
+    return [
+        Content(
+            id=i, title=f"文章标题 {i}", slug=f"article-{i}", content_type=ContentType.ARTICLE,
+            video_source=None, cover_image=f"https://cdn.example.com/covers/{i}.jpg", duration=None,
+            category_id=1, tags=["AIGC", "教程"], is_free=True, required_points=0, required_level=0,
+            status=ContentStatus.PUBLISHED, is_featured=False, is_pinned=False, author_id=1,
+            view_count=i * 7, like_count=i, comment_count=0, share_count=0,
+            created_at=now, updated_at=now, published_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+async def bench_serialization(args) -> None:
+    user_list_field = create_model_field("Response", ResponseList[UserPublic], mode="serialization")
+    content_page_field = create_model_field("Response", ContentPage, mode="serialization")
+    user_list_response = JSONSerializer(ResponseList[UserPublic])
+    content_page_response = JSONSerializer(ContentPage)
+
+    async def users_before(users) -> bytes:
+        """旧路径：接口内逐条 model_validate，FastAPI 再按 response_model 校验、转换，json.dumps 编码"""
+        data = ResponseList(data=[UserPublic.model_validate(u) for u in users], total=len(users))
+        content = await serialize_response(field=user_list_field, response_content=data)
+        return JSONResponse(content).body
+
+    async def users_orjson(users) -> bytes:
+        """同上，只把默认响应类换成 ORJSONResponse"""
+        data = ResponseList(data=[UserPublic.model_validate(u) for u in users], total=len(users))
+        content = await serialize_response(field=user_list_field, response_content=data)
+        return ORJSONResponse(content).body
+
+    async def users_after(users) -> bytes:
+        return user_list_response.dump({"data": users, "total": len(users)})
+
+    async def contents_before(contents) -> bytes:
+        """旧路径：无 response_model，jsonable_encoder 反射遍历 ORM 对象"""
+        content = await serialize_response(response_content={"items": contents, "total": len(contents)})
+        return JSONResponse(content).body
+
+    async def contents_model(contents) -> bytes:
+        """带 response_model：FastAPI 校验 ORM 对象、转换后 json.dumps"""
+        content = await serialize_response(
+            field=content_page_field, response_content={"items": contents, "total": len(contents)}
+        )
+        return JSONResponse(content).body
+
+    async def contents_after(contents) -> bytes:
+        return content_page_response.dump({"items": contents, "total": len(contents)})
+
+    suites = (
+        ("用户列表 ResponseList[UserPublic]", make_users, (
+            ("逐条校验+json", users_before), ("逐条校验+orjson", users_orjson), ("JSONSerializer", users_after),
+        )),
+        ("内容列表 ContentPage", make_contents, (
+            ("jsonable_encoder", contents_before), ("response_model", contents_model), ("JSONSerializer", contents_after),
+        )),
+    )
+    print(f"响应序列化（每种各执行 {args.count} 次）")
+    for title, make, variants in suites:
+        print(f"  {title}")
+        for n in (20, 100, 1000):
+            items = make(n)
+            results = []
+            for name, serialize in variants:
+                body = await serialize(items)
+                repeat = max(1, args.count * 20 // n)
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    await serialize(items)
+                results.append((name, (time.perf_counter() - started) / repeat, len(body)))
+            baseline = results[0][1]
+            for name, elapsed, size in results:
+                print(
+                    f"    {n:>5} 条 {name:<18} {elapsed * 1000:>8.3f} ms/次"
+                    f"   {baseline / elapsed:>5.1f}x   {size / 1024:>7.1f} KB"
+                )
+
+
+# ============ 积分排行榜 ============
+async def bench_leaderboard(args) -> None:
+    leaderboard = PointsLeaderboard(MemoryRankingStore(), rebuild_interval=0)
+    async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        await leaderboard.rebuild(session)
+        rebuild_elapsed = time.perf_counter() - started
+        members = leaderboard.stats()["members"]
+        print(f"积分排行榜（活跃用户 {members} 个，各执行 {args.count} 次）")
+        print(f"  从用户表重建 {rebuild_elapsed * 1000:.0f} ms")
+
+        async def sql_top(_) -> list:
+            result = await session.execute(
+                select(User).where(User.is_active == True).order_by(User.points.desc()).limit(50)
+            )
+            return list(result.scalars().all())
+
+        async def set_top(_) -> list:
+            return await leaderboard.top(session, 50)
+
+        user_ids = (await session.execute(select(User.id, User.points).where(User.is_active == True))).all()
+        samples = [random.choice(user_ids) for _ in range(args.count)]
+
+        async def sql_rank(i) -> tuple[int, int]:
+            user_id, points = samples[i]
+            higher = await session.execute(
+                select(func.count()).select_from(User).where(User.is_active == True, User.points > points)
+            )
+            return higher.scalar_one() + 1, points
+
+        async def set_rank(i) -> tuple[int, int]:
+            user_id, points = samples[i]
+            return await leaderboard.rank(session, user_id, points)
+
+        for name, fetch in (
+            ("前50名 SQL", sql_top), ("前50名 有序集合", set_top),
+            ("排名 SQL", sql_rank), ("排名 有序集合", set_rank),
+        ):
+            await fetch(0)
+            started = time.perf_counter()
+            for i in range(args.count):
+                await fetch(i)
+                session.expunge_all()
+            elapsed = time.perf_counter() - started
+            print(f"  {name:<14} {elapsed / args.count * 1000:>8.3f} ms/次")
+
+        mismatched = 0
+        for i in range(args.count):
+            mismatched += await sql_rank(i) != await set_rank(i)
+        print(f"  排名与数据库不一致 {mismatched} 次")
+
+    started = time.perf_counter()
+    for user_id, points in samples:
+        await leaderboard.store.set(user_id, points + random.randint(-50, 50))
+    elapsed = time.perf_counter() - started
+    print(f"  积分更新（删除 + 插入）{elapsed / len(samples) * 1e6:.1f} µs/次")
+
+
+# ============ 日/周/月积分排行 ============
+async def bench_period_leaderboard(args) -> None:
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        service = PointService(session)
+        admin_id = (await session.execute(select(User.id).where(User.username == "admin"))).scalar_one()
+        records = (await session.execute(select(func.count()).select_from(PointRecord))).scalar_one()
+        print(f"日/周/月积分排行（积分记录 {records} 条，各执行 {args.count} 次）")
+
+        for period in PointPeriod:
+            # 当前周期的起始时间：本地时区的周期起点换算为 UTC（积分记录的时间为 UTC）
+            local_start = datetime.combine(period_buckets(now)[period], datetime.min.time())
+            start = (await session.execute(
+                select(func.timezone("UTC", func.timezone(settings.LEADERBOARD_TIMEZONE, local_start)))
+            )).scalar_one()
+            in_period = (PointRecord.created_at >= start, PointRecord.points > 0)
+            earned = func.sum(PointRecord.points)
+
+            async def records_top() -> list:
+                result = await session.execute(
+                    select(PointRecord.user_id, earned.label("points"))
+                    .join(User, User.id == PointRecord.user_id)
+                    .where(*in_period, User.is_active == True)
+                    .group_by(PointRecord.user_id)
+                    .order_by(earned.desc(), PointRecord.user_id)
+                    .limit(20)
+                )
+                return [tuple(row) for row in result.all()]
+
+            async def records_rank() -> tuple[int, int]:
+                totals = (
+                    select(PointRecord.user_id, earned.label("points"))
+                    .join(User, User.id == PointRecord.user_id)
+                    .where(*in_period, User.is_active == True)
+                    .group_by(PointRecord.user_id)
+                    .subquery()
+                )
+                mine = func.coalesce(
+                    select(totals.c.points).where(totals.c.user_id == admin_id).scalar_subquery(), 0
+                )
+                higher = select(func.count()).select_from(totals).where(totals.c.points > mine).scalar_subquery()
+                row = (await session.execute(select(mine, higher))).one()
+                return row[1] + 1, row[0]
+
+            async def rollup_top() -> list:
+                return [(row.id, row.points) for row in await service.get_leaderboard(period, 20, now)]
+
+            async def rollup_rank() -> tuple[int, int]:
+                return await service.get_rank(period, admin_id, now)
+
+            results = {}
+            for name, fetch in (
+                ("前20名 积分记录", records_top), ("前20名 汇总表", rollup_top),
+                ("排名 积分记录", records_rank), ("排名 汇总表", rollup_rank),
+            ):
+                results[name] = await fetch()
+                started = time.perf_counter()
+                for _ in range(args.count):
+                    await fetch()
+                elapsed = time.perf_counter() - started
+                print(f"  {period.value:<5} {name:<12} {elapsed / args.count * 1000:>8.2f} ms/次")
+            consistent = (
+                results["前20名 积分记录"] == results["前20名 汇总表"]
+                and results["排名 积分记录"] == results["排名 汇总表"]
+            )
+            print(f"  {period.value:<5} 结果一致: {'是' if consistent else '否'}")
+
+
+# ============ 详情浏览计数 ============
+async def bench_view_counter(args) -> None:
+    request = Request({"type": "http", "headers": []})
+    category_id = await prepare_payload_articles()
+    async with AsyncSessionLocal() as session:
+        article_id = (await session.execute(
+            select(func.min(Content.id)).where(Content.category_id == category_id)
+        )).scalar_one()
+
+    async def view_count() -> int:
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(select(Content.view_count).where(Content.id == article_id))).scalar_one()
+
+    async def handle(dependency, endpoint) -> None:
+        sessions = dependency(request)
+        session = await anext(sessions)
+        await endpoint(session)
+        await anext(sessions, None)
+
+    async def legacy(session) -> None:
+        article = (await session.execute(select(Content).where(Content.id == article_id))).scalar_one()
+        article.view_count += 1
+        await session.commit()
+        content_response.response(article)
+
+    async def buffered(session) -> None:
+        await get_article(article_id, visitor="a:127.0.0.1:benchmark", db=session)
+
+    print(f"详情浏览计数（同一篇文章 {args.count} 次，并发 {args.concurrency}）")
+    for name, dependency, endpoint in (
+        ("每次提交", get_db, legacy),
+        ("写缓冲", get_read_db, buffered),
+    ):
+        before = await view_count()
+        elapsed = await run_concurrently(
+            args.count, args.concurrency, lambda _: handle(dependency, endpoint)
+        )
+        started = time.perf_counter()
+        rows = await counter_buffer.flush()
+        flush_ms = (time.perf_counter() - started) * 1000
+        added = await view_count() - before
+        print(
+            f"  {name:<8} {args.count / elapsed:>10.1f} 次/秒   总耗时 {elapsed:.2f}s"
+            f"   浏览数增加 {added}/{args.count}"
+            + (f"   批量写入 {rows} 行 {flush_ms:.1f} ms" if rows else "")
+        )
+
+
+# ============ 点赞 ============
+# 用户点赞分类下每隔一篇的文章（已点赞的跳过），点赞数同步加一
+SEED_LIKES = text("""
+    WITH inserted AS (
+        INSERT INTO likes (user_id, target_type, target_id, created_at)
+        SELECT :user_id, 'CONTENT', id, now() FROM contents
+        WHERE category_id = :category_id AND id % 2 = 0
+        ON CONFLICT DO NOTHING
+        RETURNING target_id
+    )
+    UPDATE contents SET like_count = like_count + 1 FROM inserted WHERE contents.id = inserted.target_id
+""")
+
+
+async def bench_likes(args) -> None:
+    category_id = await prepare_payload_articles()
+    async with AsyncSessionLocal() as session:
+        article_id = (await session.execute(
+            select(func.max(Content.id)).where(Content.category_id == category_id)
+        )).scalar_one()
+        user_ids = (await session.execute(
+            select(User.id).where(User.is_active == True).order_by(User.id).limit(args.count)
+        )).scalars().all()
+        # 从零开始，重复运行结果可比
+        await session.execute(
+            text("DELETE FROM likes WHERE target_type = 'CONTENT' AND target_id = :id"), {"id": article_id}
+        )
+        await session.execute(text("UPDATE contents SET like_count = 0 WHERE id = :id"), {"id": article_id})
+        await session.commit()
+
+    async def like_count() -> int:
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(select(Content.like_count).where(Content.id == article_id))).scalar_one()
+
+    async def legacy(i: int) -> None:
+        async with AsyncSessionLocal() as session:
+            content = (await session.execute(select(Content).where(Content.id == article_id))).scalar_one()
+            content.like_count += 1
+            await session.commit()
+
+    async def atomic(i: int) -> None:
+        async with AsyncSessionLocal() as session:
+            await LikeService(session).like(user_ids[i % len(user_ids)], LikeTarget.CONTENT, article_id)
+            await session.commit()
+
+    total = 2 * len(user_ids)
+    print(f"点赞（{len(user_ids)} 个用户各点赞同一篇文章两次，共 {total} 次，并发 {args.concurrency}）")
+    for name, func_, expected in (
+        ("读改写", legacy, f"无去重，应为 {total}"),
+        ("原子计数", atomic, f"去重，应为 {len(user_ids)}"),
+    ):
+        before = await like_count()
+        elapsed = await run_concurrently(total, args.concurrency, func_)
+        added = await like_count() - before
+        print(f"  {name:<8} {total / elapsed:>8.1f} 次/秒   点赞数增加 {added}（{expected}）")
+
+    async with AsyncSessionLocal() as session:
+        admin_id = (await session.execute(select(User.id).where(User.username == "admin"))).scalar_one()
+        await session.execute(SEED_LIKES, {"user_id": admin_id, "category_id": category_id})
+        await session.commit()
+        liked = (await session.execute(
+            select(func.count()).select_from(Like).where(Like.user_id == admin_id)
+        )).scalar_one()
+        page = (await session.execute(
+            select(Content).options(*CONTENT_LIST_OPTIONS)
+            .where(Content.category_id == category_id)
+            .order_by(Content.created_at.desc(), Content.id.desc())
+            .limit(100)
+        )).scalars().all()
+        ids = [content.id for content in page]
+        is_liked = (Like.user_id == admin_id, Like.target_type == LikeTarget.CONTENT)
+
+        async def per_item() -> set[int]:
+            found = set()
+            for content_id in ids:
+                if (await session.execute(
+                    select(exists().where(*is_liked, Like.target_id == content_id))
+                )).scalar_one():
+                    found.add(content_id)
+            return found
+
+        async def in_query() -> set[int]:
+            result = await session.execute(select(Like.target_id).where(*is_liked, Like.target_id.in_(ids)))
+            return set(result.scalars().all())
+
+        index = LikeIndex(maxsize=10, ttl=3600)
+
+        async def in_index() -> set[int]:
+            await index.mark(session, admin_id, LikeTarget.CONTENT, page)
+            return {content.id for content in page if content.liked}
+
+        print(f"列表页标记“我已点赞”（100 条，用户共点赞 {liked} 个对象，各执行 {args.count} 次）")
+        await LikeIndex(maxsize=1, ttl=3600).get(session, admin_id)
+        started = time.perf_counter()
+        for _ in range(10):
+            await LikeIndex(maxsize=1, ttl=3600).get(session, admin_id)
+        print(f"  加载用户点赞索引 {(time.perf_counter() - started) * 100:.1f} ms/次")
+        results = []
+        for name, fetch in (("逐条查询", per_item), ("IN 查询", in_query), ("点赞索引", in_index)):
+            results.append(await fetch())
+            started = time.perf_counter()
+            for _ in range(args.count):
+                await fetch()
+            elapsed = time.perf_counter() - started
+            print(f"  {name:<8} {elapsed / args.count * 1000:>8.3f} ms/页")
+        print(f"  结果一致: {'是' if results[0] == results[1] == results[2] else '否'}")
+
+        ids_set = (await index.get(session, admin_id))[LikeTarget.CONTENT]
+        python_set = set(ids_set)
+        python_bytes = sys.getsizeof(python_set) + sum(sys.getsizeof(value) for value in python_set)
+        print(f"  索引内存 IdSet {ids_set.nbytes / 1024:.1f} KB   set[int] {python_bytes / 1024:.1f} KB")
+
+
+# ============ 独立访客估计 ============
+async def bench_unique_visitors(args) -> None:
+    sketch = HyperLogLog()
+    print(f"独立访客估计（p={sketch.p}，{sketch.m} 个寄存器，内存 {len(sketch.registers)} 字节，"
+          f"理论标准误差 {1.04 / sketch.m ** 0.5:.2%}）")
+    for cardinality, trials in ((100, 50), (1000, 50), (10000, 20), (100000, 10), (1000000, 3)):
+        errors = []
+        for trial in range(trials):
+            sketch = HyperLogLog()
+            for i in range(cardinality):
+                sketch.add(f"{trial}:{i}")
+            errors.append(sketch.count() / cardinality - 1)
+        rms = (sum(error * error for error in errors) / trials) ** 0.5
+        print(
+            f"  基数 {cardinality:>8}（{trials:>2} 次）  平均误差 {sum(map(abs, errors)) / trials:>6.2%}"
+            f"  均方根误差 {rms:>6.2%}  最大误差 {max(map(abs, errors)):>6.2%}  压缩后 {len(sketch.to_bytes()):>5} 字节"
+        )
+
+    started = time.perf_counter()
+    for i in range(100000):
+        sketch.add(f"u:{i}")
+    print(f"  记录一次访问 {(time.perf_counter() - started) * 10:.2f} µs")
+
+    category_id = await prepare_payload_articles()
+    async with AsyncSessionLocal() as session:
+        article_id = (await session.execute(
+            select(func.max(Content.id)).where(Content.category_id == category_id)
+        )).scalar_one()
+        await session.execute(
+            text("UPDATE contents SET visitor_sketch = NULL, visitor_count = 0 WHERE id = :id"), {"id": article_id}
+        )
+        await session.commit()
+
+    # 模拟 4 个进程：第 i 个进程记录访客 [i * count / 2, i * count / 2 + count)，相邻进程重叠一半
+    workers = [VisitorSketches(interval=3600, max_rows=10000) for _ in range(4)]
+    for i, worker in enumerate(workers):
+        start = i * args.count // 2
+        for visitor in range(start, start + args.count):
+            worker.add(Content, article_id, f"u:{visitor}")
+    started = time.perf_counter()
+    for worker in workers:
+        await worker.flush()
+    elapsed = time.perf_counter() - started
+    actual = (len(workers) + 1) * args.count // 2
+    async with AsyncSessionLocal() as session:
+        estimate, size = (await session.execute(
+            select(Content.visitor_count, func.length(Content.visitor_sketch)).where(Content.id == article_id)
+        )).one()
+    print(f"多进程合并（4 个进程各 {args.count} 个访客）")
+    print(f"  写入合并 {elapsed / len(workers) * 1000:.1f} ms/进程   数据库中的估计 {size} 字节")
+    print(f"  独立访客数 估计 {estimate}   实际 {actual}   误差 {estimate / actual - 1:+.2%}")
+
+
+# ============ 热门排序 ============
+async def bench_hot(args) -> None:
+    category_id = await prepare_payload_articles()
+    async with AsyncSessionLocal() as session:
+        # 长尾分布的计数：大部分文章只有少量浏览，少数文章互动很多
+        await session.execute(text("""
+            UPDATE contents SET
+                view_count = floor(exp(random() * 10))::int,
+                like_count = floor(exp(random() * 6))::int,
+                comment_count = floor(exp(random() * 4))::int,
+                share_count = floor(exp(random() * 3))::int
+            WHERE category_id = :category_id
+        """), {"category_id": category_id})
+        await session.commit()
+        await session.execute(text("ANALYZE contents"))
+
+    query = select(Content).options(*CONTENT_LIST_OPTIONS).where(
+        Content.content_type == ContentType.ARTICLE,
+        Content.status == ContentStatus.PUBLISHED,
+        Content.category_id == category_id,
+    )
+    # 常见的查询时计算：互动量 / (发布小时数 + 2)^1.8，分数随当前时间变化，无法建索引，每次读出全部行排序
+    engagement = (
+        func.coalesce(Content.view_count, 0) + 5 * func.coalesce(Content.like_count, 0)
+        + 10 * func.coalesce(Content.comment_count, 0) + 20 * func.coalesce(Content.share_count, 0)
+    )
+    hours = func.date_part("epoch", func.now() - Content.created_at) / 3600
+    live_score = engagement / func.power(hours + 2, 1.8)
+    order_by = [Content.hot_score, Content.id]
+    page_size = args.page_size
+
+    async def live_page(session, page: int) -> list[int]:
+        result = await session.execute(
+            query.order_by(live_score.desc(), Content.id.desc()).offset((page - 1) * page_size).limit(page_size)
+        )
+        return [item.id for item in result.scalars()]
+
+    cursors: dict[int, Optional[str]] = {1: None}
+    async with AsyncSessionLocal() as session:
+        cursor = None
+        for page in range(2, args.page + 1):
+            cursor = (await paginate(session, query, order_by, limit=page_size, cursor=cursor)).next_cursor
+            if cursor is None:
+                break
+            cursors[page] = cursor
+        session.expunge_all()
+
+    async def stored_page(session, page: int) -> list[int]:
+        result = await paginate(session, query, order_by, limit=page_size, cursor=cursors[page])
+        return [item.id for item in result.items]
+
+    print(f"热门排序（{PAYLOAD_ARTICLES} 篇文章，每页 {page_size} 条，执行 {args.count} 次）")
+    async with AsyncSessionLocal() as session:
+        for page in (1, max(cursors)):
+            for name, fetch in (("查询时计算", live_page), ("预先计算", stored_page)):
+                await fetch(session, page)
+                started = time.perf_counter()
+                for _ in range(args.count):
+                    await fetch(session, page)
+                    session.expunge_all()
+                elapsed = time.perf_counter() - started
+                print(f"  第 {page:>4} 页  {name:<6} {elapsed / args.count * 1000:>8.2f} ms/次")
+
+        ids = (await session.execute(
+            select(Content.id).where(Content.category_id == category_id)
+        )).scalars().all()
+    for content_id in ids:
+        counter_buffer.incr(Content.view_count, content_id)
+    started = time.perf_counter()
+    flushed = await counter_buffer.flush()
+    print(f"  计数写入 {flushed} 行（重算热度并更新索引） {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+SCENARIOS = {
+    "register": bench_register,
+    "invite-codes": bench_invite_codes,
+    "invite-stress": bench_invite_stress,
+    "token-filter": bench_token_filter,
+    "auth": bench_auth,
+    "login-throttle": bench_login_throttle,
+    "pool": bench_pool,
+    "read-session": bench_read_session,
+    "pagination": bench_pagination,
+    "list-count": bench_list_count,
+    "list-payload": bench_list_payload,
+    "serialization": bench_serialization,
+    "leaderboard": bench_leaderboard,
+    "period-leaderboard": bench_period_leaderboard,
+    "view-counter": bench_view_counter,
+    "likes": bench_likes,
+    "unique-visitors": bench_unique_visitors,
+    "hot": bench_hot,
+}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="性能基准测试")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--quota", type=int, default=100)
+    parser.add_argument("--lease-size", type=int, default=0)
+    parser.add_argument("--page", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        await SCENARIOS[args.scenario](args)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+接口SQL预算检查
+
+用法:
+    python scripts/check_query_budgets.py [--username admin] [--password admin123456]
+
+功能:
+    在进程内调用下列接口（先预热一次，检查缓存命中后的稳定状态），
+    统计每次请求执行的SQL条数，超出预算或同一语句重复执行（N+1）时列出语句并以非零状态退出，
+    可放在 CI 中防止查询数量回退。新增或修改接口时在 BUDGETS 中登记预算
+
+说明:
+    需要已初始化的数据库（先运行 scripts/init_db.py），使用管理员账号调用需要登录的接口
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# 设置 UTF-8 编码
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.query_stats import QueryBudgetExceeded, query_budget
+from app.main import app
+
+# (方法, 路径, 是否需要登录, SQL条数上限)；同一语句最多执行一次
+BUDGETS = [
+    ("GET", "/contents/videos", False, 1),
+    ("GET", "/contents/articles", False, 1),
+    # 登录后标记“我已点赞”：用户点赞索引预热后不再查询
+    ("GET", "/contents/articles", True, 1),
+    ("GET", "/contents/podcasts", False, 1),
+    ("GET", "/contents/articles?sort=hot", False, 1),
+    ("GET", "/contents/categories", False, 1),
+    # 浏览数写入计数缓冲，详情请求只有一条查询
+    ("GET", "/contents/articles/1", False, 1),
+    ("GET", "/homework/", False, 1),
+    ("GET", "/users/leaderboard", False, 1),
+    ("GET", "/users/leaderboard?period=week", False, 1),
+    ("GET", "/users/1", False, 1),
+    ("GET", "/users/me", True, 1),
+    ("GET", "/users/me/rank", True, 1),
+    ("GET", "/users/me/rank?period=day", True, 1),
+    ("GET", "/users/me/invite-code", True, 2),
+    ("GET", "/users/me/invited-users", True, 2),
+    ("GET", "/homework/my/submissions", True, 1),
+    ("GET", "/users/admin/users", True, 2),
+    ("GET", "/contents/admin/contents", True, 2),
+    ("GET", "/homework/admin/homeworks", True, 2),
+    ("GET", "/homework/admin/submissions", True, 1),
+]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="接口SQL预算检查")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123456")
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=app)
+    failures = 0
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url=f"http://test{settings.API_V1_STR}") as client:
+            response = await client.post(
+                "/auth/login",
+                data={"username": args.username, "password": args.password},
+            )
+            response.raise_for_status()
+            auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            for method, path, needs_auth, max_queries in BUDGETS:
+                headers = auth if needs_auth else {}
+                await client.request(method, path, headers=headers)
+                try:
+                    with query_budget(max_queries, max_duplicates=1) as stats:
+                        response = await client.request(method, path, headers=headers)
+                except QueryBudgetExceeded as e:
+                    failures += 1
+                    print(f"❌ {method} {path}\n{e}")
+                    continue
+                status = "✅" if response.status_code < 400 else "⚠️ "
+                print(f"{status} {method} {path}  {stats.count}/{max_queries} 条SQL  HTTP {response.status_code}")
+    finally:
+        await engine.dispose()
+
+    if failures:
+        print(f"\n{failures} 个接口超出SQL预算")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
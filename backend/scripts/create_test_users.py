@@ -3,17 +3,43 @@
 
 用法:
     python scripts/create_test_users.py
+    python scripts/create_test_users.py --bulk 1000000 [--hash shared] [--workers 4] [--connections 4]
+
+批量模式（压测数据）:
+    按规模生成用户（含多级邀请关系）、积分记录、内容、帖子、评论、作业和作业提交，
+    通过 PostgreSQL COPY 分批写入，最后输出各表每秒写入行数。
+    --hash shared  所有批量用户共用一个预先计算的密码哈希（默认，百万级用户可用）
+    --hash unique  每个用户单独加盐哈希，在进程池中并行计算（bcrypt 很慢，仅适合小规模，
+                   可用 --rounds 降低轮数）
+    批量用户的用户名为 seed_<id>，密码统一为 test123456
 """
+import argparse
 import asyncio
+import json
+import random
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Callable, Optional
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.core.database import AsyncSessionLocal
-from app.core.security import get_password_hash
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.security import get_password_hash, pwd_context
+from app.models.content import ContentStatus, ContentType
+from app.models.forum import PostStatus
+from app.models.homework import HomeworkStatus, SubmissionStatus
+from app.models.points import PointActionType
 from app.models.user import User, UserRole
-from app.services.user import UserService, generate_invite_code
+from app.services.invite_code import code_for_sequence, invite_code_allocator
+from app.services.invite_tree import rebuild_invite_tree
+from app.services.points import rollup_records
+from app.services.user import UserService
 
 
 async def create_test_users():
@@ -56,7 +82,10 @@ async def create_test_users():
             },
         ]
         
-        for user_data in test_users:
+        # 批量分配邀请码（无需逐个查重）
+        invite_codes = await invite_code_allocator.allocate(session, len(test_users))
+        
+        for user_data, invite_code in zip(test_users, invite_codes):
             # 检查用户是否已存在
             existing = await user_service.get_by_username(user_data["username"])
             if existing:
@@ -74,7 +103,7 @@ async def create_test_users():
                 level=user_data.get("level", 1),
                 points=100,
                 total_points_earned=100,
-                invite_code=generate_invite_code(),
+                invite_code=invite_code,
                 invite_quota=5,
                 invited_by_id=admin.id,
                 is_active=True,
@@ -89,9 +118,459 @@ async def create_test_users():
             print(f"   邀请码: {user.invite_code}")
             print()
         
+        # 补齐邀请关系闭包和邀请计数
+        await rebuild_invite_tree(session)
         await session.commit()
         print("✅ 测试用户创建完成")
 
 
+# ============ 批量模式 ============
+BULK_PASSWORD = "test123456"
+
+# 获得积分的操作类型（批量积分记录随机选取）
+EARN_ACTIONS = (
+    PointActionType.DAILY_LOGIN,
+    PointActionType.POST,
+    PointActionType.COMMENT,
+    PointActionType.HOMEWORK_SUBMIT,
+    PointActionType.TASK_REWARD,
+)
+
+
+def _hash_passwords(count: int, rounds: Optional[int]) -> list[str]:
+    """进程池任务：为 count 个用户分别加盐哈希"""
+    context = pwd_context.copy(bcrypt__rounds=rounds) if rounds else pwd_context
+    return [context.hash(BULK_PASSWORD) for _ in range(count)]
+
+
+def _invite_codes(key: bytes, first: int, count: int) -> list[str]:
+    """进程池任务：由连续序号生成邀请码"""
+    return [code_for_sequence(n, key) for n in range(first, first + count)]
+
+
+def _split(total: int, parts: int) -> list[tuple[int, int]]:
+    """把 [0, total) 切成 parts 段，返回 (起点, 数量)"""
+    size = -(-total // parts)
+    return [(start, min(size, total - start)) for start in range(0, total, size)]
+
+
+def _random_time(now: datetime, days: int = 365) -> datetime:
+    return now - timedelta(seconds=random.randrange(days * 86400))
+
+
+class BulkReport:
+    """各表写入统计"""
+
+    def __init__(self):
+        self.tables: dict[str, tuple[int, float]] = {}
+        self.started = time.perf_counter()
+
+    def add(self, table: str, rows: int, elapsed: float) -> None:
+        total_rows, total_elapsed = self.tables.get(table, (0, 0.0))
+        self.tables[table] = (total_rows + rows, total_elapsed + elapsed)
+
+    def print(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        total = sum(rows for rows, _ in self.tables.values())
+        print()
+        print(f"{'表':<24}{'行数':>12}{'耗时(s)':>10}{'行/秒':>12}")
+        for table, (rows, seconds) in self.tables.items():
+            print(f"{table:<24}{rows:>12,}{seconds:>10.1f}{rows / max(seconds, 1e-9):>12,.0f}")
+        print(f"{'合计':<24}{total:>12,}{elapsed:>10.1f}{total / elapsed:>12,.0f}")
+
+
+async def copy_rows(table: str, columns: list[str], rows: list[tuple]) -> None:
+    """通过 COPY 写入一批数据（自动提交）"""
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(table, records=rows, columns=columns)
+
+
+async def reserve_ids(table: str, count: int) -> int:
+    """从表的自增序列中预留 count 个连续ID，返回第一个（批量写入期间不应有其他写入）"""
+    async with engine.begin() as conn:
+        last = await conn.scalar(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"nextval(pg_get_serial_sequence('{table}', 'id')) + {count - 1})"
+        ))
+    return last - count + 1
+
+
+async def reserve_invite_sequence(count: int) -> int:
+    """预留 count 个邀请码序号，返回第一个"""
+    async with engine.begin() as conn:
+        last = await conn.scalar(text(
+            f"SELECT setval('invite_code_seq', nextval('invite_code_seq') + {count - 1})"
+        ))
+    return last - count + 1
+
+
+class BulkSeeder:
+    """批量生成压测数据"""
+
+    def __init__(self, args: argparse.Namespace, pool: ProcessPoolExecutor):
+        self.args = args
+        self.pool = pool
+        self.report = BulkReport()
+        self.now = datetime.utcnow()
+        self.semaphore = asyncio.Semaphore(args.connections)
+        self.root_id = 0
+        self.shared_hash = ""
+        self.first_user_id = 0
+        self.user_count = args.bulk
+
+    def random_user(self) -> int:
+        return self.first_user_id + random.randrange(self.user_count)
+
+    async def run_in_pool(self, func: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def write(self, table: str, columns: list[str], rows: list[tuple]) -> None:
+        started = time.perf_counter()
+        await copy_rows(table, columns, rows)
+        self.report.add(table, len(rows), time.perf_counter() - started)
+
+    async def write_batches(
+        self, table: str, columns: list[str], count: int, build: Callable[[int, int], list[tuple]]
+    ) -> None:
+        """按批并发写入 count 行，build(起点, 数量) 生成一批数据"""
+        async def copy(rows: list[tuple]) -> None:
+            async with self.semaphore:
+                await copy_rows(table, columns, rows)
+
+        started = time.perf_counter()
+        tasks = []
+        for start in range(0, count, self.args.batch):
+            rows = build(start, min(self.args.batch, count - start))
+            tasks.append(asyncio.create_task(copy(rows)))
+            # 限制同时在内存中的批次数
+            if len(tasks) >= self.args.connections * 2:
+                await asyncio.gather(*tasks)
+                tasks = []
+        await asyncio.gather(*tasks)
+        # 生成数据和并发写入的总耗时
+        self.report.add(table, count, time.perf_counter() - started)
+
+    # ---------- 用户 ----------
+    async def password_hashes(self, count: int) -> list[str]:
+        if self.args.hash == "shared":
+            return [self.shared_hash] * count
+        parts = _split(count, self.args.workers * 4)
+        chunks = await asyncio.gather(*(
+            self.run_in_pool(_hash_passwords, size, self.args.rounds) for _, size in parts
+        ))
+        return [hashed for chunk in chunks for hashed in chunk]
+
+    async def invite_codes(self, first_sequence: int, count: int) -> list[str]:
+        parts = _split(count, self.args.workers)
+        chunks = await asyncio.gather(*(
+            self.run_in_pool(_invite_codes, invite_code_allocator.key, first_sequence + start, size)
+            for start, size in parts
+        ))
+        return [code for chunk in chunks for code in chunk]
+
+    def invited_by(self, index: int) -> int:
+        """
+        第 index 个批量用户的邀请人：少数由管理员直接邀请，其余由更早的批量用户邀请，
+        偏向早期用户（早期用户邀请人数多，形成多级邀请树）
+        """
+        if index == 0 or random.random() < 0.02:
+            return self.root_id
+        return self.first_user_id + int(index * random.random() ** 2)
+
+    def point_history(self) -> tuple[list[tuple[PointActionType, int, int]], int, int]:
+        """生成一个用户的积分记录 [(类型, 积分, 余额)]，返回 (记录, 余额, 累计获得)"""
+        balance = settings.POINTS_FOR_REGISTER
+        records = [(PointActionType.REGISTER, balance, balance)]
+        for _ in range(random.randint(0, self.args.points_per_user * 2)):
+            if balance > 50 and random.random() < 0.2:
+                points = -random.choice((10, 20, 50))
+                action = PointActionType.UNLOCK_CONTENT
+            else:
+                points = random.choice((5, 10, 20, 30))
+                action = random.choice(EARN_ACTIONS)
+            balance += points
+            records.append((action, points, balance))
+        earned = sum(points for _, points, _ in records if points > 0)
+        return records, balance, earned
+
+    async def seed_users(self) -> None:
+        count = self.user_count
+        self.first_user_id = await reserve_ids("users", count)
+        first_sequence = await reserve_invite_sequence(count)
+
+        user_columns = [
+            "id", "username", "email", "hashed_password", "nickname", "role", "level",
+            "experience", "points", "total_points_earned", "invite_code", "invited_by_id",
+            "invite_quota", "invited_count", "is_active", "is_verified", "created_at", "updated_at",
+        ]
+        record_columns = [
+            "user_id", "action_type", "points", "balance", "description", "created_at",
+        ]
+
+        # 邀请关系要求邀请人先写入：用户按批顺序写入，同批内邀请人ID更小，COPY 语句结束时才检查外键
+        for start in range(0, count, self.args.batch):
+            size = min(self.args.batch, count - start)
+            hashes, codes = await asyncio.gather(
+                self.password_hashes(size),
+                self.invite_codes(first_sequence + start, size),
+            )
+
+            users, records = [], []
+            for offset in range(size):
+                index = start + offset
+                user_id = self.first_user_id + index
+                created_at = _random_time(self.now)
+                history, balance, earned = self.point_history()
+                level = 1 + int(8 * random.random() ** 3)
+                users.append((
+                    user_id, f"seed_{user_id}", f"seed_{user_id}@seed.example.com",
+                    hashes[offset], f"种子用户{user_id}", UserRole.USER.name, level,
+                    level * 100, balance, earned, codes[offset], self.invited_by(index),
+                    settings.DEFAULT_INVITE_QUOTA, 0, True, False, created_at, created_at,
+                ))
+                for action, points, record_balance in history:
+                    records.append((
+                        user_id, action.name, points, record_balance, "批量生成", created_at,
+                    ))
+
+            await self.write("users", user_columns, users)
+            await self.write("point_records", record_columns, records)
+            print(f"  用户 {start + size:,}/{count:,}")
+
+        # 邀请关系闭包和邀请计数
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            await rebuild_invite_tree(session)
+            await session.commit()
+            closure_rows = await session.scalar(text(
+                "SELECT count(*) FROM user_invite_closure WHERE descendant_id >= :first"
+            ), {"first": self.first_user_id})
+        self.report.add("user_invite_closure", closure_rows, time.perf_counter() - started)
+
+    # ---------- 内容与社区 ----------
+    async def seed_contents(self) -> tuple[int, int]:
+        count = self.args.contents
+        first_id = await reserve_ids("contents", count) if count else 0
+        columns = [
+            "id", "title", "slug", "description", "content_type", "body", "tags", "is_free",
+            "required_points", "required_level", "view_count", "like_count", "comment_count",
+            "share_count", "status", "is_featured", "is_pinned", "author_id",
+            "created_at", "updated_at", "published_at",
+        ]
+        content_types = [t.name for t in ContentType]
+
+        def build(start: int, size: int) -> list[tuple]:
+            rows = []
+            for content_id in range(first_id + start, first_id + start + size):
+                created_at = _random_time(self.now)
+                rows.append((
+                    content_id, f"批量内容 {content_id}", f"seed-{content_id}",
+                    "批量生成的内容简介", random.choice(content_types), "批量生成的内容正文" * 20,
+                    json.dumps(["seed"]), random.random() < 0.7, 0, 0,
+                    random.randint(0, 5000), random.randint(0, 500), 0, random.randint(0, 50),
+                    ContentStatus.PUBLISHED.name, random.random() < 0.05, False,
+                    self.random_user(), created_at, created_at, created_at,
+                ))
+            return rows
+
+        await self.write_batches("contents", columns, count, build)
+        return first_id, count
+
+    async def seed_posts(self) -> tuple[int, int]:
+        count = self.args.posts
+        first_id = await reserve_ids("posts", count) if count else 0
+        columns = [
+            "id", "title", "content", "author_id", "view_count", "like_count", "comment_count",
+            "status", "is_pinned", "is_featured", "created_at", "updated_at",
+        ]
+
+        def build(start: int, size: int) -> list[tuple]:
+            rows = []
+            for post_id in range(first_id + start, first_id + start + size):
+                created_at = _random_time(self.now)
+                rows.append((
+                    post_id, f"批量帖子 {post_id}", "批量生成的帖子内容" * 10, self.random_user(),
+                    random.randint(0, 2000), random.randint(0, 200), 0,
+                    PostStatus.PUBLISHED.name, False, random.random() < 0.02, created_at, created_at,
+                ))
+            return rows
+
+        await self.write_batches("posts", columns, count, build)
+        return first_id, count
+
+    async def seed_comments(self, contents: tuple[int, int], posts: tuple[int, int]) -> None:
+        count = self.args.comments
+        first_content, content_count = contents
+        first_post, post_count = posts
+        if not count or not (content_count or post_count):
+            return
+        # Comment 模型中的 content 文本列被同名关系覆盖，表中没有正文列
+        columns = [
+            "author_id", "post_id", "content_id", "like_count", "is_hidden",
+            "created_at", "updated_at",
+        ]
+
+        def build(start: int, size: int) -> list[tuple]:
+            rows = []
+            for _ in range(size):
+                created_at = _random_time(self.now)
+                on_post = post_count and (not content_count or random.random() < 0.7)
+                post_id = first_post + random.randrange(post_count) if on_post else None
+                content_id = None if on_post else first_content + random.randrange(content_count)
+                rows.append((
+                    self.random_user(), post_id, content_id,
+                    random.randint(0, 20), False, created_at, created_at,
+                ))
+            return rows
+
+        await self.write_batches("comments", columns, count, build)
+
+        # 回填评论计数
+        async with engine.begin() as conn:
+            await conn.execute(text("""
+                UPDATE posts SET comment_count = c.total
+                FROM (SELECT post_id, count(*) AS total FROM comments
+                      WHERE post_id >= :first GROUP BY post_id) AS c
+                WHERE posts.id = c.post_id
+            """), {"first": first_post})
+            await conn.execute(text("""
+                UPDATE contents SET comment_count = c.total
+                FROM (SELECT content_id, count(*) AS total FROM comments
+                      WHERE content_id >= :first GROUP BY content_id) AS c
+                WHERE contents.id = c.content_id
+            """), {"first": first_content})
+
+    async def seed_homework(self) -> None:
+        homework_count = self.args.homeworks
+        count = self.args.submissions
+        if not homework_count:
+            return
+        first_homework = await reserve_ids("homeworks", homework_count)
+        await self.write("homeworks", [
+            "id", "title", "description", "reference_materials", "base_points",
+            "excellent_points", "status", "submission_count", "publisher_id",
+            "created_at", "updated_at",
+        ], [
+            (
+                homework_id, f"批量作业 {homework_id}", "批量生成的作业说明", json.dumps([]),
+                settings.POINTS_FOR_HOMEWORK_SUBMIT, settings.POINTS_FOR_HOMEWORK_REVIEW,
+                HomeworkStatus.PUBLISHED.name, 0, self.root_id, self.now, self.now,
+            )
+            for homework_id in range(first_homework, first_homework + homework_count)
+        ])
+
+        columns = [
+            "homework_id", "student_id", "content", "attachments", "status", "points_earned",
+            "submitted_at", "updated_at",
+        ]
+        statuses = [status.name for status in SubmissionStatus]
+
+        def build(start: int, size: int) -> list[tuple]:
+            rows = []
+            for _ in range(size):
+                submitted_at = _random_time(self.now, days=90)
+                rows.append((
+                    first_homework + random.randrange(homework_count), self.random_user(),
+                    "批量生成的作业提交", json.dumps([]), random.choice(statuses),
+                    random.choice((0, settings.POINTS_FOR_HOMEWORK_SUBMIT)),
+                    submitted_at, submitted_at,
+                ))
+            return rows
+
+        await self.write_batches("homework_submissions", columns, count, build)
+
+        async with engine.begin() as conn:
+            await conn.execute(text("""
+                UPDATE homeworks SET submission_count = s.total
+                FROM (SELECT homework_id, count(*) AS total FROM homework_submissions
+                      WHERE homework_id >= :first GROUP BY homework_id) AS s
+                WHERE homeworks.id = s.homework_id
+            """), {"first": first_homework})
+
+    @staticmethod
+    async def max_point_record_id() -> int:
+        async with engine.connect() as conn:
+            return (await conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM point_records"))).scalar_one()
+
+    async def rollup_points(self, after_id: int) -> None:
+        """积分记录由 COPY 写入、不经过应用，补上这些记录的日/周/月积分汇总"""
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            rows = await rollup_records(session, after_id, await self.max_point_record_id())
+            await session.commit()
+        self.report.add("point_rollups", rows, time.perf_counter() - started)
+
+    async def run(self) -> None:
+        async with AsyncSessionLocal() as session:
+            admin = await UserService(session).get_by_username("admin")
+            if not admin:
+                print("❌ 请先运行 init_db.py 创建管理员")
+                return
+            self.root_id = admin.id
+
+        if self.args.hash == "shared":
+            self.shared_hash = get_password_hash(BULK_PASSWORD)
+
+        print(f"批量生成 {self.user_count:,} 个用户（密码哈希: {self.args.hash}，"
+              f"进程 {self.args.workers}，连接 {self.args.connections}，每批 {self.args.batch}）")
+        last_record_id = await self.max_point_record_id()
+        await self.seed_users()
+        await self.rollup_points(last_record_id)
+        contents = await self.seed_contents()
+        posts = await self.seed_posts()
+        await self.seed_comments(contents, posts)
+        await self.seed_homework()
+
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "ANALYZE users, user_invite_closure, point_records, contents, posts, "
+                "comments, homeworks, homework_submissions"
+            ))
+        self.report.print()
+
+
+async def seed_bulk(args: argparse.Namespace) -> None:
+    """批量模式入口"""
+    random.seed(args.seed)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        try:
+            await BulkSeeder(args, pool).run()
+        finally:
+            await engine.dispose()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="创建测试用户")
+    parser.add_argument("--bulk", type=int, default=0, help="批量生成的用户数（不指定则只创建固定的测试用户）")
+    parser.add_argument("--hash", choices=("shared", "unique"), default="shared", help="密码哈希方式")
+    parser.add_argument("--rounds", type=int, default=None, help="unique 模式下的 bcrypt 轮数")
+    parser.add_argument("--workers", type=int, default=4, help="哈希/邀请码计算进程数")
+    parser.add_argument("--connections", type=int, default=4, help="并发写入连接数")
+    parser.add_argument("--batch", type=int, default=10000, help="每批写入行数")
+    parser.add_argument("--points-per-user", type=int, default=3, help="每个用户平均积分记录数（不含注册）")
+    parser.add_argument("--contents", type=int, default=None, help="内容数（默认用户数的1%%）")
+    parser.add_argument("--posts", type=int, default=None, help="帖子数（默认用户数的10%%）")
+    parser.add_argument("--comments", type=int, default=None, help="评论数（默认与用户数相同）")
+    parser.add_argument("--homeworks", type=int, default=20, help="作业数")
+    parser.add_argument("--submissions", type=int, default=None, help="作业提交数（默认用户数的20%%）")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    args = parser.parse_args()
+
+    if args.contents is None:
+        args.contents = args.bulk // 100
+    if args.posts is None:
+        args.posts = args.bulk // 10
+    if args.comments is None:
+        args.comments = args.bulk
+    if args.submissions is None:
+        args.submissions = args.bulk // 5
+    return args
+
+
 if __name__ == "__main__":
-    asyncio.run(create_test_users())
+    args = parse_args()
+    if args.bulk:
+        asyncio.run(seed_bulk(args))
+    else:
+        asyncio.run(create_test_users())
@@ -0,0 +1,181 @@
+"""
+列表查询执行计划检查
+
+用法:
+    python scripts/explain_queries.py [--planner-defaults] [--verbose]
+
+功能:
+    在进程内调用下列接口，捕获接口执行的 SELECT 语句及参数，逐条 EXPLAIN，
+    确认每个接口的查询使用了为它建立的索引（见 alembic/versions/0002_list_query_indexes.py、
+    0003、0004、0005、0008），未使用时打印执行计划并以非零状态退出；
+    支持游标分页的接口再取一个 next_cursor，检查游标翻页的查询
+
+说明:
+    开发库数据量小，规划器往往直接顺序扫描，或估计只有几行而取出后再排序，默认在 EXPLAIN 时关闭顺序扫描和显式排序
+    （enable_seqscan = off、enable_sort = off），检查的是索引能否匹配查询条件和排序；
+    --planner-defaults 保留规划器默认设置，查看真实数据量下的计划。
+    需要已初始化的数据库（先运行 scripts/init_db.py），使用管理员账号调用需要登录的接口
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 设置 UTF-8 编码
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.database import engine
+from app.main import app
+
+# (路径, 是否需要登录, 查询的表, 期望使用的索引)；
+# 多个索引都能按顺序返回结果时，规划器按筛选条件的选择性取其一，列出的任一索引都视为通过
+CHECKS = [
+    ("/contents/videos", False, "contents", "ix_contents_type_status_created_id"),
+    ("/contents/videos?category_id=1", False, "contents", "ix_contents_category_type_status_created_id"),
+    ("/contents/articles", False, "contents", ("ix_contents_type_status_created_id", "ix_contents_created_at_id")),
+    ("/contents/podcasts", False, "contents", "ix_contents_type_status_created_id"),
+    ("/contents/videos?sort=hot", False, "contents", "ix_contents_type_status_hot_id"),
+    ("/contents/videos?sort=hot&category_id=1", False, "contents", "ix_contents_category_type_status_hot_id"),
+    ("/contents/articles?sort=hot", False, "contents", "ix_contents_type_status_hot_id"),
+    ("/contents/admin/contents", True, "contents", "ix_contents_created_at_id"),
+    ("/homework/", False, "homeworks", ("ix_homeworks_status_created_id", "ix_homeworks_created_at_id")),
+    ("/homework/?category_id=1", False, "homeworks", "ix_homeworks_category_status_created_id"),
+    ("/homework/admin/homeworks", True, "homeworks", "ix_homeworks_created_at_id"),
+    ("/homework/admin/submissions", True, "homework_submissions", "ix_homework_submissions_submitted_at_id"),
+    (
+        "/homework/admin/submissions?status=pending", True, "homework_submissions",
+        "ix_homework_submissions_status_submitted_id",
+    ),
+    (
+        "/homework/admin/submissions?homework_id=1&status=pending", True, "homework_submissions",
+        "ix_homework_submissions_homework_status_submitted_id",
+    ),
+    ("/homework/my/submissions", True, "homework_submissions", "ix_homework_submissions_student_submitted"),
+    # 排行榜在进程内有序集合就绪前（本脚本不运行应用生命周期，不会重建）回退到数据库查询
+    ("/users/leaderboard", False, "users", "ix_users_active_points"),
+    ("/users/me/rank", True, "users", "ix_users_active_points"),
+    ("/users/leaderboard?period=week", False, "point_rollups", "ix_point_rollups_period_bucket_points"),
+    ("/users/me/rank?period=month", True, "point_rollups", "ix_point_rollups_period_bucket_points"),
+    ("/users/admin/users", True, "users", "ix_users_created_at_id"),
+]
+
+captured: list[tuple[str, tuple]] = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _capture(conn, cursor, statement, parameters, context, executemany) -> None:
+    if statement.lstrip().upper().startswith("SELECT"):
+        captured.append((statement, tuple(parameters or ())))
+
+
+def plan_nodes(plan: dict):
+    """遍历执行计划的所有节点"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def explain(statement: str, parameters: tuple, planner_defaults: bool) -> dict:
+    async with engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        async with raw.transaction():
+            if not planner_defaults:
+                await raw.execute("SET LOCAL enable_seqscan = off")
+                await raw.execute("SET LOCAL enable_sort = off")
+            result = await raw.fetchval(f"EXPLAIN (FORMAT JSON) {statement}", *parameters)
+    # 引擎的连接上注册了 json 解码，结果可能已经是列表
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]["Plan"]
+
+
+async def check(
+    client: httpx.AsyncClient, path: str, headers: dict, table: str, indexes: tuple, args: argparse.Namespace
+) -> bool:
+    """请求接口并检查其查询的执行计划，返回是否使用了期望的索引"""
+    captured.clear()
+    response = await client.get(path, headers=headers)
+    statements = [(sql, params) for sql, params in captured if f"FROM {table}" in sql]
+    if response.status_code >= 400 or not statements:
+        print(f"❌ GET {path}  HTTP {response.status_code}，未捕获到 {table} 的查询")
+        return False
+
+    used, sorted_ = None, False
+    plans = []
+    for sql, params in statements:
+        plan = await explain(sql, params, args.planner_defaults)
+        nodes = list(plan_nodes(plan))
+        plans.append((sql, plan))
+        matched = [node["Index Name"] for node in nodes if node.get("Index Name") in indexes]
+        if matched:
+            used = matched[0]
+            sorted_ = sorted_ or any(node["Node Type"] in ("Sort", "Incremental Sort") for node in nodes)
+
+    if used:
+        note = "（另有排序）" if sorted_ else ""
+        print(f"✅ GET {path}  使用 {used}{note}")
+    else:
+        print(f"❌ GET {path}  未使用 {' / '.join(indexes)}")
+    if args.verbose or not used:
+        for sql, plan in plans:
+            print("   " + " ".join(sql.split()))
+            print("   " + json.dumps(plan, ensure_ascii=False)[:2000])
+    return bool(used)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="列表查询执行计划检查")
+    parser.add_argument("--planner-defaults", action="store_true", help="不关闭顺序扫描和显式排序")
+    parser.add_argument("--verbose", action="store_true", help="打印每条语句的执行计划")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123456")
+    args = parser.parse_args()
+
+    failures = 0
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url=f"http://test{settings.API_V1_STR}") as client:
+            response = await client.post(
+                "/auth/login",
+                data={"username": args.username, "password": args.password},
+            )
+            response.raise_for_status()
+            auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            for path, needs_auth, table, indexes in CHECKS:
+                if isinstance(indexes, str):
+                    indexes = (indexes,)
+                headers = auth if needs_auth else {}
+                if not await check(client, path, headers, table, indexes, args):
+                    failures += 1
+                    continue
+
+                # 每页一条取得 next_cursor，检查游标翻页（行比较条件）同样走索引
+                separator = "&" if "?" in path else "?"
+                response = await client.get(f"{path}{separator}limit=1", headers=headers)
+                body = response.json()
+                cursor = body.get("next_cursor") if isinstance(body, dict) else None
+                if cursor and not await check(
+                    client, f"{path}{separator}cursor={cursor}", headers, table, indexes, args
+                ):
+                    failures += 1
+    finally:
+        await engine.dispose()
+
+    if failures:
+        print(f"\n{failures} 个接口的查询未使用预期索引")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
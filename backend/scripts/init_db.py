@@ -5,7 +5,7 @@
     python scripts/init_db.py
 
 功能:
-    1. 创建所有数据库表
+    1. 执行数据库迁移（alembic upgrade head）创建/升级所有表和索引
     2. 初始化等级配置
     3. 创建超级管理员账号
 """
@@ -22,21 +22,64 @@ if sys.platform == 'win32':
 # 添加项目根目录到 Python 路径
 sys.path.append(str(Path(__file__).parent.parent))
 
-from sqlalchemy import select
-from app.core.database import Base, engine, AsyncSessionLocal
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, select
+from app.core.database import engine, AsyncSessionLocal
 from app.core.security import get_password_hash
 from app.models.user import User, UserLevel, UserRole
 from app.models.content import Category
 from app.models.forum import ForumCategory
 from app.models.homework import HomeworkCategory
-from app.services.user import generate_invite_code
+from app.services.invite_code import invite_code_allocator
+from app.services.invite_tree import rebuild_invite_tree
+
+
+BASELINE_REVISION = "0001"
+# 0001a 新增的对象：用 create_all 建表的数据库按是否已有这些对象决定标记为 0001 还是 0001a
+INVITE_SCHEMA_REVISION = "0001a"
+
+
+def inspect_legacy_schema(sync_conn) -> tuple[list[str], dict[str, bool]]:
+    """返回 (已有的表, {0001a 新增的对象: 是否存在})"""
+    inspector = inspect(sync_conn)
+    table_names = inspector.get_table_names()
+    user_columns = {column["name"] for column in inspector.get_columns("users")} if "users" in table_names else set()
+    objects = {
+        "user_invite_closure 表": "user_invite_closure" in table_names,
+        "refresh_token_families 表": "refresh_token_families" in table_names,
+        "users.invited_count 列": "invited_count" in user_columns,
+        "invite_code_seq 序列": "invite_code_seq" in inspector.get_sequence_names(),
+    }
+    return table_names, objects
 
 
 async def create_tables():
-    """创建所有表"""
-    print("🔧 创建数据库表...")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """
+    执行数据库迁移创建所有表
+    此前用 create_all 建表、还没有迁移记录的数据库先按已有的表结构标记版本，再升级；
+    表结构与任何已知版本都不一致时不标记，避免跳过缺失对象的迁移
+    """
+    print("🔧 执行数据库迁移...")
+    async with engine.connect() as conn:
+        table_names, objects = await conn.run_sync(inspect_legacy_schema)
+    
+    alembic_config = Config(str(Path(__file__).parent.parent / "alembic.ini"))
+    # alembic 的 env.py 自行运行事件循环，放到线程中执行
+    if "users" in table_names and "alembic_version" not in table_names:
+        if not any(objects.values()):
+            revision = BASELINE_REVISION
+        elif all(objects.values()):
+            revision = INVITE_SCHEMA_REVISION
+        else:
+            missing = "、".join(name for name, exists in objects.items() if not exists)
+            raise RuntimeError(
+                f"已有表但没有迁移记录，且缺少 {missing}，与已知版本都不一致，无法自动标记；"
+                "请补齐后执行 alembic stamp 并升级"
+            )
+        print(f"⚠️  已有表但没有迁移记录，标记为版本 {revision}")
+        await asyncio.to_thread(command.stamp, alembic_config, revision)
+    await asyncio.to_thread(command.upgrade, alembic_config, "head")
     print("✅ 数据库表创建成功")
 
 
@@ -176,7 +219,7 @@ async def create_super_admin():
             experience=99999,
             points=99999,
             total_points_earned=99999,
-            invite_code=generate_invite_code(),
+            invite_code=await invite_code_allocator.next_code(session),
             invite_quota=999,
             is_active=True,
             is_verified=True,
@@ -209,11 +252,9 @@ async def create_initial_invite_codes():
         
         # 创建10个预设邀请码
         initial_codes = []
-        invite_codes_list = []
+        invite_codes_list = await invite_code_allocator.allocate(session, 10)
         
-        for i in range(10):
-            code = generate_invite_code()
-            invite_codes_list.append(code)
+        for i, code in enumerate(invite_codes_list):
             initial_codes.append(
                 User(
                     username=f"invite_code_{i+1}",
@@ -247,6 +288,17 @@ async def create_initial_invite_codes():
         print("\n💡 提示: 这些邀请码可以分发给早期用户进行注册")
 
 
+async def init_invite_tree():
+    """重建邀请关系闭包表（脚本直接写入的用户不经过注册流程）"""
+    print("🔧 重建邀请关系...")
+    
+    async with AsyncSessionLocal() as session:
+        await rebuild_invite_tree(session)
+        await session.commit()
+    
+    print("✅ 邀请关系重建完成")
+
+
 async def main():
     """主函数"""
     print("=" * 60)
@@ -260,6 +312,7 @@ async def main():
         await init_categories()
         await create_super_admin()
         await create_initial_invite_codes()
+        await init_invite_tree()
         
         print()
         print("=" * 60)
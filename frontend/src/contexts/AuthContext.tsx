@@ -1,7 +1,7 @@
 "use client";
 
 import React, { createContext, useContext, useEffect, useState, useCallback } from 'react';
-import { getToken, setToken, removeToken } from '@/lib/api';
+import { getToken, setToken, setRefreshToken, getRefreshToken, removeToken, post } from '@/lib/api';
 import { getCurrentUser, login as apiLogin, register as apiRegister } from '@/lib/auth';
 import type { UserProfile, RegisterData } from '@/types/user';
 
@@ -48,6 +48,9 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
   const login = async (username: string, password: string) => {
     const response = await apiLogin(username, password);
     setToken(response.access_token);
+    if (response.refresh_token) {
+      setRefreshToken(response.refresh_token);
+    }
     await refreshUser();
   };
 
@@ -58,6 +61,11 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
   };
 
   const logout = () => {
+    const refreshToken = getRefreshToken();
+    if (refreshToken) {
+      // 服务端吊销本次登录，失败不影响本地登出
+      post('/auth/logout', { refresh_token: refreshToken }).catch(() => {});
+    }
     removeToken();
     setUser(null);
   };
@@ -3,6 +3,7 @@ const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/a
 
 // Token存储键名
 const TOKEN_KEY = 'access_token';
+const REFRESH_TOKEN_KEY = 'refresh_token';
 
 /**
  * 获取存储的Token
@@ -26,6 +27,59 @@ export function setToken(token: string): void {
 export function removeToken(): void {
   if (typeof window === 'undefined') return;
   localStorage.removeItem(TOKEN_KEY);
+  localStorage.removeItem(REFRESH_TOKEN_KEY);
+}
+
+/**
+ * 获取存储的刷新Token
+ */
+export function getRefreshToken(): string | null {
+  if (typeof window === 'undefined') return null;
+  return localStorage.getItem(REFRESH_TOKEN_KEY);
+}
+
+/**
+ * 设置刷新Token
+ */
+export function setRefreshToken(token: string): void {
+  if (typeof window === 'undefined') return;
+  localStorage.setItem(REFRESH_TOKEN_KEY, token);
+}
+
+// 进行中的刷新请求，并发的401共用同一次刷新（刷新令牌只能使用一次）
+let refreshing: Promise<boolean> | null = null;
+
+/**
+ * 用刷新Token换取新的访问Token
+ */
+async function refreshAccessToken(): Promise<boolean> {
+  const refreshToken = getRefreshToken();
+  if (!refreshToken) return false;
+
+  if (!refreshing) {
+    refreshing = (async () => {
+      try {
+        const response = await fetch(`${API_BASE_URL}/auth/refresh`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ refresh_token: refreshToken }),
+        });
+        if (!response.ok) {
+          removeToken();
+          return false;
+        }
+        const data = await response.json();
+        setToken(data.access_token);
+        setRefreshToken(data.refresh_token);
+        return true;
+      } catch {
+        return false;
+      } finally {
+        refreshing = null;
+      }
+    })();
+  }
+  return refreshing;
 }
 
 /**
@@ -33,7 +87,8 @@ export function removeToken(): void {
  */
 async function request<T>(
   endpoint: string,
-  options: RequestInit = {}
+  options: RequestInit = {},
+  retry = true
 ): Promise<T> {
   const url = `${API_BASE_URL}${endpoint}`;
   const token = getToken();
@@ -52,6 +107,11 @@ async function request<T>(
     headers,
   });
 
+  // 访问Token过期时刷新一次后重试
+  if (response.status === 401 && token && retry && await refreshAccessToken()) {
+    return request<T>(endpoint, options, false);
+  }
+
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: '请求失败' }));
     throw new Error(error.detail || `HTTP error! status: ${response.status}`);
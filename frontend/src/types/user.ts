@@ -50,6 +50,8 @@ export interface LoginData {
 export interface Token {
   access_token: string;
   token_type: string;
+  refresh_token?: string;
+  expires_in?: number;
 }
 
 export interface InviteCodeInfo {